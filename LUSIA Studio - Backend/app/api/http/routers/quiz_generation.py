@@ -1,10 +1,12 @@
 """
 Quiz generation endpoints — AI-powered quiz creation pipeline.
 
-Provides 3 endpoints:
+Provides these endpoints:
 - POST /start: creates quiz artifact, returns artifact_id
 - GET /{artifact_id}/stream: SSE endpoint for streaming question generation
 - POST /match-curriculum: lightweight curriculum matching from free text
+- POST /match-curriculum/batch: several matches in one request
+- POST /resolve-codes: resolve curriculum codes to full nodes
 """
 
 from fastapi import APIRouter, Depends, HTTPException
@@ -13,6 +15,8 @@ from supabase import Client
 
 from app.api.deps import require_teacher
 from app.api.http.schemas.quiz_generation import (
+    CurriculumMatchBatchIn,
+    CurriculumMatchBatchOut,
     CurriculumMatchIn,
     CurriculumMatchOut,
     CurriculumMatchNodeOut,
@@ -24,6 +28,7 @@ from app.api.http.services.generation_context import validate_generation_possibl
 from app.api.http.services.quiz_generation_service import (
     create_quiz_artifact,
     generate_questions_stream,
+    match_curricula_batch,
     match_curriculum,
     resolve_curriculum_codes,
 )
@@ -101,6 +106,24 @@ async def match_curriculum_endpoint(
     return CurriculumMatchOut(matched_nodes=matched_nodes)
 
 
+@router.post("/match-curriculum/batch", response_model=CurriculumMatchBatchOut)
+async def match_curriculum_batch_endpoint(
+    payload: CurriculumMatchBatchIn,
+    current_user: dict = Depends(require_teacher),
+    db: Client = Depends(get_b2b_db),
+):
+    """
+    Match several free-text descriptions to curriculum codes at once.
+
+    Queries for the same subject/year/component share one LLM call.
+    Results are returned in the same order as the queries.
+    """
+    results = await match_curricula_batch(db, payload.queries)
+    return CurriculumMatchBatchOut(
+        results=[CurriculumMatchOut(matched_nodes=nodes) for nodes in results]
+    )
+
+
 @router.post("/resolve-codes", response_model=list[CurriculumMatchNodeOut])
 async def resolve_codes_endpoint(
     payload: CurriculumResolveIn,
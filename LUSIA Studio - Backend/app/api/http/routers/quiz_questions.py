@@ -4,7 +4,7 @@ Quiz question bank endpoints.
 
 from typing import Optional
 
-from fastapi import APIRouter, Depends, Query, Request
+from fastapi import APIRouter, Depends, Query, Request, Response
 from supabase import Client
 
 from app.api.deps import require_teacher
@@ -15,10 +15,13 @@ from app.api.http.schemas.quiz_questions import (
     QuizQuestionUpdateIn,
 )
 from app.api.http.services.quiz_questions_service import (
+    QUESTION_MAX_PAGE_SIZE,
+    QUESTION_PAGE_SIZE,
     create_quiz_question,
     delete_quiz_question,
     get_quiz_question,
     list_quiz_questions,
+    read_quiz_image_body,
     update_quiz_question,
     upload_quiz_image,
 )
@@ -30,6 +33,7 @@ router = APIRouter()
 
 @router.get("/", response_model=list[QuizQuestionOut])
 async def list_quiz_questions_endpoint(
+    response: Response,
     ids: Optional[str] = Query(
         default=None,
         description="Comma-separated question ids",
@@ -39,15 +43,30 @@ async def list_quiz_questions_endpoint(
     year_level: Optional[str] = Query(default=None),
     subject_component: Optional[str] = Query(default=None),
     curriculum_code: Optional[str] = Query(default=None),
+    cursor: Optional[str] = Query(
+        default=None,
+        description="Value of X-Next-Cursor from the previous page",
+    ),
+    limit: Optional[int] = Query(
+        default=None,
+        ge=1,
+        le=QUESTION_MAX_PAGE_SIZE,
+        description=f"Page size (default {QUESTION_PAGE_SIZE} when paginating)",
+    ),
     current_user: dict = Depends(get_current_user),
     db: Client = Depends(get_b2b_db),
 ):
-    """List question bank entries with optional filters."""
+    """List question bank entries with optional filters.
+
+    Without ``cursor`` or ``limit`` every matching row is returned. Passing
+    either paginates newest first; when more rows exist the cursor for the
+    next page is returned in the ``X-Next-Cursor`` header.
+    """
     ids_list = None
     if ids:
         ids_list = [raw.strip() for raw in ids.split(",") if raw.strip()]
 
-    return list_quiz_questions(
+    rows, next_cursor = list_quiz_questions(
         db,
         current_user["organization_id"],
         current_user["id"],
@@ -57,7 +76,12 @@ async def list_quiz_questions_endpoint(
         year_level=year_level,
         subject_component=subject_component,
         curriculum_code=curriculum_code,
+        cursor=cursor,
+        limit=limit,
     )
+    if next_cursor:
+        response.headers["X-Next-Cursor"] = next_cursor
+    return rows
 
 
 @router.post("/", response_model=QuizQuestionOut, status_code=201)
@@ -82,9 +106,13 @@ async def upload_quiz_image_endpoint(
     db: Client = Depends(get_b2b_db),
 ):
     """Upload an image for quiz questions/options."""
-    file_bytes = await request.body()
     filename = request.headers.get("x-file-name", "")
     content_type = request.headers.get("content-type", "application/octet-stream")
+    file_bytes = await read_quiz_image_body(
+        content_type,
+        request.headers.get("content-length"),
+        request.stream(),
+    )
     return upload_quiz_image(
         db,
         current_user["organization_id"],
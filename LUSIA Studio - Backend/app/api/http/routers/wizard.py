@@ -30,12 +30,11 @@ _SSE_HEADERS = {
 
 def _get_curriculum_tree(db, subject_id: str, year_level: str, subject_component: str | None) -> str:
     """Fetch and serialize the curriculum tree for embedding in the prompt."""
-    from app.pipeline.steps.categorize_document import get_curriculum_tree, serialize_tree
+    from app.pipeline.steps.categorize_document import get_serialized_curriculum_tree
 
-    tree = get_curriculum_tree(db, subject_id, year_level, subject_component)
-    if not tree:
-        return ""
-    return serialize_tree(tree)
+    return get_serialized_curriculum_tree(
+        db, subject_id, year_level, subject_component, include_component=False
+    )
 
 
 def _get_subject_name(db, subject_id: str) -> str | None:
@@ -58,6 +58,17 @@ class CurriculumMatchOut(BaseModel):
     matched_nodes: list[CurriculumMatchNodeOut]
 
 
+# ── POST /quiz-generation/match-curriculum/batch ──────────────
+
+
+class CurriculumMatchBatchIn(BaseModel):
+    queries: list[CurriculumMatchIn] = Field(..., min_length=1, max_length=10)
+
+
+class CurriculumMatchBatchOut(BaseModel):
+    results: list[CurriculumMatchOut]
+
+
 # ── POST /quiz-generation/resolve-codes ─────────────────────
 
 
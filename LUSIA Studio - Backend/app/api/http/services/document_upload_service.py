@@ -245,6 +245,19 @@ def list_processing_artifacts(
     Failed artifacts are included so that on page reload the user still sees
     their error state and can retry, rather than the row silently disappearing.
     """
+    # Cheap HEAD count first: most page loads have nothing in flight, and the
+    # nested document_jobs embed is only worth paying for when rows exist.
+    count_response = supabase_execute(
+        db.table("artifacts")
+        .select("id", count="exact", head=True)
+        .eq("organization_id", org_id)
+        .eq("user_id", user_id)
+        .eq("is_processed", False),
+        entity="artifacts",
+    )
+    if count_response.count == 0:
+        return []
+
     response = supabase_execute(
         db.table("artifacts")
         .select(ARTIFACT_SELECT + ", icon, document_jobs(id, status, error_message)")
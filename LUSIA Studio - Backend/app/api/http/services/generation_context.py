@@ -14,13 +14,11 @@ from __future__ import annotations
 
 import json
 import logging
+from concurrent.futures import ThreadPoolExecutor
 
 from supabase import Client
 
-from app.pipeline.steps.categorize_document import (
-    get_curriculum_tree,
-    serialize_tree,
-)
+from app.pipeline.steps.categorize_document import get_serialized_curriculum_tree
 from app.utils.db import supabase_execute
 
 logger = logging.getLogger(__name__)
@@ -31,6 +29,9 @@ CONTENT_STATUSES = {"full"}
 
 MAX_CONTEXT_TOKENS = 200_000
 
+# Concurrent PostgREST reads while assembling one context (kept low on purpose).
+_CONTEXT_READ_WORKERS = 4
+
 
 # ── Subject metadata (single query) ─────────────────────────
 
@@ -110,65 +111,78 @@ def assemble_generation_context(
             if not subject_component and doc_meta.get("subject_component"):
                 subject_component = doc_meta["subject_component"]
 
-    # ── Subject metadata ──
-    subject_name: str | None = None
-    subject_status: str | None = None
-    subject_color: str | None = None
-    subject_icon: str | None = None
-    has_national_exam = False
-
-    if subject_id:
-        meta = get_subject_metadata(db, subject_id)
-        if meta:
-            subject_name = meta.get("name") or "Desconhecida"
-            subject_status = meta.get("status")
-            subject_color = meta.get("color")
-            subject_icon = meta.get("icon")
-            has_national_exam = bool(meta.get("has_national_exam"))
-
-    logger.info(
-        "Context assembly: subject=%s (%s), year=%s, codes=%d, "
-        "has_exam=%s, has_doc=%s",
-        subject_name, subject_status, year_level, len(codes),
-        has_national_exam, bool(upload_artifact_id),
-    )
+    # The source reads are independent of each other, so they are issued
+    # concurrently to overlap PostgREST round-trips. Only the subject
+    # metadata gates which of them are needed.
+    with ThreadPoolExecutor(max_workers=_CONTEXT_READ_WORKERS) as pool:
+        document_future = None
+        if upload_artifact_id:
+            document_future = pool.submit(
+                fetch_document_content, db, upload_artifact_id
+            )
 
-    # ── Curriculum tree (full / structure only) ──
-    curriculum_tree = ""
-    if (
-        subject_id
-        and year_level
-        and subject_status in CATEGORIZABLE_STATUSES
-    ):
-        tree_nodes = get_curriculum_tree(
-            db, subject_id, year_level, subject_component
+        # ── Subject metadata ──
+        subject_name: str | None = None
+        subject_status: str | None = None
+        subject_color: str | None = None
+        subject_icon: str | None = None
+        has_national_exam = False
+
+        if subject_id:
+            meta = get_subject_metadata(db, subject_id)
+            if meta:
+                subject_name = meta.get("name") or "Desconhecida"
+                subject_status = meta.get("status")
+                subject_color = meta.get("color")
+                subject_icon = meta.get("icon")
+                has_national_exam = bool(meta.get("has_national_exam"))
+
+        logger.info(
+            "Context assembly: subject=%s (%s), year=%s, codes=%d, "
+            "has_exam=%s, has_doc=%s",
+            subject_name, subject_status, year_level, len(codes),
+            has_national_exam, bool(upload_artifact_id),
         )
-        if tree_nodes:
-            has_components = any(
-                n.get("subject_component") for n in tree_nodes
+
+        # ── Curriculum tree (full / structure only) ──
+        tree_future = None
+        if (
+            subject_id
+            and year_level
+            and subject_status in CATEGORIZABLE_STATUSES
+        ):
+            tree_future = pool.submit(
+                get_serialized_curriculum_tree,
+                db, subject_id, year_level, subject_component,
             )
-            curriculum_tree = serialize_tree(
-                tree_nodes, include_component=has_components
+
+        # ── Base content (full only) ──
+        base_content_future = None
+        if subject_status in CONTENT_STATUSES and codes:
+            base_content_future = pool.submit(
+                fetch_base_content,
+                db, subject_id, year_level, subject_component, codes,
             )
 
-    # ── Base content (full only) ──
-    base_content_by_code: dict[str, str] = {}
-    if subject_status in CONTENT_STATUSES and codes:
-        base_content_by_code = fetch_base_content(
-            db, subject_id, year_level, subject_component, codes
-        )
+        # ── Bank questions (national exam subjects only) ──
+        bank_future = None
+        if has_national_exam and codes:
+            bank_future = pool.submit(
+                fetch_bank_questions,
+                db, subject_id, year_level, codes, year_range=year_range,
+            )
 
-    # ── Bank questions (national exam subjects only) ──
-    bank_questions: list[dict] = []
-    if has_national_exam and codes:
-        bank_questions = fetch_bank_questions(
-            db, subject_id, year_level, codes, year_range=year_range
+        curriculum_tree = tree_future.result() if tree_future else ""
+
+        base_content_by_code: dict[str, str] = (
+            base_content_future.result() if base_content_future else {}
         )
+        bank_questions: list[dict] = bank_future.result() if bank_future else []
 
-    # ── Teacher document ──
-    document_content: str | None = None
-    if upload_artifact_id:
-        document_content = fetch_document_content(db, upload_artifact_id)
+        # ── Teacher document ──
+        document_content: str | None = (
+            document_future.result() if document_future else None
+        )
 
     logger.info(
         "Context assembled: tree=%d chars, base_content=%d codes, "
@@ -281,23 +295,28 @@ def fetch_base_content(
     response = supabase_execute(query, entity="curriculum")
     nodes = response.data or []
 
+    if not nodes:
+        return {}
+
+    # One IN query for every node instead of a base_content round-trip each
+    bc_response = supabase_execute(
+        db.table("base_content")
+        .select("curriculum_id,content_json")
+        .in_("curriculum_id", [node["id"] for node in nodes]),
+        entity="base_content",
+    )
+    content_by_id: dict[str, dict | list] = {}
+    for row in bc_response.data or []:
+        content_by_id.setdefault(row["curriculum_id"], row.get("content_json"))
+
     result: dict[str, str] = {}
 
     for node in nodes:
         code = node["code"]
-        curriculum_id = node["id"]
-
-        bc_response = supabase_execute(
-            db.table("base_content")
-            .select("content_json")
-            .eq("curriculum_id", curriculum_id)
-            .limit(1),
-            entity="base_content",
-        )
-        bc_rows = bc_response.data or []
 
-        if bc_rows and bc_rows[0].get("content_json"):
-            text = extract_text_from_content_json(bc_rows[0]["content_json"])
+        content_json = content_by_id.get(node["id"])
+        if content_json:
+            text = extract_text_from_content_json(content_json)
             if text:
                 result[code] = text
                 continue
@@ -367,42 +386,88 @@ def fetch_document_content(db: Client, upload_artifact_id: str) -> str | None:
 
 def extract_text_from_content_json(content_json: dict | list) -> str:
     """
-    Recursively extract plain text from a TipTap/ProseMirror JSON structure.
+    Extract plain text from a TipTap/ProseMirror JSON structure.
 
     Handles nested content arrays, text nodes, and the sections format
-    used by ``base_content``.
+    used by ``base_content``. List items are joined with newlines (empty
+    ones included); ``content`` children only contribute when non-empty.
+
+    Walks the tree with an explicit stack and appends fragments to a single
+    list, joined once at the end, instead of joining strings per level.
     """
-    if isinstance(content_json, str):
-        return content_json
+    out: list[str] = []
+    # Entries are (node, parent_kind) to visit or (None, (start, parent_kind))
+    # to close a container whose fragments begin at out[start].
+    stack: list[tuple] = [(content_json, None)]
+
+    while stack:
+        node, info = stack.pop()
+
+        if node is None and isinstance(info, tuple):
+            start, parent_kind = info
+            _close_fragments(out, start, parent_kind)
+            continue
+
+        parent_kind = info
+        if isinstance(node, str):
+            _emit_fragment(out, node, parent_kind)
+            continue
+
+        if isinstance(node, list):
+            stack.append((None, (len(out), parent_kind)))
+            stack.extend((child, "list") for child in reversed(node))
+            continue
+
+        if isinstance(node, dict):
+            if node.get("type") == "text":
+                _emit_fragment(out, node.get("text", ""), parent_kind)
+                continue
 
-    if isinstance(content_json, list):
-        return "\n".join(
-            extract_text_from_content_json(item) for item in content_json
-        )
+            children = node.get("content", [])
+            if isinstance(children, list):
+                stack.append((None, (len(out), parent_kind)))
+                stack.extend((child, "content") for child in reversed(children))
+                continue
 
-    if isinstance(content_json, dict):
-        if content_json.get("type") == "text":
-            return content_json.get("text", "")
-
-        children = content_json.get("content", [])
-        if isinstance(children, list):
-            texts = [extract_text_from_content_json(c) for c in children]
-            return "\n".join(t for t in texts if t)
-
-        # Handle sections format from base_content
-        sections = content_json.get("sections", [])
-        if isinstance(sections, list):
-            parts = []
-            for section in sections:
-                title = section.get("section_title", "")
-                body = section.get("content", "")
-                if title:
-                    parts.append(f"## {title}")
-                if body:
-                    parts.append(body)
-            return "\n\n".join(parts)
-
-    return ""
+            _emit_fragment(out, _sections_text(node), parent_kind)
+            continue
+
+        _emit_fragment(out, "", parent_kind)
+
+    return "\n".join(out)
+
+
+def _emit_fragment(out: list[str], text: str, parent_kind: str | None) -> None:
+    """Append a leaf's text; empty leaves only count inside plain lists."""
+    if text:
+        out.append(text)
+    elif parent_kind != "content":
+        out.append("")
+
+
+def _close_fragments(out: list[str], start: int, parent_kind: str | None) -> None:
+    """Normalise a finished container whose joined text would be empty."""
+    if len(out) - start > 1 or (len(out) > start and out[start]):
+        return
+    del out[start:]
+    if parent_kind != "content":
+        out.append("")
+
+
+def _sections_text(content_json: dict) -> str:
+    """Render the ``base_content`` sections format."""
+    sections = content_json.get("sections", [])
+    if not isinstance(sections, list):
+        return ""
+    parts = []
+    for section in sections:
+        title = section.get("section_title", "")
+        body = section.get("content", "")
+        if title:
+            parts.append(f"## {title}")
+        if body:
+            parts.append(body)
+    return "\n\n".join(parts)
 
 
 # ── Token budget management ──────────────────────────────────
@@ -10,9 +10,10 @@ from __future__ import annotations
 
 import json
 import logging
-import math
 from collections import defaultdict
+from concurrent.futures import ThreadPoolExecutor
 from decimal import InvalidOperation, ROUND_HALF_UP, Decimal
+from functools import lru_cache
 from typing import Optional
 
 from fastapi import HTTPException, status
@@ -41,6 +42,17 @@ BASICO_EXAM_SUBJECT_SLUGS = {
 }
 _CFD_EXTENDED_COLUMNS_SUPPORTED: bool | None = None
 _VIRTUAL_CFD_PREFIX = "virtual-cfd--"
+# Concurrent PostgREST reads per CFS dashboard render (kept low on purpose).
+_CFS_DASHBOARD_READ_WORKERS = 4
+
+# Hot Decimal constants, built once instead of parsed on every call.
+_D0 = Decimal("0")
+_D1 = Decimal("1")
+_D10 = Decimal("10")
+_D20 = Decimal("20")
+_D25 = Decimal("25")
+_D30 = Decimal("30")
+_D100 = Decimal("100")
 
 # ── Summary / Detail SELECT constants (calendar pattern) ────
 # Grades follows the progressive-loading convention: the board endpoint
@@ -74,11 +86,20 @@ SUPPORTED_GRADE_SCALES = {
 # ── Helpers ──────────────────────────────────────────────────
 
 
+@lru_cache(maxsize=1024)
+def _parse_decimal(text: str) -> Decimal:
+    # Grade inputs repeat heavily ("25.00", "100", "14"); Decimal is
+    # immutable, so parsed values can be shared safely.
+    return Decimal(text)
+
+
 def _dec(value) -> Decimal:
     """Convert any numeric value to Decimal safely."""
     if value is None:
-        return Decimal("0")
-    return Decimal(str(value))
+        return _D0
+    if isinstance(value, Decimal):
+        return value
+    return _parse_decimal(str(value))
 
 
 def _normalize_cumulative_weights(
@@ -136,7 +157,7 @@ def _normalize_cumulative_weights(
                 )
                 return None
 
-        if sum(normalized_row) != Decimal("100"):
+        if sum(normalized_row) != _D100:
             logger.warning(
                 "Ignoring cumulative_weights row that does not sum to 100 for enrollment %s at row %s: %r",
                 enrollment_id,
@@ -152,7 +173,7 @@ def _normalize_cumulative_weights(
 
 def _round_half_up(value: Decimal) -> int:
     """Standard arithmetic rounding (half-up) to integer."""
-    return int(value.quantize(Decimal("1"), rounding=ROUND_HALF_UP))
+    return int(value.quantize(_D1, rounding=ROUND_HALF_UP))
 
 
 def _decimal_string(value) -> str:
@@ -160,11 +181,17 @@ def _decimal_string(value) -> str:
     return format(decimal_value.normalize(), "f")
 
 
-def _truncate_one_decimal(value: Decimal) -> float:
-    """Truncate to 1 decimal place (never round up). 14.68 → 14.6."""
-    shifted = value * 10
-    truncated = Decimal(math.floor(shifted))
-    return float(truncated / 10)
+def _div_round_half_up(numerator: int, denominator: int) -> int:
+    """Integer half-up rounding of numerator / denominator (both non-negative)."""
+    return (2 * numerator + denominator) // (2 * denominator)
+
+
+def _to_hundredths(value) -> int | None:
+    """Express a percentage as an integer number of hundredths, if exact."""
+    hundredths = _dec(value) * 100
+    if hundredths != hundredths.to_integral_value():
+        return None
+    return int(hundredths)
 
 
 def _is_mandatory_portuguese_enrollment(subject_slug: str | None, year_level: str | None) -> bool:
@@ -209,9 +236,9 @@ def _is_exam_scale_compatible(
 def _numeric_scale_max(grade_scale: str | None) -> Decimal | None:
     match grade_scale:
         case "scale_0_20":
-            return Decimal("20")
+            return _D20
         case "scale_0_100":
-            return Decimal("100")
+            return _D100
         case _:
             return None
 
@@ -249,9 +276,9 @@ def _convert_raw_to_visible_grade(
     if grade_scale == "scale_0_20":
         return _round_half_up(raw)
 
-    scale_max = _numeric_scale_max(grade_scale) or Decimal("100")
-    percentage = raw * Decimal("100") / scale_max
-    return _convert_percentage_to_level(int(percentage.quantize(Decimal("1"), rounding=ROUND_HALF_UP)))
+    scale_max = _numeric_scale_max(grade_scale) or _D100
+    percentage = raw * _D100 / scale_max
+    return _convert_percentage_to_level(int(percentage.quantize(_D1, rounding=ROUND_HALF_UP)))
 
 
 def _enrollment_has_edit_data(db: Client, enrollment: dict) -> bool:
@@ -577,7 +604,7 @@ def create_settings(
 
     # Validate weights sum to 100
     weight_sum = sum(Decimal(str(w)) for w in payload.period_weights)
-    if weight_sum != Decimal("100"):
+    if weight_sum != _D100:
         raise HTTPException(
             status_code=400,
             detail=f"Period weights must sum to 100, got {float(weight_sum)}",
@@ -794,8 +821,25 @@ def _import_past_year_grades(
             ):
                 historical_exam_rows.append((pg, past_year))
 
+    # One lookup for every stored CFD the exam rows touch; only subjects
+    # without a CFD row go through _ensure_cfd_record to have one created.
+    existing_cfds_map: dict[tuple[str, str], dict] = {}
+    if historical_exam_rows:
+        existing_cfds_resp = supabase_execute(
+            db.table("student_subject_cfd")
+            .select("id, subject_id, academic_year")
+            .eq("student_id", student_id)
+            .in_("subject_id", sorted({pg.subject_id for pg, _ in historical_exam_rows}))
+            .in_("academic_year", sorted({year for _, year in historical_exam_rows})),
+            entity="cfds",
+        )
+        existing_cfds_map = {
+            (row["subject_id"], row["academic_year"]): row
+            for row in (existing_cfds_resp.data or [])
+        }
+
     for pg, past_year in historical_exam_rows:
-        cfd = _ensure_cfd_record(
+        cfd = existing_cfds_map.get((pg.subject_id, past_year)) or _ensure_cfd_record(
             db,
             student_id,
             subject_id=pg.subject_id,
@@ -804,7 +848,7 @@ def _import_past_year_grades(
         exam_weight = _resolve_default_exam_weight(
             education_level=payload.education_level
         )
-        exam_grade_20 = _round_half_up(_dec(pg.exam_grade_raw) / Decimal("10"))
+        exam_grade_20 = _round_half_up(_dec(pg.exam_grade_raw) / _D10)
         update_data = {
             "exam_grade": exam_grade_20,
             "exam_grade_raw": pg.exam_grade_raw,
@@ -1369,7 +1413,7 @@ def update_settings(
     )
 
     weight_sum = sum(Decimal(str(w)) for w in next_period_weights)
-    if weight_sum != Decimal("100"):
+    if weight_sum != _D100:
         raise HTTPException(
             status_code=400,
             detail=f"Period weights must sum to 100, got {float(weight_sum)}",
@@ -1561,11 +1605,12 @@ def update_period_grade(
     )
     saved_period = parse_single_or_404(resp, entity="period")
 
-    # Trigger annual grade recalculation
-    _try_recalculate_annual(db, saved_period["enrollment_id"])
+    # Trigger annual grade recalculation (only when the pauta actually moved)
+    if saved_period.get("pauta_grade") != period_owner.get("pauta_grade"):
+        _try_recalculate_annual(db, saved_period["enrollment_id"])
 
     return {
-        "period": _get_period_with_summary(db, period_id),
+        "period": _get_period_with_summary(db, period_id, period=saved_period),
         "annual_grade": _get_annual_grade_for_enrollment(db, saved_period["enrollment_id"]),
     }
 
@@ -1590,10 +1635,11 @@ def override_period_grade(
     )
     saved_period = parse_single_or_404(resp, entity="period")
 
-    _try_recalculate_annual(db, saved_period["enrollment_id"])
+    if saved_period.get("pauta_grade") != period_owner.get("pauta_grade"):
+        _try_recalculate_annual(db, saved_period["enrollment_id"])
 
     return {
-        "period": _get_period_with_summary(db, period_id),
+        "period": _get_period_with_summary(db, period_id, period=saved_period),
         "annual_grade": _get_annual_grade_for_enrollment(db, saved_period["enrollment_id"]),
     }
 
@@ -1615,6 +1661,37 @@ def get_elements(db: Client, student_id: str, period_id: str) -> list[dict]:
     return resp.data or []
 
 
+def _replace_period_element_rows(db: Client, period_id: str, rows: list[dict]) -> list[dict]:
+    """Swap a period's elements for `rows` and return the inserted rows.
+
+    Uses the `replace_period_elements` RPC so the delete and insert happen in
+    one transaction and one round-trip; falls back to delete + insert if the
+    RPC is unavailable.
+    """
+    try:
+        resp = db.rpc(
+            "replace_period_elements",
+            {"p_period_id": period_id, "p_rows": rows},
+        ).execute()
+        return resp.data or []
+    except Exception:
+        logger.exception("RPC replace_period_elements failed, falling back")
+
+    supabase_execute(
+        db.table("subject_evaluation_elements")
+        .delete()
+        .eq("period_id", period_id),
+        entity="elements",
+    )
+    if not rows:
+        return []
+    resp = supabase_execute(
+        db.table("subject_evaluation_elements").insert(rows),
+        entity="elements",
+    )
+    return resp.data or []
+
+
 def replace_elements(
     db: Client, student_id: str, period_id: str, elements: list[EvaluationElementIn]
 ) -> dict:
@@ -1624,21 +1701,12 @@ def replace_elements(
 
     # Validate weights sum to 100
     weight_sum = sum(Decimal(str(e.weight_percentage)) for e in elements)
-    if weight_sum != Decimal("100"):
+    if weight_sum != _D100:
         raise HTTPException(
             status_code=400,
             detail=f"Element weights must sum to 100, got {float(weight_sum)}",
         )
 
-    # Delete existing elements
-    supabase_execute(
-        db.table("subject_evaluation_elements")
-        .delete()
-        .eq("period_id", period_id),
-        entity="elements",
-    )
-
-    # Insert new elements
     rows = [
         {
             "period_id": period_id,
@@ -1650,25 +1718,16 @@ def replace_elements(
         }
         for e in elements
     ]
-    if rows:
-        supabase_execute(
-            db.table("subject_evaluation_elements").insert(rows),
-            entity="elements",
-        )
+    # The replace returns the stored rows (with ids), so they are reused for
+    # the response instead of being selected again after recalculation.
+    inserted = _replace_period_element_rows(db, period_id, rows)
 
     # Recalculate period grade
     recalculate_period_grade(db, period_id)
 
-    resp = supabase_execute(
-        db.table("subject_evaluation_elements")
-        .select("*")
-        .eq("period_id", period_id)
-        .order("created_at", desc=False),
-        entity="elements",
-    )
     return {
-        "elements": resp.data or [],
-        "period": _get_period_with_summary(db, period_id),
+        "elements": inserted,
+        "period": _get_period_with_summary(db, period_id, has_elements=bool(inserted)),
         "annual_grade": _get_annual_grade_for_enrollment(db, period_owner["enrollment_id"]),
     }
 
@@ -1753,63 +1812,64 @@ def copy_elements_to_other_periods(
         entity="periods",
     )
     other_periods = resp.data or []
+    target_ids = [target_period["id"] for target_period in other_periods]
+    if not target_ids:
+        return 0
 
-    copied_count = 0
-    for target_period in other_periods:
-        # Delete existing elements in target
-        supabase_execute(
-            db.table("subject_evaluation_elements")
-            .delete()
-            .eq("period_id", target_period["id"]),
-            entity="elements",
-        )
-        # Copy structure (not grades)
-        rows = [
-            {
-                "period_id": target_period["id"],
-                "element_type": e["element_type"],
-                "label": e["label"],
-                "icon": e.get("icon"),
-                "weight_percentage": e["weight_percentage"],
-                "raw_grade": None,
-            }
-            for e in source_elements
-        ]
-        if rows:
-            supabase_execute(
-                db.table("subject_evaluation_elements").insert(rows),
-                entity="elements",
-            )
-            copied_count += 1
+    # Clear every target period in one DELETE, then copy the structure
+    # (not grades) into all of them with a single bulk INSERT.
+    supabase_execute(
+        db.table("subject_evaluation_elements")
+        .delete()
+        .in_("period_id", target_ids),
+        entity="elements",
+    )
+    rows = [
+        {
+            "period_id": target_id,
+            "element_type": e["element_type"],
+            "label": e["label"],
+            "icon": e.get("icon"),
+            "weight_percentage": e["weight_percentage"],
+            "raw_grade": None,
+        }
+        for target_id in target_ids
+        for e in source_elements
+    ]
+    supabase_execute(
+        db.table("subject_evaluation_elements").insert(rows),
+        entity="elements",
+    )
 
-    return copied_count
+    return len(target_ids)
 
 
 # ── Algorithm A: Period Grade Calculation ────────────────────
 
 
-def recalculate_period_grade(db: Client, period_id: str) -> dict:
-    """
-    Recalculate a period's grade from its evaluation elements.
-    raw_calculated = SUM(element.raw_grade × element.weight_percentage / 100)
-    calculated_grade = ROUND_HALF_UP(raw_calculated)
+def _fetch_period_grade_context(db: Client, period_id: str) -> dict:
+    """Load everything `recalculate_period_grade` needs in one round-trip.
 
-    If the enrollment uses domain-based evaluation, the domain-weighted
-    calculation takes precedence and produces own_raw / own_grade, then
-    triggers the cumulative cascade.
+    The `period_grade_context` RPC returns the period flags, the year's
+    education level / grade scale, whether the enrollment uses domains, and
+    the flat-element weighted sum aggregated in SQL. Falls back to the
+    individual queries when the RPC is unavailable.
     """
-    # Fetch period info first (needed for domain check)
+    try:
+        resp = db.rpc("period_grade_context", {"p_period_id": period_id}).execute()
+        return resp.data[0] if resp.data else {}
+    except Exception:
+        logger.exception("RPC period_grade_context failed, falling back")
+
     period_resp = supabase_execute(
         db.table("student_subject_periods")
-        .select("is_overridden, enrollment_id, period_number")
+        .select("is_overridden, enrollment_id, period_number, pauta_grade")
         .eq("id", period_id)
         .limit(1),
         entity="period",
     )
-    period = period_resp.data[0] if period_resp.data else {}
-    enrollment_id = period.get("enrollment_id")
-    education_level = None
-    grade_scale = None
+    context = dict(period_resp.data[0]) if period_resp.data else {}
+    enrollment_id = context.get("enrollment_id")
     if enrollment_id:
         enrollment_resp = supabase_execute(
             db.table("student_subject_enrollments")
@@ -1828,21 +1888,9 @@ def recalculate_period_grade(db: Client, period_id: str) -> dict:
                 entity="grade_settings",
             )
             if settings_resp.data:
-                education_level = settings_resp.data[0].get("education_level")
-                grade_scale = settings_resp.data[0].get("grade_scale")
+                context["education_level"] = settings_resp.data[0].get("education_level")
+                context["grade_scale"] = settings_resp.data[0].get("grade_scale")
 
-    # ── Legacy flat-element path ──
-    resp = supabase_execute(
-        db.table("subject_evaluation_elements")
-        .select("weight_percentage, raw_grade")
-        .eq("period_id", period_id),
-        entity="elements",
-    )
-    elements = resp.data or []
-
-    # Check if enrollment has domains
-    has_domains = False
-    if enrollment_id:
         domain_check_resp = supabase_execute(
             db.table("subject_evaluation_domains")
             .select("id")
@@ -1850,29 +1898,42 @@ def recalculate_period_grade(db: Client, period_id: str) -> dict:
             .limit(1),
             entity="domains",
         )
-        has_domains = bool(domain_check_resp.data)
+        context["has_domains"] = bool(domain_check_resp.data)
 
-    if has_domains:
+    resp = supabase_execute(
+        db.table("subject_evaluation_elements")
+        .select("weight_percentage, raw_grade")
+        .eq("period_id", period_id),
+        entity="elements",
+    )
+    graded = [e for e in (resp.data or []) if e.get("raw_grade") is not None]
+    context["graded_count"] = len(graded)
+    context["raw_calculated"] = sum(
+        _dec(e["raw_grade"]) * _dec(e["weight_percentage"]) / _D100
+        for e in graded
+    ) if graded else None
+    return context
+
+
+def recalculate_period_grade(db: Client, period_id: str) -> dict:
+    """
+    Recalculate a period's grade from its evaluation elements.
+    raw_calculated = SUM(element.raw_grade × element.weight_percentage / 100)
+    calculated_grade = ROUND_HALF_UP(raw_calculated)
+
+    If the enrollment uses domain-based evaluation, the domain-weighted
+    calculation takes precedence and produces own_raw / own_grade, then
+    triggers the cumulative cascade.
+    """
+    period = _fetch_period_grade_context(db, period_id)
+    enrollment_id = period.get("enrollment_id")
+
+    if period.get("has_domains"):
         # ── Domain-based calculation path ──
         return _recalculate_period_grade_domains(db, period_id, period)
 
-    # ── Legacy flat-element path (unchanged) ──
-    if not elements:
-        supabase_execute(
-            db.table("student_subject_periods")
-            .update({
-                "raw_calculated": None,
-                "calculated_grade": None,
-                "own_raw": None,
-                "own_grade": None,
-            })
-            .eq("id", period_id),
-            entity="period",
-        )
-        return {}
-
-    graded = [e for e in elements if e.get("raw_grade") is not None]
-    if not graded:
+    # ── Legacy flat-element path ──
+    if not period.get("graded_count"):
         supabase_execute(
             db.table("student_subject_periods")
             .update({
@@ -1886,14 +1947,11 @@ def recalculate_period_grade(db: Client, period_id: str) -> dict:
         )
         return {}
 
-    raw_calculated = sum(
-        _dec(e["raw_grade"]) * _dec(e["weight_percentage"]) / Decimal("100")
-        for e in graded
-    )
+    raw_calculated = _dec(period["raw_calculated"])
     calculated_grade = _convert_raw_to_visible_grade(
         raw_calculated,
-        education_level=education_level,
-        grade_scale=grade_scale,
+        education_level=period.get("education_level"),
+        grade_scale=period.get("grade_scale"),
     )
 
     update_data = {
@@ -1911,8 +1969,13 @@ def recalculate_period_grade(db: Client, period_id: str) -> dict:
         entity="period",
     )
 
-    # Cascade: try to recalculate annual
-    if enrollment_id:
+    # Cascade: the annual grade is derived from pauta grades only, so an edit
+    # that leaves this period's pauta as it was cannot change it.
+    pauta_changed = (
+        "pauta_grade" in update_data
+        and update_data["pauta_grade"] != period.get("pauta_grade")
+    )
+    if enrollment_id and pauta_changed:
         _try_recalculate_annual(db, enrollment_id)
 
     return update_data
@@ -1961,7 +2024,7 @@ def _recalculate_period_grade_domains(
     )
     domains = domains_resp.data or []
 
-    own_raw = Decimal("0")
+    own_raw = _D0
     has_any_graded = False
 
     for domain in domains:
@@ -1970,7 +2033,7 @@ def _recalculate_period_grade_domains(
         if idx >= len(weights_arr):
             continue
         domain_weight = _dec(weights_arr[idx])
-        if domain_weight <= Decimal("0"):
+        if domain_weight <= _D0:
             continue
 
         # Fetch elements for this domain + period_number with a grade
@@ -1997,11 +2060,11 @@ def _recalculate_period_grade_domains(
             domain_avg = sum(_dec(e["raw_grade"]) for e in graded) / Decimal(str(len(graded)))
         else:
             domain_avg = sum(
-                _dec(e["raw_grade"]) * _dec(e.get("weight_percentage", 0)) / Decimal("100")
+                _dec(e["raw_grade"]) * _dec(e.get("weight_percentage", 0)) / _D100
                 for e in graded
             )
 
-        own_raw += domain_avg * domain_weight / Decimal("100")
+        own_raw += domain_avg * domain_weight / _D100
 
     if not has_any_graded:
         supabase_execute(
@@ -2142,9 +2205,9 @@ def _recalculate_cumulative_cascade(db: Client, enrollment_id: str) -> None:
                 cumul_raw = _dec(own_raw)
             else:
                 row = cumulative_weights[i]
-                cumul_raw = Decimal("0")
+                cumul_raw = _D0
                 for j in range(len(row)):
-                    weight_j = row[j] / Decimal("100")
+                    weight_j = row[j] / _D100
                     if j < i:
                         # Previous period's cumulative
                         prev_cumul = cumulative_values[j] if j < len(cumulative_values) else None
@@ -2194,63 +2257,75 @@ def _recalculate_cumulative_cascade(db: Client, enrollment_id: str) -> None:
 def _upsert_annual_grade(
     db: Client, enrollment_id: str, raw_annual: Decimal, annual_grade: int
 ) -> dict:
-    """Upsert an annual grade row for an enrollment."""
-    existing_resp = supabase_execute(
-        db.table("student_annual_subject_grades")
-        .select("id")
-        .eq("enrollment_id", enrollment_id)
-        .limit(1),
-        entity="annual_grade",
-    )
-
+    """Upsert an annual grade row for an enrollment (unique on enrollment_id)."""
     annual_data = {
         "enrollment_id": enrollment_id,
         "raw_annual": str(raw_annual),
         "annual_grade": annual_grade,
         "is_locked": False,
     }
-
-    if existing_resp.data:
-        resp = supabase_execute(
-            db.table("student_annual_subject_grades")
-            .update(annual_data)
-            .eq("id", existing_resp.data[0]["id"]),
-            entity="annual_grade",
-        )
-    else:
-        resp = supabase_execute(
-            db.table("student_annual_subject_grades").insert(annual_data),
-            entity="annual_grade",
-        )
-
+    resp = supabase_execute(
+        db.table("student_annual_subject_grades")
+        .upsert(annual_data, on_conflict="enrollment_id"),
+        entity="annual_grade",
+    )
     return parse_single_or_404(resp, entity="annual_grade")
 
 
-def _try_recalculate_annual(db: Client, enrollment_id: str) -> Optional[dict]:
-    """Recalculate the annual grade from the latest final period grade.
+def _resolve_annual_from_periods(
+    periods: list[dict],
+    cumulative_weights: list[list[Decimal]] | None,
+) -> tuple[Decimal, int] | None:
+    """Pick the (raw_annual, annual_grade) pair from periods ordered by number.
 
     If a teacher manually overrides the final period `pauta_grade`, that value
     must become the annual grade. In cumulative mode we only fall back to the
     calculated cumulative grade when the latest period has no visible final
-    grade yet.
+    grade yet. Returns None when there is nothing to derive an annual from.
     """
-    # Get enrollment to find settings + cumulative_weights
+    if cumulative_weights is not None:
+        graded = [
+            p
+            for p in periods
+            if p.get("pauta_grade") is not None or p.get("cumulative_grade") is not None
+        ]
+        if not graded:
+            return None
+        latest = graded[-1]
+        if latest.get("pauta_grade") is not None:
+            return _dec(latest["pauta_grade"]), latest["pauta_grade"]
+        return _dec(latest["cumulative_raw"]), latest["cumulative_grade"]
+
+    final_period = periods[-1] if periods else None
+    if not final_period or final_period.get("pauta_grade") is None:
+        return None
+    return _dec(final_period["pauta_grade"]), final_period["pauta_grade"]
+
+
+def _fetch_annual_inputs(db: Client, enrollment_id: str) -> Optional[dict]:
+    """Return `cumulative_weights`, `periods` and an `any_graded` flag.
+
+    The `annual_grade_inputs` RPC joins the enrollment with its periods
+    (ordered by number) in one round-trip. When no period is graded it also
+    deletes the stale annual row and returns no periods. Falls back to the
+    individual enrollment/period queries (without the flag) when the RPC is
+    unavailable.
+    """
+    try:
+        resp = db.rpc("annual_grade_inputs", {"p_enrollment_id": enrollment_id}).execute()
+        return resp.data[0] if resp.data else None
+    except Exception:
+        logger.exception("RPC annual_grade_inputs failed, falling back")
+
     enrollment_resp = supabase_execute(
         db.table("student_subject_enrollments")
-        .select("settings_id, cumulative_weights")
+        .select("cumulative_weights")
         .eq("id", enrollment_id)
         .limit(1),
         entity="enrollment",
     )
     if not enrollment_resp.data:
         return None
-    enrollment_row = enrollment_resp.data[0]
-    cumulative_weights = _normalize_cumulative_weights(
-        enrollment_row.get("cumulative_weights"),
-        enrollment_id=enrollment_id,
-    )
-
-    # Get all periods for this enrollment
     periods_resp = supabase_execute(
         db.table("student_subject_periods")
         .select("period_number, pauta_grade, cumulative_grade, cumulative_raw")
@@ -2258,36 +2333,28 @@ def _try_recalculate_annual(db: Client, enrollment_id: str) -> Optional[dict]:
         .order("period_number", desc=False),
         entity="periods",
     )
-    periods = periods_resp.data or []
+    return {**enrollment_resp.data[0], "periods": periods_resp.data or []}
 
-    # In cumulative mode, annual should match the latest visible/final period grade.
-    # If a teacher manually overrides pauta_grade, that must win over calculated cumulative.
-    if cumulative_weights is not None:
-        graded = [
-            p
-            for p in periods
-            if p.get("pauta_grade") is not None or p.get("cumulative_grade") is not None
-        ]
-        if graded:
-            latest = graded[-1]
-            if latest.get("pauta_grade") is not None:
-                raw = _dec(latest["pauta_grade"])
-                grade = latest["pauta_grade"]
-            else:
-                raw = _dec(latest["cumulative_raw"])
-                grade = latest["cumulative_grade"]
-            return _upsert_annual_grade(db, enrollment_id, raw, grade)
-        else:
-            supabase_execute(
-                db.table("student_annual_subject_grades")
-                .delete()
-                .eq("enrollment_id", enrollment_id),
-                entity="annual_grade",
-            )
-            return None
 
-    final_period = periods[-1] if periods else None
-    if not final_period or final_period.get("pauta_grade") is None:
+def _try_recalculate_annual(db: Client, enrollment_id: str) -> Optional[dict]:
+    """Recalculate the annual grade from the latest final period grade.
+
+    See `_resolve_annual_from_periods` for the override/cumulative rules.
+    When no annual can be derived, any stale annual row is deleted.
+    """
+    inputs = _fetch_annual_inputs(db, enrollment_id)
+    if inputs is None:
+        return None
+    if inputs.get("any_graded") is False:
+        # Nothing graded yet: the RPC already removed any stale annual row.
+        return None
+    cumulative_weights = _normalize_cumulative_weights(
+        inputs.get("cumulative_weights"),
+        enrollment_id=enrollment_id,
+    )
+
+    resolved = _resolve_annual_from_periods(inputs.get("periods") or [], cumulative_weights)
+    if resolved is None:
         supabase_execute(
             db.table("student_annual_subject_grades")
             .delete()
@@ -2296,27 +2363,43 @@ def _try_recalculate_annual(db: Client, enrollment_id: str) -> Optional[dict]:
         )
         return None
 
-    raw_annual = _dec(final_period["pauta_grade"])
-    annual_grade = final_period["pauta_grade"]
+    raw_annual, annual_grade = resolved
     return _upsert_annual_grade(db, enrollment_id, raw_annual, annual_grade)
 
 
-def _get_period_with_summary(db: Client, period_id: str) -> dict:
-    resp = supabase_execute(
-        db.table("student_subject_periods")
-        .select("*")
-        .eq("id", period_id)
-        .limit(1),
-        entity="period",
-    )
-    period = parse_single_or_404(resp, entity="period")
-    element_count_resp = supabase_execute(
-        db.table("subject_evaluation_elements")
-        .select("id")
-        .eq("period_id", period_id),
-        entity="elements",
-    )
-    period["has_elements"] = bool(element_count_resp.data)
+def _get_period_with_summary(
+    db: Client,
+    period_id: str,
+    *,
+    period: dict | None = None,
+    has_elements: bool | None = None,
+) -> dict:
+    """Return the period row plus `has_elements`.
+
+    Callers that just wrote the period pass the row returned by the UPDATE
+    (PostgREST returns the full representation) to skip re-selecting it.
+    """
+    if period is None:
+        resp = supabase_execute(
+            db.table("student_subject_periods")
+            .select("*")
+            .eq("id", period_id)
+            .limit(1),
+            entity="period",
+        )
+        period = parse_single_or_404(resp, entity="period")
+    else:
+        period = dict(period)
+    if has_elements is None:
+        element_count_resp = supabase_execute(
+            db.table("subject_evaluation_elements")
+            .select("id")
+            .eq("period_id", period_id)
+            .limit(1),
+            entity="elements",
+        )
+        has_elements = bool(element_count_resp.data)
+    period["has_elements"] = has_elements
     return period
 
 
@@ -2336,26 +2419,20 @@ def _get_annual_grade_for_enrollment(db: Client, enrollment_id: str) -> Optional
 # ── Board Data ───────────────────────────────────────────────
 
 
-def _batch_hydrate_board_summaries(
+def _fetch_board_summary_rows(
     db: Client,
-    enrollments: list[dict],
-    settings: dict,
-) -> list[dict]:
-    """Batch hydration for the board list view (calendar pattern).
+    enrollment_ids: list[str],
+    *,
+    is_locked: bool,
+) -> dict[str, list[dict]]:
+    """Batch-fetch the board's periods, annual grades and domains.
 
-    Collects all enrollment IDs, then batch-fetches periods, element presence,
-    annual grades, and domain presence in O(1) queries per type. Full domain
-    and element data is loaded on demand via the dedicated per-enrollment and
-    per-period endpoints.
+    One query per type (calendar pattern); periods carry a `has_elements`
+    flag from a lightweight period_id-only element probe.
     """
-    enrollment_ids = [e["id"] for e in enrollments]
-    if not enrollment_ids:
-        return []
-
-    is_locked = settings.get("is_locked")
+    rows: dict[str, list[dict]] = {"periods": [], "annual_grades": [], "domains": []}
 
     # ── Batch 1: periods (summary columns only) ──
-    periods_by_enrollment: dict[str, list[dict]] = defaultdict(list)
     if not is_locked:
         periods_resp = supabase_execute(
             db.table("student_subject_periods")
@@ -2384,24 +2461,18 @@ def _batch_hydrate_board_summaries(
 
         for period in periods:
             period["has_elements"] = period["id"] in periods_with_elements
-            periods_by_enrollment[period["enrollment_id"]].append(period)
+        rows["periods"] = periods
 
     # ── Batch 2: annual grades ──
-    annual_by_enrollment: dict[str, dict] = {}
-    if enrollment_ids:
-        annual_resp = supabase_execute(
-            db.table("student_annual_subject_grades")
-            .select("*")
-            .in_("enrollment_id", enrollment_ids),
-            entity="annual_grades",
-        )
-        annual_by_enrollment = {
-            row["enrollment_id"]: row for row in (annual_resp.data or [])
-        }
+    annual_resp = supabase_execute(
+        db.table("student_annual_subject_grades")
+        .select("*")
+        .in_("enrollment_id", enrollment_ids),
+        entity="annual_grades",
+    )
+    rows["annual_grades"] = annual_resp.data or []
 
-    # ── Batch 3: domain presence check (lightweight — enrollment_id only) ──
-    enrollments_with_domains: set[str] = set()
-    domains_by_enrollment: dict[str, list[dict]] = defaultdict(list)
+    # ── Batch 3: domain presence check ──
     if not is_locked:
         domains_resp = supabase_execute(
             db.table("subject_evaluation_domains")
@@ -2410,32 +2481,97 @@ def _batch_hydrate_board_summaries(
             .order("sort_order", desc=False),
             entity="domains",
         )
-        for row in (domains_resp.data or []):
-            enrollments_with_domains.add(row["enrollment_id"])
-            domains_by_enrollment[row["enrollment_id"]].append(
-                {
-                    **row,
-                    "elements": [],
-                }
-            )
+        rows["domains"] = domains_resp.data or []
+
+    return rows
+
+
+def _batch_hydrate_board_summaries(
+    db: Client,
+    enrollments: list[dict],
+    settings: dict,
+    *,
+    rows: dict[str, list[dict]] | None = None,
+) -> list[dict]:
+    """Batch hydration for the board list view (calendar pattern).
+
+    Groups periods, annual grades and domains per enrollment. `rows` is the
+    prefetched payload from the `get_grade_board` RPC; without it the rows
+    are batch-fetched with one query per type. Full domain and element data
+    is loaded on demand via the dedicated per-enrollment and per-period
+    endpoints.
+    """
+    enrollment_ids = [e["id"] for e in enrollments]
+    if not enrollment_ids:
+        return []
+
+    is_locked = bool(settings.get("is_locked"))
+    if rows is None:
+        rows = _fetch_board_summary_rows(db, enrollment_ids, is_locked=is_locked)
+
+    periods_by_enrollment: dict[str, list[dict]] = defaultdict(list)
+    for period in rows.get("periods") or []:
+        periods_by_enrollment[period["enrollment_id"]].append(period)
+
+    annual_by_enrollment: dict[str, dict] = {
+        row["enrollment_id"]: row for row in (rows.get("annual_grades") or [])
+    }
+
+    enrollments_with_domains: set[str] = set()
+    domains_by_enrollment: dict[str, list[dict]] = defaultdict(list)
+    for row in rows.get("domains") or []:
+        enrollments_with_domains.add(row["enrollment_id"])
+        domains_by_enrollment[row["enrollment_id"]].append(
+            {
+                **row,
+                "elements": [],
+            }
+        )
 
     # ── Backfill: recalculate missing annual grades ──
     # Ensures data consistency for enrollments that have period grades
     # but were created before automatic annual-grade recalculation.
+    # Periods and cumulative weights are already in hand, so the missing
+    # rows are derived in memory and written with a single bulk upsert.
     if not is_locked:
+        backfill_rows: list[dict] = []
         for enrollment in enrollments:
             eid = enrollment["id"]
-            if eid not in annual_by_enrollment:
-                periods_for = periods_by_enrollment.get(eid, [])
-                has_any_grade = any(
-                    p.get("pauta_grade") is not None
-                    or p.get("cumulative_grade") is not None
-                    for p in periods_for
+            if eid in annual_by_enrollment:
+                continue
+            resolved = _resolve_annual_from_periods(
+                periods_by_enrollment.get(eid, []),
+                enrollment.get("cumulative_weights"),
+            )
+            if resolved is None:
+                continue
+            raw_annual, annual_grade = resolved
+            backfill_rows.append(
+                {
+                    "enrollment_id": eid,
+                    "raw_annual": str(raw_annual),
+                    "annual_grade": annual_grade,
+                    "is_locked": False,
+                }
+            )
+        if backfill_rows:
+            # Upsert: a concurrent board load may have written the same rows.
+            # The backfill is best-effort and must never fail the read.
+            try:
+                backfill_resp = supabase_execute(
+                    db.table("student_annual_subject_grades")
+                    .upsert(backfill_rows, on_conflict="enrollment_id"),
+                    entity="annual_grades",
+                )
+            except Exception:
+                logger.warning(
+                    "Failed to backfill annual grades for %d enrollments",
+                    len(backfill_rows),
+                    exc_info=True,
                 )
-                if has_any_grade:
-                    result = _try_recalculate_annual(db, eid)
-                    if result:
-                        annual_by_enrollment[eid] = result
+            else:
+                for row in backfill_resp.data or []:
+                    annual_by_enrollment[row["enrollment_id"]] = row
 
     # ── Assemble subjects ──
     return [
@@ -2450,6 +2586,24 @@ def _batch_hydrate_board_summaries(
     ]
 
 
+def _fetch_board_via_rpc(db: Client, student_id: str, academic_year: str) -> Optional[dict]:
+    """Fetch settings, enrollments and board summary rows in one round-trip.
+
+    The `get_grade_board` RPC assembles the raw rows server-side as a single
+    JSON document; hydration and the annual backfill stay in Python. Returns
+    None when the RPC is unavailable so callers use the per-table queries.
+    """
+    try:
+        resp = db.rpc(
+            "get_grade_board",
+            {"p_student_id": student_id, "p_academic_year": academic_year},
+        ).execute()
+    except Exception:
+        logger.exception("RPC get_grade_board failed, falling back")
+        return None
+    return resp.data or {}
+
+
 def get_board_data(db: Client, student_id: str, academic_year: str) -> dict:
     """Get board data: settings + subjects with period summaries + annual grades.
 
@@ -2457,6 +2611,15 @@ def get_board_data(db: Client, student_id: str, academic_year: str) -> dict:
     data only. Full domain data and element details are fetched on demand via
     GET /enrollments/{id}/domains and GET /periods/{id}/elements.
     """
+    board = _fetch_board_via_rpc(db, student_id, academic_year)
+    if board is not None:
+        settings = board.get("settings")
+        if not settings:
+            return {"settings": None, "subjects": []}
+        enrollments = _hydrate_enrollment_subjects(board.get("enrollments") or [])
+        subjects = _batch_hydrate_board_summaries(db, enrollments, settings, rows=board)
+        return {"settings": settings, "subjects": subjects}
+
     settings = get_settings(db, student_id, academic_year)
     if not settings:
         return {"settings": None, "subjects": []}
@@ -2524,34 +2687,18 @@ def update_annual_grade(
         )
     enrollment_id = enrollment_resp.data[0]["id"]
 
-    # Upsert annual grade
-    existing_resp = supabase_execute(
-        db.table("student_annual_subject_grades")
-        .select("id")
-        .eq("enrollment_id", enrollment_id)
-        .limit(1),
-        entity="annual_grade",
-    )
-
+    # Upsert annual grade (is_locked is left to the column default on insert
+    # and untouched on update)
     annual_data = {
         "enrollment_id": enrollment_id,
         "raw_annual": str(annual_grade),
         "annual_grade": annual_grade,
     }
-
-    if existing_resp.data:
-        resp = supabase_execute(
-            db.table("student_annual_subject_grades")
-            .update(annual_data)
-            .eq("id", existing_resp.data[0]["id"]),
-            entity="annual_grade",
-        )
-    else:
-        annual_data["is_locked"] = False
-        resp = supabase_execute(
-            db.table("student_annual_subject_grades").insert(annual_data),
-            entity="annual_grade",
-        )
+    resp = supabase_execute(
+        db.table("student_annual_subject_grades")
+        .upsert(annual_data, on_conflict="enrollment_id"),
+        entity="annual_grade",
+    )
 
     updated = parse_single_or_404(resp, entity="annual_grade")
     return _build_annual_grade_mutation_result(
@@ -2567,13 +2714,17 @@ def update_annual_grade(
 
 
 def _compute_cif(annual_grades: list[int]) -> tuple[Decimal, int]:
-    """Compute CIF from annual grades across years."""
+    """Compute CIF from annual grades across years.
+
+    Annual grades are integers, so the sum and the half-up rounding are done
+    in integer arithmetic; only the returned raw value is a Decimal.
+    """
     n = len(annual_grades)
     if n == 0:
         raise ValueError("No annual grades")
-    total = sum(_dec(g) for g in annual_grades)
-    cif_raw = total / Decimal(str(n))
-    cif_grade = _round_half_up(cif_raw)
+    total = sum(int(g) for g in annual_grades)
+    cif_raw = Decimal(total) / Decimal(n)
+    cif_grade = _div_round_half_up(total, n)
     return cif_raw, cif_grade
 
 
@@ -2596,11 +2747,45 @@ def _compute_cfd(
     if exam_grade_raw is None or exam_weight is None:
         return _dec(cif_grade), cif_grade
 
-    ce = _dec(exam_grade_raw) / Decimal("10")  # 145 → 14.5
-    internal_weight = Decimal("100") - exam_weight
-    cfd_raw = (_dec(cif_grade) * internal_weight + ce * exam_weight) / Decimal("100")
-    cfd_grade = _round_half_up(cfd_raw)
-    return cfd_raw, cfd_grade
+    weight_hundredths = _to_hundredths(exam_weight)
+    if weight_hundredths is None or not 0 <= weight_hundredths <= 10000:
+        ce = _dec(exam_grade_raw) / _D10  # 145 → 14.5
+        internal_weight = _D100 - exam_weight
+        cfd_raw = (_dec(cif_grade) * internal_weight + ce * exam_weight) / _D100
+        return cfd_raw, _round_half_up(cfd_raw)
+
+    # Fixed point in 1/100000ths: CIF × (100 - w) / 100 + (raw / 10) × w / 100
+    # with w expressed in hundredths of a percent.
+    scaled = (
+        int(cif_grade) * (10000 - weight_hundredths) * 10
+        + int(exam_grade_raw) * weight_hundredths
+    )
+    return Decimal(scaled) / Decimal(100000), _div_round_half_up(scaled, 100000)
+
+
+def _compute_basico_cfd(
+    cif_grade,
+    exam_level,
+    exam_weight,
+) -> tuple[Decimal, int]:
+    """Blend a Básico CIF (1-5) with the Prova Final level by exam weight (%)."""
+    cif = _dec(cif_grade)
+    level = _dec(exam_level)
+    weight = _dec(exam_weight)
+    weight_hundredths = _to_hundredths(weight)
+    if (
+        weight_hundredths is None
+        or not 0 <= weight_hundredths <= 10000
+        or cif != cif.to_integral_value()
+        or level != level.to_integral_value()
+    ):
+        cfd_raw = (cif * (_D100 - weight) + level * weight) / _D100
+        return cfd_raw, _round_half_up(cfd_raw)
+
+    # Fixed point in 1/10000ths: CIF × (100 - w) / 100 + level × w / 100
+    # with w expressed in hundredths of a percent.
+    scaled = int(cif) * (10000 - weight_hundredths) + int(level) * weight_hundredths
+    return Decimal(scaled) / Decimal(10000), _div_round_half_up(scaled, 10000)
 
 
 def _resolve_default_exam_weight(
@@ -2608,39 +2793,98 @@ def _resolve_default_exam_weight(
     education_level: str,
 ) -> Decimal:
     if education_level == "basico_3_ciclo":
-        return Decimal("30")
-    return Decimal("25")
+        return _D30
+    return _D25
 
 
 # ── CFS Dashboard ────────────────────────────────────────────
 
 
-def get_cfs_dashboard(db: Client, student_id: str) -> dict:
-    """Get CFS dashboard data: all CFDs across all years."""
-    settings_resp = supabase_execute(
-        db.table("student_grade_settings")
-        .select("*")
-        .eq("student_id", student_id)
-        .order("academic_year", desc=True)
-        .limit(1),
-        entity="settings",
-    )
-    settings = settings_resp.data[0] if settings_resp.data else None
+def get_cfs_dashboard(
+    db: Client,
+    student_id: str,
+    *,
+    include_snapshot: bool = True,
+) -> dict:
+    """Get CFS dashboard data: all CFDs across all years.
 
-    enrollments = _list_enrollment_rows(db, student_id, active_only=True)
-    enrollment_ids = [enrollment["id"] for enrollment in enrollments]
+    The reads are independent of each other within each phase, so they are
+    issued concurrently to overlap PostgREST round-trips: settings,
+    enrollments and the latest snapshot first, then annual grades and stored
+    CFDs for those enrollments.
 
-    annual_grade_map: dict[str, dict] = {}
-    if enrollment_ids:
-        annual_resp = supabase_execute(
-            db.table("student_annual_subject_grades")
+    Internal callers that only need the computed CFDs pass
+    `include_snapshot=False` to skip the snapshot read (`snapshot` is None).
+    """
+    with ThreadPoolExecutor(max_workers=_CFS_DASHBOARD_READ_WORKERS) as pool:
+        settings_future = pool.submit(
+            supabase_execute,
+            db.table("student_grade_settings")
             .select("*")
-            .in_("enrollment_id", enrollment_ids),
-            entity="annual_grades",
+            .eq("student_id", student_id)
+            .order("academic_year", desc=True)
+            .limit(1),
+            entity="settings",
+        )
+        snapshot_future = None
+        if include_snapshot:
+            snapshot_future = pool.submit(
+                supabase_execute,
+                db.table("student_cfs_snapshot")
+                .select("*")
+                .eq("student_id", student_id)
+                .order("created_at", desc=True)
+                .limit(1),
+                entity="snapshot",
+            )
+        enrollments_future = pool.submit(
+            _list_enrollment_rows, db, student_id, active_only=True
         )
-        annual_grade_map = {
-            row["enrollment_id"]: row for row in (annual_resp.data or [])
-        }
+        enrollments = enrollments_future.result()
+        enrollment_ids = [enrollment["id"] for enrollment in enrollments]
+
+        subject_enrollments: dict[str, list[dict]] = defaultdict(list)
+        for enrollment in enrollments:
+            subject_enrollments[enrollment["subject_id"]].append(enrollment)
+
+        annual_future = None
+        if enrollment_ids:
+            annual_future = pool.submit(
+                supabase_execute,
+                db.table("student_annual_subject_grades")
+                .select("*")
+                .in_("enrollment_id", enrollment_ids),
+                entity="annual_grades",
+            )
+
+        # One query for every CFD the dashboard can show, filtered server-side
+        # to the enrolled subjects and years instead of all of the student's rows.
+        existing_cfds_future = None
+        if enrollments:
+            terminal_years = {enrollment["academic_year"] for enrollment in enrollments}
+            existing_cfds_future = pool.submit(
+                supabase_execute,
+                db.table("student_subject_cfd")
+                .select("*")
+                .eq("student_id", student_id)
+                .in_("subject_id", list(subject_enrollments))
+                .in_("academic_year", sorted(terminal_years)),
+                entity="cfds",
+            )
+
+        settings_resp = settings_future.result()
+        snap_resp = snapshot_future.result() if snapshot_future else None
+        annual_resp = annual_future.result() if annual_future else None
+        existing_cfds_resp = existing_cfds_future.result() if existing_cfds_future else None
+
+    settings = settings_resp.data[0] if settings_resp.data else None
+    annual_grade_map: dict[str, dict] = {
+        row["enrollment_id"]: row for row in ((annual_resp.data if annual_resp else None) or [])
+    }
+    existing_cfds_map: dict[tuple[str, str], dict] = {
+        (row["subject_id"], row["academic_year"]): _normalize_existing_cfd(db, row)
+        for row in ((existing_cfds_resp.data if existing_cfds_resp else None) or [])
+    }
 
     # For enrollments without annual grades, get latest period grade.
     # The last period (3º período / 2º semestre) IS the definitive internal grade.
@@ -2668,25 +2912,6 @@ def get_cfs_dashboard(db: Client, student_id: str) -> dict:
                     "is_provisional": not is_last_period,
                 }
 
-    existing_cfds_map: dict[tuple[str, str], dict] = {}
-    if enrollments:
-        terminal_years = {enrollment["academic_year"] for enrollment in enrollments}
-        existing_cfds_resp = supabase_execute(
-            db.table("student_subject_cfd")
-            .select("*")
-            .eq("student_id", student_id),
-            entity="cfds",
-        )
-        existing_cfds_map = {
-            (row["subject_id"], row["academic_year"]): _normalize_existing_cfd(db, row)
-            for row in (existing_cfds_resp.data or [])
-            if row.get("academic_year") in terminal_years
-        }
-
-    subject_enrollments: dict[str, list[dict]] = defaultdict(list)
-    for enrollment in enrollments:
-        subject_enrollments[enrollment["subject_id"]].append(enrollment)
-
     cfds = []
     for subject_id, enrs in subject_enrollments.items():
         enrs = sorted(enrs, key=lambda row: row["academic_year"])
@@ -2754,9 +2979,7 @@ def get_cfs_dashboard(db: Client, student_id: str) -> dict:
                     weight = exam_weight or _resolve_default_exam_weight(
                         education_level=education_level
                     )
-                    internal_weight = Decimal("100") - weight
-                    cfd_raw = (_dec(cif_grade) * internal_weight + _dec(exam_level) * weight) / Decimal("100")
-                    cfd_grade = _round_half_up(cfd_raw)
+                    cfd_raw, cfd_grade = _compute_basico_cfd(cif_grade, exam_level, weight)
                 else:
                     cfd_raw, cfd_grade = _dec(cif_grade), cif_grade
             else:
@@ -2817,18 +3040,9 @@ def get_cfs_dashboard(db: Client, student_id: str) -> dict:
             settings.get("graduation_cohort_year"),
         )
 
-    # Get existing snapshot
     snapshot = None
-    if settings:
-        snap_resp = supabase_execute(
-            db.table("student_cfs_snapshot")
-            .select("*")
-            .eq("student_id", student_id)
-            .order("created_at", desc=True)
-            .limit(1),
-            entity="snapshot",
-        )
-        snapshot = snap_resp.data[0] if snap_resp.data else None
+    if settings and snap_resp and snap_resp.data:
+        snapshot = snap_resp.data[0]
 
     return {
         "settings": settings,
@@ -2861,7 +3075,7 @@ def _build_enrollment_mutation_result(
     student_id: str,
     enrollment: dict,
 ) -> dict:
-    dashboard = get_cfs_dashboard(db, student_id)
+    dashboard = get_cfs_dashboard(db, student_id, include_snapshot=False)
     cfd = _find_dashboard_cfd(
         dashboard,
         subject_id=enrollment["subject_id"],
@@ -2883,7 +3097,7 @@ def _build_annual_grade_mutation_result(
     subject_id: str,
     academic_year: str,
 ) -> dict:
-    dashboard = get_cfs_dashboard(db, student_id)
+    dashboard = get_cfs_dashboard(db, student_id, include_snapshot=False)
     return {
         "annual_grade": annual_grade,
         "cfd": _find_dashboard_cfd(
@@ -2903,7 +3117,7 @@ def _build_exam_mutation_result(
     subject_id: str,
     academic_year: str,
 ) -> dict:
-    dashboard = get_cfs_dashboard(db, student_id)
+    dashboard = get_cfs_dashboard(db, student_id, include_snapshot=False)
     cfd = _find_dashboard_cfd(
         dashboard,
         subject_id=subject_id,
@@ -2937,7 +3151,7 @@ def _ensure_cfd_record(
     if existing_resp.data:
         return _normalize_existing_cfd(db, existing_resp.data[0])
 
-    dashboard = get_cfs_dashboard(db, student_id)
+    dashboard = get_cfs_dashboard(db, student_id, include_snapshot=False)
     computed_cfd = _find_dashboard_cfd(
         dashboard,
         subject_id=subject_id,
@@ -3000,28 +3214,23 @@ def _compute_cfs_value(
     From the 2026 graduation cohort onward: weighted mean
     (triennial ×3, biennial ×2, annual ×1).
     """
-    eligible = [c for c in cfds if c.get("affects_cfs", True) and c.get("cfd_grade") is not None]
-    if not eligible:
-        return None, None
-
     use_weighted = cohort_year is not None and cohort_year >= 2026
 
-    if use_weighted:
-        numerator = Decimal("0")
-        denominator = Decimal("0")
-        for c in eligible:
-            dur = _dec(c.get("duration_years", 1))
-            numerator += _dec(c["cfd_grade"]) * dur
-            denominator += dur
-        if denominator == 0:
-            return None, None
-        cfs_raw = numerator / denominator
-    else:
-        total = sum(_dec(c["cfd_grade"]) for c in eligible)
-        cfs_raw = total / Decimal(str(len(eligible)))
+    # CFD grades and durations are integers: filter and accumulate exactly in
+    # ints in a single pass, then truncate to one decimal with floor division.
+    numerator = 0
+    denominator = 0
+    for c in cfds:
+        if not c.get("affects_cfs", True) or c.get("cfd_grade") is None:
+            continue
+        weight = int(c.get("duration_years") or 1) if use_weighted else 1
+        numerator += int(c["cfd_grade"]) * weight
+        denominator += weight
+    if denominator == 0:
+        return None, None
 
-    cfs_value = _truncate_one_decimal(cfs_raw)
-    dges_value = round(cfs_value * 10)
+    dges_value = numerator * 10 // denominator
+    cfs_value = dges_value / 10
     return cfs_value, dges_value
 
 
@@ -3053,7 +3262,7 @@ def update_exam_grade(
         exam_weight = float(_resolve_default_exam_weight(education_level="secundario"))
 
     exam_grade_20 = (
-        _round_half_up(_dec(raw_200) / Decimal("10"))
+        _round_half_up(_dec(raw_200) / _D10)
         if raw_200 is not None
         else cfd.get("exam_grade")
     )
@@ -3078,17 +3287,16 @@ def update_exam_grade(
     )
 
 
+# Prova Final level for every percentage 0-100 (thresholds 20/50/70/90).
+_LEVEL_TABLE = tuple(
+    5 if s >= 90 else 4 if s >= 70 else 3 if s >= 50 else 2 if s >= 20 else 1
+    for s in range(101)
+)
+
+
 def _convert_percentage_to_level(score: int) -> int:
     """Convert a Prova Final percentage (0-100) to level (1-5) using standard thresholds."""
-    if score >= 90:
-        return 5
-    if score >= 70:
-        return 4
-    if score >= 50:
-        return 3
-    if score >= 20:
-        return 2
-    return 1
+    return _LEVEL_TABLE[max(0, min(100, score))]
 
 
 def update_basico_exam_grade(
@@ -3126,10 +3334,7 @@ def update_basico_exam_grade(
 
     # Recalculate CFD with editable exam weight
     cif_grade = cfd.get("cif_grade", 0)
-    weight = _dec(exam_weight)
-    internal_weight = Decimal("100") - weight
-    cfd_raw = (_dec(cif_grade) * internal_weight + _dec(exam_level) * weight) / Decimal("100")
-    cfd_grade = _round_half_up(cfd_raw)
+    cfd_raw, cfd_grade = _compute_basico_cfd(cif_grade, exam_level, exam_weight)
 
     update_data = {
         "exam_grade": exam_level,
@@ -3155,7 +3360,7 @@ def update_basico_exam_grade(
 
 def create_cfs_snapshot(db: Client, student_id: str, academic_year: str) -> dict:
     """Finalize and snapshot the CFS."""
-    dashboard = get_cfs_dashboard(db, student_id)
+    dashboard = get_cfs_dashboard(db, student_id, include_snapshot=False)
 
     settings = dashboard.get("settings")
     if not settings:
@@ -3201,38 +3406,26 @@ def create_cfs_snapshot(db: Client, student_id: str, academic_year: str) -> dict
         "is_finalized": True,
     }
 
-    # Upsert
-    existing_resp = supabase_execute(
+    # Upsert (unique on student_id + academic_year)
+    resp = supabase_execute(
         db.table("student_cfs_snapshot")
-        .select("id")
-        .eq("student_id", student_id)
-        .eq("academic_year", academic_year)
-        .limit(1),
+        .upsert(snapshot_data, on_conflict="student_id,academic_year"),
         entity="snapshot",
     )
 
-    if existing_resp.data:
-        resp = supabase_execute(
-            db.table("student_cfs_snapshot")
-            .update(snapshot_data)
-            .eq("id", existing_resp.data[0]["id"]),
-            entity="snapshot",
-        )
-    else:
-        resp = supabase_execute(
-            db.table("student_cfs_snapshot").insert(snapshot_data),
-            entity="snapshot",
-        )
-
-    # Finalize all CFDs
-    for c in cfds:
-        if c.get("id"):
-            try:
-                db.table("student_subject_cfd").update(
-                    {"is_finalized": True}
-                ).eq("id", c["id"]).execute()
-            except Exception:
-                logger.warning("Failed to finalize CFD %s", c.get("id"))
+    # Finalize all persisted CFDs in one UPDATE (virtual CFDs have no row)
+    cfd_ids = [
+        c["id"]
+        for c in cfds
+        if c.get("id") and not c["id"].startswith(_VIRTUAL_CFD_PREFIX)
+    ]
+    if cfd_ids:
+        try:
+            db.table("student_subject_cfd").update(
+                {"is_finalized": True}
+            ).in_("id", cfd_ids).execute()
+        except Exception:
+            logger.warning("Failed to finalize CFDs %s", cfd_ids)
 
     return parse_single_or_404(resp, entity="snapshot")
 
@@ -3306,12 +3499,12 @@ def replace_domains(
     # Validate column sums: for each period, sum of period_weights across
     # domains with weight > 0 must equal 100
     for period_idx in range(num_periods):
-        col_sum = Decimal("0")
+        col_sum = _D0
         for domain_in in payload.domains:
             w = _dec(domain_in.period_weights[period_idx])
-            if w > Decimal("0"):
+            if w > _D0:
                 col_sum += w
-        if col_sum != Decimal("100"):
+        if col_sum != _D100:
             raise HTTPException(
                 status_code=400,
                 detail=f"Period {period_idx + 1}: domain weights must sum to 100, got {float(col_sum)}",
@@ -3333,7 +3526,7 @@ def replace_domains(
             custom_weight_elems = [e for e in elems if e.weight_percentage is not None]
             if custom_weight_elems:
                 wp_sum = sum(_dec(e.weight_percentage) for e in custom_weight_elems)
-                if wp_sum != Decimal("100"):
+                if wp_sum != _D100:
                     raise HTTPException(
                         status_code=400,
                         detail=f"Domain '{domain_in.label}', period {pn}: element weight_percentages "
@@ -3348,7 +3541,7 @@ def replace_domains(
                 detail=f"cumulative_weights must have {num_periods} rows, got {len(weights)}",
             )
 
-        if len(weights[0]) != 1 or _dec(weights[0][0]) != Decimal("100"):
+        if len(weights[0]) != 1 or _dec(weights[0][0]) != _D100:
             raise HTTPException(
                 status_code=400,
                 detail="Row 0 must be [100]",
@@ -3361,7 +3554,7 @@ def replace_domains(
                     detail=f"Row {i} must have {i + 1} values, got {len(row)}",
                 )
             row_sum = sum(_dec(v) for v in row)
-            if row_sum != Decimal("100"):
+            if row_sum != _D100:
                 raise HTTPException(
                     status_code=400,
                     detail=f"Row {i} must sum to 100, got {float(row_sum)}",
@@ -3376,6 +3569,9 @@ def replace_domains(
     )
 
     # ── Insert new domains + elements ──
+    # The inserts return the stored rows, so the response is assembled from
+    # them instead of re-reading domains and elements afterwards.
+    domains_out: list[dict] = []
     for sort_order, domain_in in enumerate(payload.domains):
         domain_data = {
             "enrollment_id": enrollment_id,
@@ -3403,10 +3599,16 @@ def replace_domains(
                 }
                 for e in domain_in.elements
             ]
-            supabase_execute(
+            elems_resp = supabase_execute(
                 db.table("subject_evaluation_elements").insert(elem_rows),
                 entity="elements",
             )
+            domain["elements"] = sorted(
+                elems_resp.data or [], key=lambda e: e["period_number"]
+            )
+        else:
+            domain["elements"] = []
+        domains_out.append(domain)
 
     if payload.cumulative_weights is not None:
         supabase_execute(
@@ -3429,8 +3631,6 @@ def replace_domains(
         recalculate_period_grade(db, p["id"])
 
     # ── Build response ──
-    domains_out = get_domains(db, student_id, enrollment_id)
-
     # Fetch updated periods
     updated_periods_resp = supabase_execute(
         db.table("student_subject_periods")
@@ -3480,7 +3680,7 @@ def update_cumulative_weights(
             )
 
         # Row 0 must be [100]
-        if len(weights[0]) != 1 or _dec(weights[0][0]) != Decimal("100"):
+        if len(weights[0]) != 1 or _dec(weights[0][0]) != _D100:
             raise HTTPException(
                 status_code=400,
                 detail="Row 0 must be [100]",
@@ -3493,7 +3693,7 @@ def update_cumulative_weights(
                     detail=f"Row {i} must have {i + 1} values, got {len(row)}",
                 )
             row_sum = sum(_dec(v) for v in row)
-            if row_sum != Decimal("100"):
+            if row_sum != _D100:
                 raise HTTPException(
                     status_code=400,
                     detail=f"Row {i} must sum to 100, got {float(row_sum)}",
@@ -9,15 +9,19 @@ Flow:
 
 from __future__ import annotations
 
+import logging
 import re
-import unicodedata
+from functools import lru_cache
+from operator import itemgetter
 from typing import Optional
 
 from supabase import Client
 
-from app.api.http.services.subject_service import get_subjects_for_org
+from app.api.http.services.subject_service import get_subjects_for_org, normalize_subject_text
 from app.utils.db import parse_single_or_404, supabase_execute
 
+logger = logging.getLogger(__name__)
+
 EDUCATION_LEVEL_ORDER = [
     "basico_1_ciclo",
     "basico_2_ciclo",
@@ -34,27 +38,36 @@ EDUCATION_LEVEL_LABELS = {
     "superior": "Superior",
 }
 
+# Columns read by _map_base_note_row; base_content rows carry multi-KB
+# content_json, so avoid pulling anything the response does not use.
+BASE_NOTE_SELECT = (
+    "id,curriculum_id,content_json,word_count,average_read_time,created_at,updated_at"
+)
+
+_DIGITS_RE = re.compile(r"\d+")
 
-def _normalize_text(value: str | None) -> str:
-    if not value:
-        return ""
-    lowered = str(value).strip().casefold()
-    return "".join(
-        ch for ch in unicodedata.normalize("NFD", lowered) if unicodedata.category(ch) != "Mn"
-    )
+
+def _normalized_column(subject: dict, field: str) -> str:
+    """Prefer the stored ``norm_<field>`` column, else normalize here."""
+    stored = subject.get(f"norm_{field}")
+    if stored is not None:
+        return stored
+    return normalize_subject_text(subject.get(field))
 
 
 def _extract_grade_level(raw_grade_level: str | None) -> Optional[str]:
     if not raw_grade_level:
         return None
-    match = re.search(r"\d+", raw_grade_level)
+    match = _DIGITS_RE.search(raw_grade_level)
     if match:
         return match.group(0)
     cleaned = str(raw_grade_level).strip()
     return cleaned or None
 
 
-def _selected_subject_inputs(current_user: dict) -> tuple[set[str], set[str], list[str]]:
+def _selected_subject_inputs(
+    current_user: dict,
+) -> tuple[set[str], frozenset[str], list[str]]:
     selected_subject_ids = {
         str(item).strip()
         for item in (current_user.get("subject_ids") or [])
@@ -65,7 +78,7 @@ def _selected_subject_inputs(current_user: dict) -> tuple[set[str], set[str], li
         for item in (current_user.get("subjects_taught") or [])
         if str(item).strip()
     ]
-    selected_refs_normalized = {_normalize_text(item) for item in selected_refs_raw}
+    selected_refs_normalized = frozenset(normalize_subject_text(item) for item in selected_refs_raw)
     return selected_subject_ids, selected_refs_normalized, selected_refs_raw
 
 
@@ -73,16 +86,19 @@ def _is_selected_subject(
     subject: dict,
     *,
     selected_subject_ids: set[str],
-    selected_subject_refs: set[str],
+    selected_subject_refs: frozenset[str],
+    normalized_name: str | None = None,
 ) -> bool:
     subject_id = str(subject.get("id") or "").strip()
     if subject_id and subject_id in selected_subject_ids:
         return True
 
+    if normalized_name is None:
+        normalized_name = _normalized_column(subject, "name")
     subject_tokens = {
-        _normalize_text(subject_id),
-        _normalize_text(subject.get("slug")),
-        _normalize_text(subject.get("name")),
+        normalize_subject_text(subject_id),
+        _normalized_column(subject, "slug"),
+        normalized_name,
     }
     return any(token and token in selected_subject_refs for token in subject_tokens)
 
@@ -95,14 +111,17 @@ def _resolve_selected_grade(grade_levels: list[str], profile_grade: str | None)
     return None
 
 
+@lru_cache(maxsize=64)
 def _education_label(level: str | None) -> str:
     if not level:
         return "Other"
     return EDUCATION_LEVEL_LABELS.get(level, level.replace("_", " ").title())
 
 
-def _subject_sort_key(subject: dict) -> tuple:
-    return (_normalize_text(subject.get("name")), str(subject.get("id") or ""))
+def _sorted_by_key(entries: list[tuple[tuple, dict]]) -> list[dict]:
+    """Order (sort_key, item) pairs by their precomputed key and drop the keys."""
+    entries.sort(key=itemgetter(0))
+    return [item for _, item in entries]
 
 
 def build_subject_catalog(subjects: list[dict], current_user: dict) -> dict:
@@ -116,16 +135,23 @@ def build_subject_catalog(subjects: list[dict], current_user: dict) -> dict:
     profile_grade = _extract_grade_level(current_user.get("grade_level"))
     selected_ids, selected_refs, selected_refs_raw = _selected_subject_inputs(current_user)
 
-    selected_subjects: list[dict] = []
-    non_selected_custom: list[dict] = []
-    grouped_global: dict[str, list[dict]] = {}
+    # Items are collected with their sort key (normalized name, id), computed
+    # once per subject and shared with the selection check.
+    selected_entries: list[tuple[tuple, dict]] = []
+    custom_entries: list[tuple[tuple, dict]] = []
+    grouped_entries: dict[str, list[tuple[tuple, dict]]] = {}
+    # New profiles have no selections: skip the per-row token matching.
+    has_selections = bool(selected_ids or selected_refs)
 
     for row in subjects:
         grade_levels = [str(item) for item in (row.get("grade_levels") or [])]
-        is_selected = _is_selected_subject(
+        normalized_name = _normalized_column(row, "name")
+        sort_key = (normalized_name, str(row.get("id") or ""))
+        is_selected = has_selections and _is_selected_subject(
             row,
             selected_subject_ids=selected_ids,
             selected_subject_refs=selected_refs,
+            normalized_name=normalized_name,
         )
         item = {
             "id": str(row.get("id")),
@@ -146,41 +172,35 @@ def build_subject_catalog(subjects: list[dict], current_user: dict) -> dict:
         }
 
         if is_selected:
-            selected_subjects.append(item)
+            selected_entries.append((sort_key, item))
             continue
 
         if item["is_custom"]:
-            non_selected_custom.append(item)
+            custom_entries.append((sort_key, item))
             continue
 
         level = str(item.get("education_level") or "other")
-        grouped_global.setdefault(level, []).append(item)
+        grouped_entries.setdefault(level, []).append((sort_key, item))
 
-    selected_subjects.sort(key=_subject_sort_key)
-    non_selected_custom.sort(key=_subject_sort_key)
-    for level_subjects in grouped_global.values():
-        level_subjects.sort(key=_subject_sort_key)
+    selected_subjects = _sorted_by_key(selected_entries)
+    non_selected_custom = _sorted_by_key(custom_entries)
 
-    known_groups = [
-        {
-            "education_level": level,
-            "education_level_label": _education_label(level),
-            "subjects": grouped_global[level],
-        }
+    # Known levels in canonical order, then whatever is left alphabetically.
+    ordered_levels = [
+        (level, grouped_entries.pop(level))
         for level in EDUCATION_LEVEL_ORDER
-        if grouped_global.get(level)
+        if level in grouped_entries
     ]
-    extra_levels = sorted(
-        [level for level in grouped_global.keys() if level not in EDUCATION_LEVEL_ORDER],
-        key=_normalize_text,
+    ordered_levels += sorted(
+        grouped_entries.items(), key=lambda level_entries: normalize_subject_text(level_entries[0])
     )
-    extra_groups = [
+    level_groups = [
         {
             "education_level": level,
             "education_level_label": _education_label(level),
-            "subjects": grouped_global[level],
+            "subjects": _sorted_by_key(entries),
         }
-        for level in extra_levels
+        for level, entries in ordered_levels
     ]
 
     return {
@@ -194,14 +214,14 @@ def build_subject_catalog(subjects: list[dict], current_user: dict) -> dict:
         "selected_subjects": selected_subjects,
         "more_subjects": {
             "custom": non_selected_custom,
-            "by_education_level": known_groups + extra_groups,
+            "by_education_level": level_groups,
         },
     }
 
 
 def list_base_subject_catalog(db: Client, current_user: dict) -> dict:
     org_id = str(current_user["organization_id"])
-    subjects = get_subjects_for_org(db, org_id)
+    subjects = get_subjects_for_org(db, org_id, include_normalized=True)
     return build_subject_catalog(subjects, current_user)
 
 
@@ -224,6 +244,35 @@ def _map_curriculum_row(row: dict) -> dict:
     }
 
 
+def _fetch_curriculum_nodes_via_rpc(
+    db: Client,
+    *,
+    subject_id: str,
+    year_level: str,
+    parent_id: str | None,
+    subject_component: str | None,
+) -> dict | None:
+    """Fetch the level's nodes and the year's components in one round-trip.
+
+    Returns None when the `curriculum_nodes_and_components` RPC is
+    unavailable so the caller falls back to the two table queries.
+    """
+    try:
+        response = db.rpc(
+            "curriculum_nodes_and_components",
+            {
+                "p_subject_id": subject_id,
+                "p_year_level": year_level,
+                "p_parent_id": parent_id,
+                "p_subject_component": subject_component or None,
+            },
+        ).execute()
+    except Exception:
+        logger.exception("RPC curriculum_nodes_and_components failed, falling back")
+        return None
+    return response.data or {}
+
+
 def list_curriculum_nodes(
     db: Client,
     *,
@@ -232,6 +281,45 @@ def list_curriculum_nodes(
     parent_id: str | None = None,
     subject_component: str | None = None,
 ) -> dict:
+    payload = _fetch_curriculum_nodes_via_rpc(
+        db,
+        subject_id=subject_id,
+        year_level=year_level,
+        parent_id=parent_id,
+        subject_component=subject_component,
+    )
+    if payload is not None:
+        rows = payload.get("nodes") or []
+        available_components = [
+            str(component) for component in (payload.get("available_components") or [])
+        ]
+    else:
+        rows, available_components = _query_curriculum_nodes(
+            db,
+            subject_id=subject_id,
+            year_level=year_level,
+            parent_id=parent_id,
+            subject_component=subject_component,
+        )
+
+    return {
+        "subject_slug": None, # Deprecated/Not used
+        "year_level": year_level,
+        "parent_code": None, # Deprecated/Not used
+        "subject_component": subject_component,
+        "available_components": available_components,
+        "nodes": [_map_curriculum_row(row) for row in rows],
+    }
+
+
+def _query_curriculum_nodes(
+    db: Client,
+    *,
+    subject_id: str,
+    year_level: str,
+    parent_id: str | None,
+    subject_component: str | None,
+) -> tuple[list[dict], list[str]]:
     # Query curriculum by IDs directly
     query = (
         db.table("curriculum")
@@ -253,7 +341,17 @@ def list_curriculum_nodes(
         entity="curriculum",
     )
 
-    # Fetch available components
+    return response.data or [], _list_available_components(
+        db, subject_id=subject_id, year_level=year_level
+    )
+
+
+def _list_available_components(db: Client, *, subject_id: str, year_level: str) -> list[str]:
+    """Distinct subject components for a subject/year (table fallback).
+
+    The `curriculum_nodes_and_components` RPC deduplicates these in SQL; this
+    path only runs when that RPC is unavailable.
+    """
     components_response = supabase_execute(
         db.table("curriculum")
         .select("subject_component")
@@ -261,7 +359,7 @@ def list_curriculum_nodes(
         .eq("year_level", year_level),
         entity="curriculum components",
     )
-    available_components = sorted(
+    return sorted(
         {
             str(row.get("subject_component"))
             for row in (components_response.data or [])
@@ -269,15 +367,6 @@ def list_curriculum_nodes(
         }
     )
 
-    return {
-        "subject_slug": None, # Deprecated/Not used
-        "year_level": year_level,
-        "parent_code": None, # Deprecated/Not used
-        "subject_component": subject_component,
-        "available_components": available_components,
-        "nodes": [_map_curriculum_row(row) for row in (response.data or [])],
-    }
-
 
 def _map_base_note_row(row: dict | None) -> dict | None:
     if not row:
@@ -311,7 +400,7 @@ def _get_curriculum_by_id(db: Client, curriculum_id: str) -> dict:
 
 def _get_base_note_by_curriculum_id(db: Client, curriculum_id: str) -> dict | None:
     response = supabase_execute(
-        db.table("base_content").select("*").eq("curriculum_id", curriculum_id).limit(1),
+        db.table("base_content").select(BASE_NOTE_SELECT).eq("curriculum_id", curriculum_id).limit(1),
         entity="base note",
     )
     if not response.data:
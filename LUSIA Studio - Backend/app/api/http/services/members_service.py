@@ -6,6 +6,7 @@ from __future__ import annotations
 
 import logging
 from datetime import datetime, timedelta, timezone
+from itertools import chain
 
 from supabase import Client
 
@@ -144,6 +145,51 @@ def remove_member(db: Client, org_id: str, member_id: str) -> dict:
 # ── Student detail endpoints ──────────────────────────────────────
 
 
+_STATS_WEEKS = 12
+_WEEK_SECONDS = 7 * 24 * 3600
+
+
+def _parse_timestamp(value: str | None) -> float | None:
+    """Parse a Supabase ISO-8601 timestamp to POSIX seconds (None if invalid)."""
+    if not value:
+        return None
+    try:
+        return datetime.fromisoformat(value.replace("Z", "+00:00")).timestamp()
+    except (ValueError, TypeError):
+        return None
+
+
+def _weekly_session_counts(sessions: list[dict], since: datetime) -> list[dict]:
+    """Bucket sessions into the _STATS_WEEKS weeks starting at `since`."""
+    return _bucket_weekly_counts(
+        (_parse_timestamp(s.get("starts_at")) for s in sessions), since
+    )
+
+
+def _bucket_weekly_counts(timestamps, since: datetime) -> list[dict]:
+    """Map each parsed start time to its week index, in a single pass."""
+    counts = [0] * _STATS_WEEKS
+    since_ts = since.timestamp()
+    for ts in timestamps:
+        if ts is None:
+            continue
+        idx = int((ts - since_ts) // _WEEK_SECONDS)
+        if 0 <= idx < _STATS_WEEKS:
+            counts[idx] += 1
+
+    return _label_weekly_counts(counts, since)
+
+
+def _label_weekly_counts(counts: list[int], since: datetime) -> list[dict]:
+    return [
+        {
+            "week": (since + timedelta(weeks=i)).strftime("%d/%m"),
+            "count": count,
+        }
+        for i, count in enumerate(counts)
+    ]
+
+
 def get_member_sessions(
     db: Client,
     org_id: str,
@@ -179,10 +225,9 @@ def get_member_sessions(
     sessions = response.data or []
 
     # Hydrate subject names
-    all_subject_ids: set[str] = set()
-    for s in sessions:
-        for sid in s.get("subject_ids") or []:
-            all_subject_ids.add(sid)
+    all_subject_ids: set[str] = set(
+        chain.from_iterable(s.get("subject_ids") or [] for s in sessions)
+    )
 
     subject_map: dict[str, dict] = {}
     if all_subject_ids:
@@ -199,11 +244,9 @@ def get_member_sessions(
             pass
 
     # Hydrate session types
-    session_type_ids: set[str] = set()
-    for s in sessions:
-        st_id = s.get("session_type_id")
-        if st_id:
-            session_type_ids.add(st_id)
+    session_type_ids: set[str] = {
+        st_id for s in sessions if (st_id := s.get("session_type_id"))
+    }
 
     session_type_map: dict[str, dict] = {}
     if session_type_ids:
@@ -219,11 +262,12 @@ def get_member_sessions(
         except Exception:
             pass
 
+    get_subject = subject_map.get
     for s in sessions:
         s["subjects"] = [
-            subject_map[sid]
+            subject
             for sid in (s.get("subject_ids") or [])
-            if sid in subject_map
+            if (subject := get_subject(sid))
         ]
         st_id = s.get("session_type_id")
         s["session_type"] = session_type_map.get(st_id) if st_id else None
@@ -262,11 +306,16 @@ def get_member_assignments(
         .in_("id", assignment_ids),
         entity="assignments",
     )
-    assignment_map = {a["id"]: a for a in (assignments_resp.data or [])}
+    # For non-admin teachers, only their own assignments are visible
+    assignment_map = {
+        a["id"]: a
+        for a in (assignments_resp.data or [])
+        if role == "admin" or a.get("teacher_id") == teacher_id
+    }
 
-    # Fetch artifact types for assignments that have artifacts
+    # Fetch artifact types for visible assignments that have artifacts
     artifact_ids = list({
-        a["artifact_id"] for a in (assignments_resp.data or [])
+        a["artifact_id"] for a in assignment_map.values()
         if a.get("artifact_id")
     })
     artifact_map: dict[str, dict] = {}
@@ -284,9 +333,6 @@ def get_member_assignments(
         assignment = assignment_map.get(sa["assignment_id"])
         if not assignment:
             continue
-        # For non-admin teachers, only show their own assignments
-        if role != "admin" and assignment.get("teacher_id") != teacher_id:
-            continue
         sa["assignment_title"] = assignment.get("title")
         sa["due_date"] = assignment.get("due_date")
         sa["assignment_status"] = assignment.get("status")
@@ -297,6 +343,57 @@ def get_member_assignments(
     return result
 
 
+def _fetch_member_stats_via_rpc(
+    db: Client,
+    org_id: str,
+    member_id: str,
+    teacher_id: str,
+    role: str,
+    *,
+    month_start: datetime,
+    since: datetime,
+) -> dict | None:
+    """Aggregate the student stats server-side in one round-trip.
+
+    The `member_stats` RPC returns the counts, weekly buckets and visible
+    grades already filtered by teacher. Returns None when the RPC is
+    unavailable so the caller aggregates in Python instead.
+    """
+    try:
+        resp = db.rpc(
+            "member_stats",
+            {
+                "p_org_id": org_id,
+                "p_member_id": member_id,
+                "p_teacher_id": teacher_id,
+                "p_is_admin": role == "admin",
+                "p_month_start": month_start.isoformat(),
+                "p_since": since.isoformat(),
+                "p_weeks": _STATS_WEEKS,
+            },
+        ).execute()
+    except Exception:
+        logger.exception("RPC member_stats failed, falling back")
+        return None
+
+    data = resp.data or {}
+    total_assignments = data.get("total_assignments") or 0
+    completed = data.get("completed_assignments") or 0
+    avg_grade = data.get("average_grade")
+    return {
+        "total_sessions": data.get("total_sessions") or 0,
+        "sessions_this_month": data.get("sessions_this_month") or 0,
+        "total_assignments": total_assignments,
+        "completed_assignments": completed,
+        "average_grade": round(float(avg_grade), 1) if avg_grade is not None else None,
+        "completion_rate": round(completed / total_assignments, 2) if total_assignments else 0,
+        "weekly_sessions": _label_weekly_counts(
+            data.get("weekly_counts") or [0] * _STATS_WEEKS, since
+        ),
+        "grade_list": data.get("grade_list") or [],
+    }
+
+
 def get_member_stats(
     db: Client,
     org_id: str,
@@ -307,7 +404,19 @@ def get_member_stats(
     """Aggregate statistics for a student."""
     now = datetime.now(timezone.utc)
     month_start = now.replace(day=1, hour=0, minute=0, second=0, microsecond=0)
-    twelve_weeks_ago = now - timedelta(weeks=12)
+    twelve_weeks_ago = now - timedelta(weeks=_STATS_WEEKS)
+
+    stats = _fetch_member_stats_via_rpc(
+        db,
+        org_id,
+        member_id,
+        teacher_id,
+        role,
+        month_start=month_start,
+        since=twelve_weeks_ago,
+    )
+    if stats is not None:
+        return stats
 
     # Sessions query
     sessions_query = (
@@ -322,27 +431,15 @@ def get_member_stats(
     all_sessions = all_sessions_resp.data or []
 
     # Count sessions this month
+    month_start_iso = month_start.isoformat()
     sessions_this_month = sum(
         1
         for s in all_sessions
-        if s.get("starts_at") and s["starts_at"] >= month_start.isoformat()
+        if (starts_at := s.get("starts_at")) and starts_at >= month_start_iso
     )
 
     # Weekly session counts (last 12 weeks)
-    weekly_sessions: list[dict] = []
-    for i in range(12):
-        week_start = twelve_weeks_ago + timedelta(weeks=i)
-        week_end = week_start + timedelta(weeks=1)
-        count = sum(
-            1
-            for s in all_sessions
-            if s.get("starts_at")
-            and week_start.isoformat() <= s["starts_at"] < week_end.isoformat()
-        )
-        weekly_sessions.append({
-            "week": week_start.strftime("%d/%m"),
-            "count": count,
-        })
+    weekly_sessions = _weekly_session_counts(all_sessions, twelve_weeks_ago)
 
     # Assignments
     sa_resp = supabase_execute(
@@ -355,7 +452,9 @@ def get_member_stats(
     all_sa = sa_resp.data or []
     total_assignments = sa_resp.count or 0
 
-    # Filter by teacher if not admin
+    # Filter by teacher if not admin. The titles come along so the grade
+    # list below does not need to look the assignments up again.
+    title_map: dict[str, str] | None = None
     if role != "admin" and all_sa:
         a_ids = list({sa["assignment_id"] for sa in all_sa})
         a_resp = supabase_execute(
@@ -364,33 +463,41 @@ def get_member_stats(
             .in_("id", a_ids),
             entity="assignments",
         )
-        teacher_assignment_ids = {
-            a["id"] for a in (a_resp.data or []) if a.get("teacher_id") == teacher_id
+        title_map = {
+            a["id"]: a.get("title") or "Sem título"
+            for a in (a_resp.data or [])
+            if a.get("teacher_id") == teacher_id
         }
-        all_sa = [sa for sa in all_sa if sa["assignment_id"] in teacher_assignment_ids]
+        all_sa = [sa for sa in all_sa if sa["assignment_id"] in title_map]
         total_assignments = len(all_sa)
 
-    completed = sum(
-        1 for sa in all_sa if sa.get("status") in ("submitted", "graded")
-    )
-    graded = [sa for sa in all_sa if sa.get("grade") is not None]
-    avg_grade = (
-        round(sum(sa["grade"] for sa in graded) / len(graded), 1) if graded else None
-    )
+    # Completion and grade aggregates in a single pass
+    completed = 0
+    grade_sum = 0
+    graded: list[dict] = []
+    for sa in all_sa:
+        if sa.get("status") in ("submitted", "graded"):
+            completed += 1
+        grade = sa.get("grade")
+        if grade is not None:
+            grade_sum += grade
+            graded.append(sa)
+    avg_grade = round(grade_sum / len(graded), 1) if graded else None
     completion_rate = round(completed / total_assignments, 2) if total_assignments else 0
 
     # Grade list for chart
     grade_list = []
     if graded:
-        # Fetch assignment titles
-        graded_a_ids = list({sa["assignment_id"] for sa in graded})
-        titles_resp = supabase_execute(
-            db.table("assignments")
-            .select("id,title")
-            .in_("id", graded_a_ids),
-            entity="assignments",
-        )
-        title_map = {a["id"]: a.get("title") or "Sem título" for a in (titles_resp.data or [])}
+        if title_map is None:
+            # Admins skip the teacher filter, so titles still need a lookup
+            graded_a_ids = list({sa["assignment_id"] for sa in graded})
+            titles_resp = supabase_execute(
+                db.table("assignments")
+                .select("id,title")
+                .in_("id", graded_a_ids),
+                entity="assignments",
+            )
+            title_map = {a["id"]: a.get("title") or "Sem título" for a in (titles_resp.data or [])}
         for sa in graded:
             grade_list.append({
                 "title": title_map.get(sa["assignment_id"], "Sem título"),
@@ -420,7 +527,7 @@ def get_teacher_stats(
     """Aggregate statistics for a teacher: sessions, hours, earnings."""
     now = datetime.now(timezone.utc)
     month_start = now.replace(day=1, hour=0, minute=0, second=0, microsecond=0)
-    twelve_weeks_ago = now - timedelta(weeks=12)
+    twelve_weeks_ago = now - timedelta(weeks=_STATS_WEEKS)
 
     # All sessions taught by this teacher (include snapshot fields)
     all_sessions_resp = supabase_execute(
@@ -433,56 +540,45 @@ def get_teacher_stats(
     total_sessions = all_sessions_resp.count or 0
     all_sessions = all_sessions_resp.data or []
 
-    # Sessions this month
-    sessions_this_month = sum(
-        1
-        for s in all_sessions
-        if s.get("starts_at") and s["starts_at"] >= month_start.isoformat()
-    )
-
-    # Total hours and snapshot-based earnings
+    # Each session's start/end is parsed once and reused for the monthly
+    # count, the weekly buckets, and hours / snapshot-based earnings.
+    month_start_ts = month_start.timestamp()
+    sessions_this_month = 0
+    start_timestamps: list[float] = []
     total_hours = 0.0
     snapshot_earnings = 0.0
     total_revenue_generated = 0.0
     has_snapshots = False
     for s in all_sessions:
-        start = s.get("starts_at")
-        end = s.get("ends_at")
-        if start and end:
-            try:
-                dt_start = datetime.fromisoformat(start.replace("Z", "+00:00"))
-                dt_end = datetime.fromisoformat(end.replace("Z", "+00:00"))
-                duration = (dt_end - dt_start).total_seconds() / 3600
-                total_hours += duration
-
-                teacher_cost = s.get("snapshot_teacher_cost")
-                if teacher_cost is not None:
-                    snapshot_earnings += float(teacher_cost) * duration
-                    has_snapshots = True
-
-                student_price = s.get("snapshot_student_price")
-                num_students = len(s.get("student_ids") or [])
-                if student_price is not None:
-                    total_revenue_generated += float(student_price) * duration * num_students
-            except (ValueError, TypeError):
-                pass
+        start_ts = _parse_timestamp(s.get("starts_at"))
+        if start_ts is None:
+            continue
+        start_timestamps.append(start_ts)
+        if start_ts >= month_start_ts:
+            sessions_this_month += 1
+
+        end_ts = _parse_timestamp(s.get("ends_at"))
+        if end_ts is None:
+            continue
+        try:
+            duration = (end_ts - start_ts) / 3600
+            total_hours += duration
+
+            teacher_cost = s.get("snapshot_teacher_cost")
+            if teacher_cost is not None:
+                snapshot_earnings += float(teacher_cost) * duration
+                has_snapshots = True
+
+            student_price = s.get("snapshot_student_price")
+            num_students = len(s.get("student_ids") or [])
+            if student_price is not None:
+                total_revenue_generated += float(student_price) * duration * num_students
+        except (ValueError, TypeError):
+            pass
     total_hours = round(total_hours, 1)
 
     # Weekly session counts (last 12 weeks)
-    weekly_sessions: list[dict] = []
-    for i in range(12):
-        week_start = twelve_weeks_ago + timedelta(weeks=i)
-        week_end = week_start + timedelta(weeks=1)
-        count = sum(
-            1
-            for s in all_sessions
-            if s.get("starts_at")
-            and week_start.isoformat() <= s["starts_at"] < week_end.isoformat()
-        )
-        weekly_sessions.append({
-            "week": week_start.strftime("%d/%m"),
-            "count": count,
-        })
+    weekly_sessions = _bucket_weekly_counts(start_timestamps, twelve_weeks_ago)
 
     # Fetch hourly rate from profile (legacy fallback)
     profile_resp = supabase_execute(
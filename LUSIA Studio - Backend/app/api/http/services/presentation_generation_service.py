@@ -549,8 +549,8 @@ async def generate_presentation_task(
             "Executor output for artifact %s: %d chars, %d images, %d visuals generated",
             artifact_id,
             len(raw_html),
-            len([r for r in image_results if r.get("status") == "completed"]),
-            len([r for r in visual_results if r.get("status") == "completed"]),
+            sum(1 for r in image_results if r.get("status") == "completed"),
+            sum(1 for r in visual_results if r.get("status") == "completed"),
         )
 
         # ── Parse slides ──
@@ -7,12 +7,15 @@ Uses the shared generation_context module for content assembly.
 
 from __future__ import annotations
 
+import asyncio
 import json
 import logging
 import re
+from collections import deque
 from collections.abc import AsyncGenerator
 from datetime import datetime, timezone
 
+import orjson
 from supabase import Client
 
 from app.api.http.schemas.quiz_generation import (
@@ -27,21 +30,45 @@ from app.pipeline.clients.openrouter import (
     chat_completion_stream,
 )
 from app.pipeline.steps.categorize_document import (
+    get_curriculum_codes,
     get_curriculum_tree,
+    get_serialized_curriculum_tree,
     get_subject_name,
-    serialize_tree,
 )
 from app.pipeline.steps.extract_questions import (
-    insert_question_tree,
+    insert_question_trees,
+    mark_ai_generated_fields,
     normalize_content,
 )
 from app.utils.db import parse_single_or_404, supabase_execute
+from app.utils.prompt_template import compile_template, render_template
 
 logger = logging.getLogger(__name__)
 
 FILL_BLANK_INLINE_MATH_RE = re.compile(r"\$[^$]*\{\{blank\}\}[^$]*\$")
 FILL_BLANK_DISPLAY_MATH_RE = re.compile(r"\$\$[\s\S]*?\{\{blank\}\}[\s\S]*?\$\$")
 
+# Auto-correctable types the quiz prompt allows (no open_extended/context_group)
+QUIZ_QUESTION_TYPES = frozenset({
+    "multiple_choice",
+    "true_false",
+    "fill_blank",
+    "matching",
+    "short_answer",
+    "multiple_response",
+    "ordering",
+})
+
+# Question inserts run in worker threads while the LLM keeps streaming; past
+# this many unfinished insert batches the stream waits for the oldest one.
+_MAX_INFLIGHT_INSERTS = 2
+# Character budget for the supplementary curriculum section of the quiz
+# prompt (~6k tokens). Base content is kept first; the tree gets what is left.
+_CURRICULUM_PROMPT_BUDGET_CHARS = 24_000
+# Most questions per multi-row insert; an insert starts early with fewer
+# whenever no other insert is running.
+_INSERT_BATCH_SIZE = 3
+
 
 # ── Artifact creation ─────────────────────────────────────────
 
@@ -167,6 +194,38 @@ Respond with ONLY this JSON structure:
 {{
   "curriculum_codes": ["CODE_1", "CODE_2"]
 }}"""
+_MATCH_USER_PARTS = compile_template(MATCH_USER_TEMPLATE)
+
+# Trees this small are matched wholesale without asking the LLM.
+_MATCH_ALL_MAX_CODES = 3
+
+
+_MATCH_NODE_FIELDS = ("id", "code", "title", "full_path", "level")
+
+
+def _tree_nodes_for_codes(
+    db: Client,
+    scope: CurriculumMatchIn,
+    codes: list[str] | frozenset[str],
+) -> list[dict]:
+    """Pick matched nodes out of the (cached) curriculum tree for the scope.
+
+    Matched codes are always validated against this same tree, so there is no
+    need for a second ``curriculum`` round-trip to resolve them.
+    """
+    wanted = set(codes)
+    return [
+        {field: node.get(field) for field in _MATCH_NODE_FIELDS}
+        for node in get_curriculum_tree(
+            db, scope.subject_id, scope.year_level, scope.subject_component
+        )
+        if node.get("code") in wanted
+    ]
+
+
+def _should_match_all_codes(query: str, valid_codes: frozenset[str]) -> bool:
+    """Trivial matches (blank query, tiny tree) skip the LLM round-trip."""
+    return not query.strip() or len(valid_codes) <= _MATCH_ALL_MAX_CODES
 
 
 async def match_curriculum(
@@ -183,15 +242,18 @@ async def match_curriculum(
     if not subject_name:
         return []
 
-    tree_nodes = get_curriculum_tree(
+    valid_codes = get_curriculum_codes(
         db, payload.subject_id, payload.year_level, payload.subject_component
     )
-    if not tree_nodes:
+    if not valid_codes:
         return []
 
-    has_components = any(n.get("subject_component") for n in tree_nodes)
-    serialized = serialize_tree(tree_nodes, include_component=has_components)
-    valid_codes = {n["code"] for n in tree_nodes if n.get("code")}
+    if _should_match_all_codes(payload.query, valid_codes):
+        return _tree_nodes_for_codes(db, payload, valid_codes)
+
+    serialized = get_serialized_curriculum_tree(
+        db, payload.subject_id, payload.year_level, payload.subject_component
+    )
 
     component_line = (
         f"Component: {payload.subject_component}"
@@ -199,7 +261,8 @@ async def match_curriculum(
         else ""
     )
 
-    user_text = MATCH_USER_TEMPLATE.format(
+    user_text = render_template(
+        _MATCH_USER_PARTS,
         query=payload.query,
         subject_name=subject_name,
         year_level=payload.year_level,
@@ -223,23 +286,164 @@ async def match_curriculum(
     if not isinstance(raw_codes, list):
         raw_codes = [raw_codes] if raw_codes else []
 
-    validated_codes = [c for c in raw_codes if c in valid_codes]
+    # Keep the LLM's order but drop echoed duplicates before the IN query
+    validated_codes = list(dict.fromkeys(c for c in raw_codes if c in valid_codes))
 
     if not validated_codes:
         logger.warning("No valid curriculum codes matched for query: %s", payload.query)
         return []
 
-    # Fetch full node data for validated codes
-    response = supabase_execute(
-        db.table("curriculum")
-        .select("id,code,title,full_path,level")
-        .eq("subject_id", payload.subject_id)
-        .eq("year_level", payload.year_level)
-        .in_("code", validated_codes),
-        entity="curriculum",
+    return _tree_nodes_for_codes(db, payload, validated_codes)
+
+
+BATCH_MATCH_USER_TEMPLATE = """\
+The teacher wants to create quizzes about each of the following topics:
+{numbered_queries}
+
+Subject: {subject_name}
+Year: {year_level}º ano
+{component_line}
+
+Below is the curriculum tree for this subject and year.
+Format: [CODE] (level N) Title — keywords
+
+{serialized_tree}
+
+---
+Task: For EACH numbered topic, return the curriculum codes that best match it.
+
+Rules:
+- Return ALL codes that are relevant to each topic, not just one.
+- Prefer more specific codes (level 2 over level 1, level 1 over level 0).
+- If a topic maps to a broad area, include the parent AND its children.
+- Only return codes that exist exactly in the curriculum tree above.
+- Include every topic number, using an empty list when nothing matches.
+
+Respond with ONLY this JSON structure, keyed by topic number:
+{{
+  "matches": {{
+    "1": ["CODE_1", "CODE_2"],
+    "2": ["CODE_3"]
+  }}
+}}"""
+_BATCH_MATCH_USER_PARTS = compile_template(BATCH_MATCH_USER_TEMPLATE)
+
+
+async def match_curricula_batch(
+    db: Client,
+    payloads: list[CurriculumMatchIn],
+) -> list[list[dict]]:
+    """
+    Match several free-text descriptions in as few LLM calls as possible.
+
+    Queries sharing a subject/year/component scope go to the LLM together in
+    one prompt; distinct scopes are matched concurrently. Returns one node
+    list per payload, in input order.
+    """
+    results: list[list[dict]] = [[] for _ in payloads]
+    groups: dict[tuple[str, str, str | None], list[int]] = {}
+    for idx, payload in enumerate(payloads):
+        scope = (payload.subject_id, payload.year_level, payload.subject_component)
+        groups.setdefault(scope, []).append(idx)
+
+    async def _match_group(indices: list[int]) -> None:
+        if len(indices) == 1:
+            results[indices[0]] = await match_curriculum(db, payloads[indices[0]])
+            return
+        group_results = await _match_curriculum_group(
+            db, [payloads[idx] for idx in indices]
+        )
+        for idx, nodes in zip(indices, group_results):
+            results[idx] = nodes
+
+    await asyncio.gather(*(_match_group(indices) for indices in groups.values()))
+    return results
+
+
+async def _match_curriculum_group(
+    db: Client,
+    payloads: list[CurriculumMatchIn],
+) -> list[list[dict]]:
+    """Match payloads that share one curriculum scope with a single LLM call."""
+    empty: list[list[dict]] = [[] for _ in payloads]
+    scope = payloads[0]
+
+    subject_name = get_subject_name(db, scope.subject_id)
+    if not subject_name:
+        return empty
+
+    valid_codes = get_curriculum_codes(
+        db, scope.subject_id, scope.year_level, scope.subject_component
     )
+    if not valid_codes:
+        return empty
 
-    return response.data or []
+    if all(_should_match_all_codes(p.query, valid_codes) for p in payloads):
+        nodes = _tree_nodes_for_codes(db, scope, valid_codes)
+        return [list(nodes) for _ in payloads]
+
+    serialized = get_serialized_curriculum_tree(
+        db, scope.subject_id, scope.year_level, scope.subject_component
+    )
+
+    component_line = (
+        f"Component: {scope.subject_component}"
+        if scope.subject_component
+        else ""
+    )
+
+    user_text = render_template(
+        _BATCH_MATCH_USER_PARTS,
+        numbered_queries="\n".join(
+            f'{number}. "{payload.query}"'
+            for number, payload in enumerate(payloads, start=1)
+        ),
+        subject_name=subject_name,
+        year_level=scope.year_level,
+        component_line=component_line,
+        serialized_tree=serialized,
+    )
+
+    try:
+        result = await chat_completion(
+            system_prompt=MATCH_SYSTEM_PROMPT,
+            user_prompt=user_text,
+            response_format={"type": "json_object"},
+            temperature=0.1,
+            max_tokens=2048,
+        )
+    except OpenRouterError:
+        logger.exception("Batched curriculum matching LLM call failed")
+        return empty
+
+    matches = result.get("matches")
+    if not isinstance(matches, dict):
+        logger.warning("Batched curriculum matching returned no matches object")
+        return empty
+
+    codes_per_query: list[list[str]] = []
+    for number, payload in enumerate(payloads, start=1):
+        raw_codes = matches.get(str(number), [])
+        if not isinstance(raw_codes, list):
+            raw_codes = [raw_codes] if raw_codes else []
+        validated = list(dict.fromkeys(c for c in raw_codes if c in valid_codes))
+        if not validated:
+            logger.warning("No valid curriculum codes matched for query: %s", payload.query)
+        codes_per_query.append(validated)
+
+    all_codes = list(dict.fromkeys(c for codes in codes_per_query for c in codes))
+    if not all_codes:
+        return empty
+
+    # One node lookup for the whole group, split per query in memory
+    node_by_code = {
+        node["code"]: node for node in _tree_nodes_for_codes(db, scope, all_codes)
+    }
+
+    return [
+        [node_by_code[code] for code in codes if code in node_by_code]
+        for codes in codes_per_query
+    ]
 
 
 # ── Streaming question generation ─────────────────────────────
@@ -410,7 +614,12 @@ def _build_quiz_user_prompt(
         parts.append("")
 
     # ── 3. CURRICULUM + BANK (supplementary context) ──
-    has_curriculum = context["curriculum_tree"] or context["base_content_by_code"]
+    curriculum_tree, base_sections = _fit_curriculum_to_budget(
+        context["curriculum_tree"],
+        context["base_content_by_code"],
+        _CURRICULUM_PROMPT_BUDGET_CHARS,
+    )
+    has_curriculum = curriculum_tree or base_sections
     has_bank = bool(context["bank_questions"])
 
     if has_curriculum:
@@ -418,11 +627,11 @@ def _build_quiz_user_prompt(
         parts.append(
             "Usa estes conteúdos como contexto adicional para enriquecer as questões."
         )
-        if context["curriculum_tree"]:
+        if curriculum_tree:
             parts.append("Árvore curricular:")
-            parts.append(context["curriculum_tree"])
+            parts.append(curriculum_tree)
             parts.append("")
-        for code, text in context["base_content_by_code"].items():
+        for code, text in base_sections:
             parts.append(f"--- {code} ---")
             parts.append(text)
             parts.append("")
@@ -443,6 +652,35 @@ def _build_quiz_user_prompt(
     return "\n".join(parts)
 
 
+def _fit_curriculum_to_budget(
+    curriculum_tree: str,
+    base_content_by_code: dict[str, str],
+    budget: int,
+) -> tuple[str, list[tuple[str, str]]]:
+    """
+    Trim the supplementary curriculum material to a character budget.
+
+    Base content for the selected codes is kept first (truncated with "…"
+    once the budget runs out); the serialized tree only gets the remaining
+    budget, cut at a line boundary.
+    """
+    remaining = budget
+    sections: list[tuple[str, str]] = []
+    for code, text in base_content_by_code.items():
+        if remaining <= 0:
+            break
+        if len(text) > remaining:
+            text = text[:remaining] + "…"
+        sections.append((code, text))
+        remaining -= len(text)
+
+    if len(curriculum_tree) > remaining:
+        cut = curriculum_tree.rfind("\n", 0, max(remaining, 0))
+        curriculum_tree = curriculum_tree[:cut] if cut > 0 else ""
+
+    return curriculum_tree, sections
+
+
 def _validate_generated_quiz_content(question_type: str, content: dict) -> dict:
     if question_type != "fill_blank":
         return content
@@ -475,12 +713,27 @@ async def generate_questions_stream(
     artifact_id: str,
     org_id: str,
     user_id: str,
-) -> AsyncGenerator[str, None]:
+) -> AsyncGenerator[bytes, None]:
     """
     Stream quiz generation via SSE.
 
-    Yields SSE-formatted strings: "data: {...}\\n\\n"
+    Yields UTF-8 encoded SSE events: b"data: {...}\\n\\n". Small events
+    (quiz_name) are buffered and flushed together with the next question or
+    the final event, so each yield is one meaningful chunk for the client.
+
+    Question inserts are pipelined with the LLM stream: each question is
+    inserted in a worker thread as soon as no other insert is running (those
+    that arrive meanwhile are grouped into the next multi-row insert), and
+    their events are emitted, in generation order, once the row ids are known.
     """
+    pending: list[bytes] = []
+    # Written with the final (or failure) artifact update, not mid-stream
+    quiz_name: str | None = None
+    # Insert batches still running, oldest first: (task, [(generated_q, content, order)])
+    inflight: deque[tuple[asyncio.Task, list[tuple]]] = deque()
+    # The LLM stream and the pending read of its next question
+    questions: AsyncGenerator[GeneratedQuestion, None] | None = None
+    next_question: asyncio.Future | None = None
     try:
         # 1. Fetch artifact metadata
         artifact = _get_artifact_for_generation(db, artifact_id, user_id)
@@ -524,141 +777,153 @@ async def generate_questions_stream(
         question_ids: list[str] = []
         label_to_id: dict[str, str] = {}
         order = 0
-        quiz_name_emitted = False
-
-        async for generated_q in chat_completion_stream(
+        # Questions waiting for the next multi-row insert: (raw_q, generated_q, content, order)
+        batch: list[tuple[dict, GeneratedQuestion, dict, int]] = []
+        insert_tags = {
+            "org_id": org_id,
+            "user_id": user_id,
+            "artifact_id": artifact_id,
+            "subject_id": subject_id,
+            "year_level": year_level,
+            "subject_component": subject_component,
+            "curriculum_codes": curriculum_codes,
+        }
+
+        # The LLM stream and the inserts are awaited together, so a question's
+        # event goes out as soon as its insert lands rather than when the next
+        # question arrives.
+        questions = aiter(chat_completion_stream(
             system_prompt=GENERATION_SYSTEM_PROMPT,
             user_prompt=user_prompt,
             response_model=GeneratedQuestion,
             temperature=0.3,
             max_tokens=32768,
-        ):
-            try:
-                # Extract quiz_name from the first question (if present)
-                if not quiz_name_emitted and generated_q.quiz_name:
-                    quiz_name = generated_q.quiz_name.strip()
-                    if quiz_name:
-                        quiz_name_emitted = True
-                        supabase_execute(
-                            db.table("artifacts")
-                            .update({
-                                "artifact_name": quiz_name,
-                                "updated_at": datetime.now(timezone.utc).isoformat(),
-                            })
-                            .eq("id", artifact_id),
-                            entity="artifact",
-                        )
-                        yield _sse_event({"type": "quiz_name", "name": quiz_name})
-
-                order += 1
-                q_content = generated_q.content
-                q_content = normalize_content(q_content)
-                q_content = _validate_generated_quiz_content(generated_q.type, q_content)
-
-                # Ensure ai_generated_fields is set for AI-created questions
-                q_content.setdefault("ai_generated_fields", [])
-                if "solution" not in q_content["ai_generated_fields"]:
-                    if q_content.get("solution") is not None:
-                        q_content["ai_generated_fields"].append("solution")
-                if "criteria" not in q_content["ai_generated_fields"]:
-                    if q_content.get("criteria") is not None:
-                        q_content["ai_generated_fields"].append("criteria")
-
-                # Build raw question dict for insert_question_tree
-                raw_q = {
-                    "type": generated_q.type,
-                    "label": generated_q.label,
-                    "content": q_content,
-                }
-
-                # Add children for context_group (shouldn't happen for quiz but defensive)
-                if generated_q.children:
-                    raw_q["children"] = [
-                        {
-                            "type": child.type,
-                            "label": child.label,
-                            "content": child.content,
-                        }
-                        for child in generated_q.children
-                    ]
-
-                parent_id, child_ids = insert_question_tree(
-                    db,
-                    raw_q,
-                    org_id=org_id,
-                    user_id=user_id,
-                    artifact_id=artifact_id,
-                    subject_id=subject_id,
-                    year_level=year_level,
-                    subject_component=subject_component,
-                    curriculum_codes=curriculum_codes,
-                )
-
-                question_ids.append(parent_id)
-                question_ids.extend(child_ids)
-                label_to_id[generated_q.label] = parent_id
-
-                # Yield question event
-                yield _sse_event({
-                    "type": "question",
-                    "question": {
-                        "id": parent_id,
-                        "type": generated_q.type,
-                        "label": generated_q.label,
-                        "content": q_content,
-                        "order": order,
-                    },
-                })
-
-            except Exception as exc:
-                logger.warning(
-                    "Failed to process generated question (label=%s): %s",
-                    generated_q.label if generated_q else "?",
-                    exc,
+        ))
+        next_question = asyncio.ensure_future(anext(questions))
+        stream_done = False
+
+        while not stream_done or batch or inflight:
+            waiters = [] if stream_done else [next_question]
+            if inflight:
+                waiters.append(inflight[0][0])
+            if waiters:
+                await asyncio.wait(waiters, return_when=asyncio.FIRST_COMPLETED)
+
+            # Emit finished inserts in generation order
+            while inflight and (
+                inflight[0][0].done() or len(inflight) > _MAX_INFLIGHT_INSERTS
+            ):
+                events = await _finish_insert_batch(
+                    inflight.popleft(), question_ids, label_to_id
                 )
-                continue
+                if events:
+                    # Flush the question events with anything buffered before them
+                    pending.extend(events)
+                    yield b"".join(pending)
+                    pending.clear()
+
+            if not stream_done and next_question.done():
+                try:
+                    generated_q = next_question.result()
+                except StopAsyncIteration:
+                    stream_done = True
+                else:
+                    next_question = asyncio.ensure_future(anext(questions))
+                    # Extract quiz_name from the first question (if present)
+                    if quiz_name is None and generated_q.quiz_name:
+                        quiz_name = generated_q.quiz_name.strip() or None
+                        if quiz_name:
+                            pending.append(
+                                _sse_event({"type": "quiz_name", "name": quiz_name})
+                            )
+
+                    # The prompt forbids these; drop them before any work or insert
+                    if generated_q.type not in QUIZ_QUESTION_TYPES:
+                        logger.info(
+                            "Skipping generated question with disallowed type %s (label=%s)",
+                            generated_q.type,
+                            generated_q.label,
+                        )
+                    else:
+                        try:
+                            raw_q, q_content = _build_raw_question(generated_q)
+                        except Exception as exc:
+                            logger.warning(
+                                "Failed to process generated question (label=%s): %s",
+                                generated_q.label,
+                                exc,
+                            )
+                        else:
+                            order += 1
+                            batch.append((raw_q, generated_q, q_content, order))
+
+            # Insert as soon as no insert is running; while one is, questions
+            # accumulate into the next multi-row batch. Inserts run off the
+            # event loop so the LLM stream keeps flowing.
+            if batch and (
+                stream_done or not inflight or len(batch) >= _INSERT_BATCH_SIZE
+            ):
+                inflight.append(_start_insert_batch(db, batch, insert_tags))
+                batch = []
 
         # 6. Finalize artifact
         now = datetime.now(timezone.utc).isoformat()
+        final_update = {
+            "content": {"question_ids": question_ids},
+            "is_processed": True,
+            "updated_at": now,
+        }
+        if quiz_name:
+            final_update["artifact_name"] = quiz_name
         supabase_execute(
-            db.table("artifacts")
-            .update({
-                "content": {"question_ids": question_ids},
-                "is_processed": True,
-                "updated_at": now,
-            })
-            .eq("id", artifact_id),
+            db.table("artifacts").update(final_update).eq("id", artifact_id),
             entity="artifact",
         )
 
-        yield _sse_event({
+        pending.append(_sse_event({
             "type": "done",
             "artifact_id": artifact_id,
             "total_questions": len(question_ids),
-        })
+        }))
+        yield b"".join(pending)
 
     except Exception as exc:
         logger.exception("Quiz generation failed for artifact %s", artifact_id)
 
         # Mark artifact as failed
         try:
+            failure_update = {
+                "processing_failed": True,
+                "processing_error": str(exc)[:500],
+                "updated_at": datetime.now(timezone.utc).isoformat(),
+            }
+            if quiz_name:
+                failure_update["artifact_name"] = quiz_name
             supabase_execute(
-                db.table("artifacts")
-                .update({
-                    "processing_failed": True,
-                    "processing_error": str(exc)[:500],
-                    "updated_at": datetime.now(timezone.utc).isoformat(),
-                })
-                .eq("id", artifact_id),
+                db.table("artifacts").update(failure_update).eq("id", artifact_id),
                 entity="artifact",
             )
         except Exception:
             logger.exception("Failed to mark artifact %s as failed", artifact_id)
 
-        yield _sse_event({
+        pending.append(_sse_event({
             "type": "error",
             "message": "Erro ao gerar questões. Tenta novamente.",
-        })
+        }))
+        yield b"".join(pending)
+
+    finally:
+        # Also runs on client disconnect (CancelledError / GeneratorExit), so
+        # the LLM stream is closed and no insert is left running unsupervised.
+        leftover = [insert_task for insert_task, _ in inflight]
+        if next_question is not None:
+            leftover.append(next_question)
+        for task in leftover:
+            task.cancel()
+        if leftover:
+            await asyncio.gather(*leftover, return_exceptions=True)
+        if questions is not None:
+            await questions.aclose()
 
 
 # ── Helpers ───────────────────────────────────────────────────
@@ -694,9 +959,89 @@ def _get_artifact_for_generation(db: Client, artifact_id: str, user_id: str) ->
     return artifact
 
 
-def _sse_event(data: dict) -> str:
-    """Format a dict as an SSE event string."""
-    return f"data: {json.dumps(data, ensure_ascii=False)}\n\n"
+def _build_raw_question(generated_q: GeneratedQuestion) -> tuple[dict, dict]:
+    """Normalize a generated question into an insert_question_trees dict and its content."""
+    # normalize_content and mark_ai_generated_fields work in place
+    q_content = normalize_content(generated_q.content)
+    q_content = _validate_generated_quiz_content(generated_q.type, q_content)
+    mark_ai_generated_fields(q_content)
+
+    raw_q = {
+        "type": generated_q.type,
+        "label": generated_q.label,
+        "content": q_content,
+    }
+
+    # Add children for context_group (shouldn't happen for quiz but defensive)
+    if generated_q.children:
+        raw_q["children"] = [
+            {
+                "type": child.type,
+                "label": child.label,
+                "content": child.content,
+            }
+            for child in generated_q.children
+        ]
+    return raw_q, q_content
+
+
+def _start_insert_batch(
+    db: Client,
+    batch: list[tuple[dict, GeneratedQuestion, dict, int]],
+    insert_tags: dict,
+) -> tuple[asyncio.Task, list[tuple]]:
+    """Start a multi-row question insert in a worker thread."""
+    task = asyncio.create_task(asyncio.to_thread(
+        insert_question_trees,
+        db,
+        [raw_q for raw_q, *_ in batch],
+        **insert_tags,
+    ))
+    return task, [meta for _, *meta in batch]
+
+
+async def _finish_insert_batch(
+    entry: tuple[asyncio.Task, list[tuple]],
+    question_ids: list[str],
+    label_to_id: dict[str, str],
+) -> list[bytes]:
+    """Await one pipelined insert batch, record its ids and build its SSE events."""
+    insert_task, metas = entry
+    try:
+        results = await insert_task
+    except Exception as exc:
+        logger.warning(
+            "Failed to insert generated questions (labels=%s): %s",
+            [generated_q.label for generated_q, *_ in metas],
+            exc,
+        )
+        return []
+
+    events: list[bytes] = []
+    for (generated_q, q_content, order), result in zip(metas, results):
+        if result is None:
+            continue
+        parent_id, child_ids = result
+        question_ids.append(parent_id)
+        question_ids.extend(child_ids)
+        label_to_id[generated_q.label] = parent_id
+
+        events.append(_sse_event({
+            "type": "question",
+            "question": {
+                "id": parent_id,
+                "type": generated_q.type,
+                "label": generated_q.label,
+                "content": q_content,
+                "order": order,
+            },
+        }))
+    return events
+
+
+def _sse_event(data: dict) -> bytes:
+    """Format a dict as an SSE event (orjson emits UTF-8, like ensure_ascii=False)."""
+    return b"data: " + orjson.dumps(data) + b"\n\n"
 
 
 # ── Resolve curriculum codes to full nodes ────────────────────
@@ -6,10 +6,12 @@ Uses the unified `questions` table (formerly quiz_questions).
 
 from __future__ import annotations
 
+import base64
+from collections.abc import AsyncIterator
 from datetime import datetime, timezone
 from pathlib import Path
 from typing import Optional
-from uuid import uuid4
+from uuid import UUID, uuid4
 
 from fastapi import HTTPException, status
 from supabase import Client
@@ -25,6 +27,9 @@ QUESTION_SELECT = (
     "exam_year,exam_phase,exam_group,exam_order_in_group"
 )
 
+QUESTION_PAGE_SIZE = 50
+QUESTION_MAX_PAGE_SIZE = 200
+
 QUIZ_IMAGE_BUCKET = "quiz-images"
 QUIZ_IMAGE_MAX_BYTES = 8 * 1024 * 1024
 ALLOWED_IMAGE_TYPES = {
@@ -33,12 +38,45 @@ ALLOWED_IMAGE_TYPES = {
     "image/webp": ".webp",
     "image/gif": ".gif",
 }
+_ALLOWED_IMAGE_MIME_TYPES = sorted(ALLOWED_IMAGE_TYPES)
+_JPEG_SUFFIXES = frozenset({".jpeg", ".jpg"})
+_KEPT_IMAGE_SUFFIXES = frozenset({".png", ".webp", ".gif"})
 
 
 def _can_administer_question(role: str) -> bool:
     return role == "admin"
 
 
+def encode_question_cursor(row: dict) -> str:
+    """Opaque keyset cursor for the row a page ended on.
+
+    base64url without padding, so it survives being echoed into a query
+    string unencoded (the raw timestamp's ``+`` would turn into a space).
+    """
+    raw = f"{row['created_at']}|{row['id']}".encode()
+    return base64.urlsafe_b64encode(raw).rstrip(b"=").decode("ascii")
+
+
+def _decode_question_cursor(cursor: str) -> tuple[str, str]:
+    """Parse a cursor into normalized ``(created_at, id)`` filter values.
+
+    Both parts are re-serialized from parsed values, so nothing the client
+    sent reaches the PostgREST logic tree verbatim.
+    """
+    try:
+        padded = cursor.encode("ascii") + b"=" * (-len(cursor) % 4)
+        raw = base64.b64decode(padded, altchars=b"-_", validate=True).decode()
+        created_at, sep, question_id = raw.rpartition("|")
+        if not sep:
+            raise ValueError(cursor)
+        return datetime.fromisoformat(created_at).isoformat(), str(UUID(question_id))
+    except ValueError:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Invalid cursor.",
+        ) from None
+
+
 def list_quiz_questions(
     db: Client,
     org_id: str,
@@ -50,8 +88,17 @@ def list_quiz_questions(
     year_level: Optional[str] = None,
     subject_component: Optional[str] = None,
     curriculum_code: Optional[str] = None,
-) -> list[dict]:
-    """List question bank entries (own + public) with optional filters."""
+    cursor: Optional[str] = None,
+    limit: Optional[int] = None,
+) -> tuple[list[dict], Optional[str]]:
+    """List question bank entries (own + public) with optional filters.
+
+    Returns ``(rows, next_cursor)``. Without *cursor* or *limit* the whole
+    matching bank is returned, as before pagination existed. Passing either
+    switches to keyset pagination newest first on ``(created_at, id)``
+    (*limit* defaults to QUESTION_PAGE_SIZE), and *next_cursor* is None on
+    the last page. Explicit *ids* lookups are never paginated.
+    """
     query = (
         db.table("questions")
         .select(QUESTION_SELECT)
@@ -64,23 +111,44 @@ def list_quiz_questions(
         query = query.in_("id", ids)
     else:
         # Browsing the question bank — restrict to own questions and public ones.
-        query = query.or_(f"created_by.eq.{user_id},is_public.eq.true")
-    if question_type:
-        query = query.eq("type", question_type)
-    if subject_id:
-        query = query.eq("subject_id", subject_id)
-    if year_level:
-        query = query.eq("year_level", year_level)
-    if subject_component:
-        query = query.eq("subject_component", subject_component)
-    if curriculum_code:
-        query = query.contains("curriculum_codes", [curriculum_code])
-
-    response = supabase_execute(
-        query.order("created_at", desc=True),
-        entity="questions",
+        ownership = f"created_by.eq.{user_id},is_public.eq.true"
+        if cursor:
+            # Rows strictly after the cursor in (created_at DESC, id DESC) order,
+            # combined into one logic tree with the ownership filter.
+            created_at, question_id = _decode_question_cursor(cursor)
+            after_cursor = (
+                f'created_at.lt."{created_at}",'
+                f'and(created_at.eq."{created_at}",id.lt.{question_id})'
+            )
+            query = query.or_(f"and(or({ownership}),or({after_cursor}))")
+        else:
+            query = query.or_(ownership)
+
+    # Optional filters as (builder method, column, value); one pass applies them.
+    filters = (
+        ("eq", "type", question_type),
+        ("eq", "subject_id", subject_id),
+        ("eq", "year_level", year_level),
+        ("eq", "subject_component", subject_component),
+        ("contains", "curriculum_codes", [curriculum_code] if curriculum_code else None),
     )
-    return response.data or []
+    for method, column, value in filters:
+        if value:
+            query = getattr(query, method)(column, value)
+
+    query = query.order("created_at", desc=True).order("id", desc=True)
+    if ids or (cursor is None and limit is None):
+        response = supabase_execute(query, entity="questions")
+        return response.data or [], None
+
+    limit = limit or QUESTION_PAGE_SIZE
+    # Fetch one extra row to know whether another page exists
+    response = supabase_execute(query.limit(limit + 1), entity="questions")
+    rows = response.data or []
+    if len(rows) <= limit:
+        return rows, None
+    rows = rows[:limit]
+    return rows, encode_question_cursor(rows[-1])
 
 
 def create_quiz_question(
@@ -239,7 +307,7 @@ def _ensure_quiz_image_bucket(db: Client) -> None:
             options={
                 "public": True,
                 "file_size_limit": QUIZ_IMAGE_MAX_BYTES,
-                "allowed_mime_types": sorted(ALLOWED_IMAGE_TYPES.keys()),
+                "allowed_mime_types": _ALLOWED_IMAGE_MIME_TYPES,
             },
         )
     except Exception as exc:
@@ -251,6 +319,45 @@ def _ensure_quiz_image_bucket(db: Client) -> None:
             ) from exc
 
 
+def _validate_quiz_image_type(content_type: str) -> None:
+    if content_type not in ALLOWED_IMAGE_TYPES:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Unsupported image format. Use JPEG, PNG, WEBP or GIF.",
+        )
+
+
+def _image_too_large() -> HTTPException:
+    return HTTPException(
+        status_code=status.HTTP_413_REQUEST_ENTITY_TOO_LARGE,
+        detail=f"Image exceeds {QUIZ_IMAGE_MAX_BYTES // (1024 * 1024)}MB limit.",
+    )
+
+
+async def read_quiz_image_body(
+    content_type: str,
+    content_length: str | None,
+    chunks: AsyncIterator[bytes],
+) -> bytes:
+    """Read a raw image upload body with early rejection.
+
+    The content type and declared length are checked before any bytes are
+    read, and the stream is abandoned as soon as it crosses the size limit,
+    so oversize uploads are never buffered in full.
+    """
+    _validate_quiz_image_type(content_type)
+    if content_length and content_length.isdigit():
+        if int(content_length) > QUIZ_IMAGE_MAX_BYTES:
+            raise _image_too_large()
+
+    buffer = bytearray()
+    async for chunk in chunks:
+        buffer += chunk
+        if len(buffer) > QUIZ_IMAGE_MAX_BYTES:
+            raise _image_too_large()
+    return bytes(buffer)
+
+
 def upload_quiz_image(
     db: Client,
     org_id: str,
@@ -267,23 +374,16 @@ def upload_quiz_image(
             detail="Image file is empty.",
         )
     if len(file_bytes) > QUIZ_IMAGE_MAX_BYTES:
-        raise HTTPException(
-            status_code=status.HTTP_413_REQUEST_ENTITY_TOO_LARGE,
-            detail=f"Image exceeds {QUIZ_IMAGE_MAX_BYTES // (1024 * 1024)}MB limit.",
-        )
-    if content_type not in ALLOWED_IMAGE_TYPES:
-        raise HTTPException(
-            status_code=status.HTTP_400_BAD_REQUEST,
-            detail="Unsupported image format. Use JPEG, PNG, WEBP or GIF.",
-        )
+        raise _image_too_large()
+    _validate_quiz_image_type(content_type)
 
     _ensure_quiz_image_bucket(db)
 
     suffix = ALLOWED_IMAGE_TYPES[content_type]
     original_suffix = Path(filename or "").suffix.lower()
-    if original_suffix in {".jpeg", ".jpg"}:
+    if original_suffix in _JPEG_SUFFIXES:
         suffix = ".jpg"
-    elif original_suffix in {".png", ".webp", ".gif"}:
+    elif original_suffix in _KEPT_IMAGE_SUFFIXES:
         suffix = original_suffix
 
     image_path = f"{org_id}/{user_id}/{uuid4().hex}{suffix}"
@@ -8,10 +8,19 @@ Subjects come in two flavours:
 
 from __future__ import annotations
 
+import logging
+import sys
+import unicodedata
+from functools import lru_cache
+
+from fastapi import HTTPException
 from supabase import Client
 
 from app.api.http.schemas.subjects import SubjectCreateRequest
 from app.utils.db import parse_single_or_404, supabase_execute
+from app.utils.ttl_cache import TTLCache
+
+logger = logging.getLogger(__name__)
 
 # Subjects are reference/catalog data with a small, fixed payload.
 # A summary/detail SELECT split is unnecessary — every field is used
@@ -20,6 +29,36 @@ SUBJECT_SELECT = (
     "id,name,slug,color,icon,education_level,grade_levels,status,"
     "organization_id,has_national_exam"
 )
+# Accent-free case-folded name/slug (normalize_subject_text, written on insert)
+# for profile matching. Rows created outside the API may leave them NULL.
+SUBJECT_CATALOG_SELECT = SUBJECT_SELECT + ",norm_name,norm_slug"
+
+# Global subjects are identical for every org and change rarely; raw rows are
+# kept per process for a couple of minutes, keyed by (select, level, grade).
+_global_subjects_cache = TTLCache(maxsize=128, ttl=120.0)
+
+
+@lru_cache(maxsize=1)
+def _combining_marks_table() -> dict[int, None]:
+    """str.translate table deleting every nonspacing mark (category Mn).
+
+    Built on first use rather than at import: scanning all code points
+    takes a noticeable fraction of a second.
+    """
+    return {
+        cp: None
+        for cp in range(sys.maxunicode + 1)
+        if unicodedata.category(chr(cp)) == "Mn"
+    }
+
+
+@lru_cache(maxsize=4096)
+def normalize_subject_text(value: str | None) -> str:
+    """Accent-free, case-folded form used to match subject names and slugs."""
+    if not value:
+        return ""
+    lowered = str(value).strip().casefold()
+    return unicodedata.normalize("NFD", lowered).translate(_combining_marks_table())
 
 
 def _add_is_custom(row: dict) -> dict:
@@ -29,11 +68,6 @@ def _add_is_custom(row: dict) -> dict:
     return row
 
 
-def _filter_by_grade(subjects: list[dict], grade: str) -> list[dict]:
-    """Client-side filter because Supabase REST doesn't support array-contains easily."""
-    return [s for s in subjects if grade in (s.get("grade_levels") or [])]
-
-
 # ── Public: global subjects only ────────────────────────────────────────
 
 def get_global_subjects(
@@ -42,24 +76,25 @@ def get_global_subjects(
     education_level: str | None = None,
     grade: str | None = None,
 ) -> list[dict]:
-    query = (
-        db.table("subjects")
-        .select(SUBJECT_SELECT)
-        .is_("organization_id", "null")
-        .eq("active", True)
-        .order("name")
-    )
-
-    if education_level:
-        query = query.eq("education_level", education_level)
-
-    result = supabase_execute(query, entity="subjects")
-    subjects = [_add_is_custom(s) for s in (result.data or [])]
-
-    if grade:
-        subjects = _filter_by_grade(subjects, grade)
-
-    return subjects
+    cache_key = (SUBJECT_SELECT, education_level, grade)
+    rows = _global_subjects_cache.get(cache_key)
+    if rows is None:
+        query = (
+            db.table("subjects")
+            .select(SUBJECT_SELECT)
+            .is_("organization_id", "null")
+            .eq("active", True)
+            .order("name")
+        )
+        if education_level:
+            query = query.eq("education_level", education_level)
+        if grade:
+            query = query.contains("grade_levels", [grade])
+        result = supabase_execute(query, entity="subjects")
+        rows = tuple(result.data or [])
+        _global_subjects_cache.put(cache_key, rows)
+
+    return [_add_is_custom(dict(s)) for s in rows]
 
 
 # ── Authenticated: global + org-custom subjects ─────────────────────────
@@ -70,41 +105,67 @@ def get_subjects_for_org(
     *,
     education_level: str | None = None,
     grade: str | None = None,
+    include_normalized: bool = False,
 ) -> list[dict]:
-    """Return global subjects PLUS custom subjects belonging to *org_id*."""
-    # 1. Global subjects
-    global_q = (
-        db.table("subjects")
-        .select(SUBJECT_SELECT)
-        .is_("organization_id", "null")
-        .eq("active", True)
-        .order("name")
-    )
-    if education_level:
-        global_q = global_q.eq("education_level", education_level)
-    global_result = supabase_execute(global_q, entity="subjects")
-
-    # 2. Org-custom subjects
-    custom_q = (
-        db.table("subjects")
-        .select(SUBJECT_SELECT)
-        .eq("organization_id", org_id)
-        .eq("active", True)
-        .order("name")
+    """Return global subjects PLUS custom subjects belonging to *org_id*.
+
+    With ``include_normalized`` the rows also carry ``norm_name`` /
+    ``norm_slug`` for matching free-text profile references. If those
+    columns are unavailable the plain rows are returned and callers
+    normalize in Python.
+    """
+    if include_normalized:
+        try:
+            return _query_subjects_for_org(
+                db, org_id, SUBJECT_CATALOG_SELECT,
+                education_level=education_level, grade=grade,
+            )
+        except HTTPException:
+            logger.warning("Normalized subject columns unavailable, falling back")
+    return _query_subjects_for_org(
+        db, org_id, SUBJECT_SELECT,
+        education_level=education_level, grade=grade,
     )
-    if education_level:
-        custom_q = custom_q.eq("education_level", education_level)
-    custom_result = supabase_execute(custom_q, entity="subjects")
 
-    subjects = [
-        _add_is_custom(s)
-        for s in (global_result.data or []) + (custom_result.data or [])
-    ]
 
+def _query_subjects_for_org(
+    db: Client,
+    org_id: str,
+    select: str,
+    *,
+    education_level: str | None,
+    grade: str | None,
+) -> list[dict]:
+    cache_key = (select, education_level, grade)
+    cached_globals = _global_subjects_cache.get(cache_key)
+
+    query = db.table("subjects").select(select).eq("active", True)
+    if cached_globals is not None:
+        # Globals are cached — only the org's custom subjects need a query.
+        query = query.eq("organization_id", org_id).order("name")
+    else:
+        # Global + org-custom in one round-trip. Ordering by organization_id
+        # (NULLs first) keeps globals ahead of the org's custom subjects.
+        query = (
+            query.or_(f"organization_id.is.null,organization_id.eq.{org_id}")
+            .order("organization_id", nullsfirst=True)
+            .order("name")
+        )
+    if education_level:
+        query = query.eq("education_level", education_level)
     if grade:
-        subjects = _filter_by_grade(subjects, grade)
+        query = query.contains("grade_levels", [grade])
+    result = supabase_execute(query, entity="subjects")
+    rows = result.data or []
+
+    if cached_globals is None:
+        cached_globals = tuple(
+            row for row in rows if row.get("organization_id") is None
+        )
+        _global_subjects_cache.put(cache_key, cached_globals)
+        rows = rows[len(cached_globals):]
 
-    return subjects
+    return [_add_is_custom(dict(s)) for s in (*cached_globals, *rows)]
 
 
 # ── Create custom subject ───────────────────────────────────────────────
@@ -124,9 +185,22 @@ def create_custom_subject(
         "grade_levels": payload.grade_levels,
     }
 
-    response = supabase_execute(
-        db.table("subjects").insert(insert_data),
-        entity="subject",
-    )
+    try:
+        response = supabase_execute(
+            db.table("subjects").insert(
+                {
+                    **insert_data,
+                    "norm_name": normalize_subject_text(payload.name),
+                    "norm_slug": normalize_subject_text(payload.slug),
+                }
+            ),
+            entity="subject",
+        )
+    except HTTPException:
+        logger.warning("Normalized subject columns unavailable, inserting without them")
+        response = supabase_execute(
+            db.table("subjects").insert(insert_data),
+            entity="subject",
+        )
     row = parse_single_or_404(response, entity="subject")
     return _add_is_custom(row)
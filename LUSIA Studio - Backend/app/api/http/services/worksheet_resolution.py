@@ -32,6 +32,7 @@ from app.api.http.services.worksheet_generation_service import (
 from app.pipeline.clients.openrouter import OpenRouterError, chat_completion_stream
 from app.pipeline.steps.extract_questions import (
     insert_question_tree,
+    mark_ai_generated_fields,
     normalize_content,
     validate_type,
 )
@@ -602,12 +603,7 @@ async def _generate_ai_group(
             block = _find_block(blocks, block_id)
             block_curriculum_codes = [block.curriculum_code] if block else curriculum_codes
 
-            q_content = normalize_content(generated_q.content)
-            q_content.setdefault("ai_generated_fields", [])
-            if "solution" not in q_content["ai_generated_fields"] and q_content.get("solution") is not None:
-                q_content["ai_generated_fields"].append("solution")
-            if "criteria" not in q_content["ai_generated_fields"] and q_content.get("criteria") is not None:
-                q_content["ai_generated_fields"].append("criteria")
+            q_content = mark_ai_generated_fields(normalize_content(generated_q.content))
 
             raw_q = {
                 "type": generated_q.type,
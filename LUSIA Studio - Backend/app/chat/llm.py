@@ -38,6 +38,22 @@ from app.pipeline.clients.openrouter import (
 ChatModelMode = Literal["fast", "thinking"]
 logger = logging.getLogger(__name__)
 
+# OpenAI tool schemas by id(tool). The agent passes the same CHAT_TOOLS on
+# every step, and convert_to_openai_tool re-derives each JSON schema from the
+# tool's signature; the tool object is kept alongside to guard against id reuse.
+_tool_schema_cache: dict[int, tuple[Any, dict[str, Any]]] = {}
+
+
+def _openai_tool_schemas(tools: list[Any]) -> list[dict[str, Any]]:
+    schemas: list[dict[str, Any]] = []
+    for tool in tools:
+        cached = _tool_schema_cache.get(id(tool))
+        if cached is None or cached[0] is not tool:
+            cached = (tool, convert_to_openai_tool(tool))
+            _tool_schema_cache[id(tool)] = cached
+        schemas.append(cached[1])
+    return schemas
+
 
 class OpenRouterChatOpenAI(ChatOpenAI):
     """ChatOpenAI variant that preserves OpenRouter reasoning fields in stream deltas."""
@@ -277,7 +293,7 @@ async def invoke_chat_model(
     payload: dict[str, Any] = {
         "model": model,
         "messages": [_convert_message_to_dict(message) for message in messages],
-        "tools": [convert_to_openai_tool(tool) for tool in tools],
+        "tools": _openai_tool_schemas(tools),
         "tool_choice": "auto",
         "temperature": settings.CHAT_TEMPERATURE,
         "max_tokens": settings.CHAT_MAX_TOKENS,
@@ -5,6 +5,9 @@ System prompt builder for the Chat AI tutor.
 from __future__ import annotations
 
 from datetime import date
+from functools import lru_cache
+
+from app.utils.prompt_template import compile_template, render_template
 
 EDUCATION_LEVEL_LABELS = {
     "basico_1_ciclo": "1o Ciclo do Ensino Basico (1o-4o ano)",
@@ -15,49 +18,10 @@ EDUCATION_LEVEL_LABELS = {
 }
 
 
-def build_system_prompt(
-    *,
-    user_name: str,
-    grade_level: str,
-    education_level: str,
-    preferred_subjects: list[dict],
-    model_mode: str | None = None,
-) -> str:
-    """
-    Build a dynamic system prompt that incorporates the student's context.
-
-    Args:
-        user_name: The student's display name.
-        grade_level: The student's grade/year level (e.g. "10").
-        education_level: The education level key (e.g. "secundario").
-        preferred_subjects: List of dicts with at least 'name' key.
-    """
-    subject_names = (
-        ", ".join(s["name"] for s in preferred_subjects)
-        if preferred_subjects
-        else "nenhuma selecionada"
-    )
-
-    education_label = EDUCATION_LEVEL_LABELS.get(education_level, education_level or "desconhecido")
-    today = date.today().strftime("%d/%m/%Y")
-    model_specific_overlay = ""
-    if (model_mode or "").strip().lower() == "fast":
-        model_specific_overlay = """
-
-INSTRUCOES ADICIONAIS PARA ESTE MODELO:
-1. Se faltar um dado essencial para consultar o curriculo, chama `ask_questions` imediatamente.
-2. Nesses casos, nao facas introducoes, explicacoes ou perguntas em texto livre antes da ferramenta.
-3. Se o utilizador disser "usa a tua ferramenta" ou equivalente, chama a ferramenta adequada nesse turno.
-4. Em pedidos sobre materia curricular, usa as ferramentas assim que tiveres os dados minimos necessarios.
-5. Se precisares do ano de escolaridade, o proximo output deve ser a chamada `ask_questions`, nao uma resposta conversacional."""
-
-    return f"""Tu es a Lusia, uma tutora de inteligencia artificial portuguesa, especializada no curriculo educativo portugues.
-
-PERFIL DO ALUNO:
-- Nome: {user_name}
-- Ano de escolaridade: {grade_level}o ano
-- Nivel de ensino: {education_label}
-- Disciplinas preferidas: {subject_names}
+# Everything that is identical across users and turns goes first, in its own
+# content block marked for provider prompt caching; the per-student profile and
+# date follow in a small second block so the cached prefix stays byte-stable.
+_STATIC_PROMPT = """Tu es a Lusia, uma tutora de inteligencia artificial portuguesa, especializada no curriculo educativo portugues.
 
 REGRAS DE COMUNICACAO:
 1. Responde SEMPRE em portugues europeu (pt-PT). Nunca uses gerundios (usa "estou a fazer" em vez de "estou fazendo").
@@ -117,7 +81,76 @@ QUANDO PRECISARES DE ESCLARECIMENTO:
 3. As respostas do aluno chegam no formato:
    P: <pergunta>
    R: <resposta escolhida ou texto livre>
-4. Depois de o aluno responder, continua a tarefa com base na nova informacao.
-{model_specific_overlay}
+4. Depois de o aluno responder, continua a tarefa com base na nova informacao."""
+
+_FAST_MODEL_OVERLAY = """INSTRUCOES ADICIONAIS PARA ESTE MODELO:
+1. Se faltar um dado essencial para consultar o curriculo, chama `ask_questions` imediatamente.
+2. Nesses casos, nao facas introducoes, explicacoes ou perguntas em texto livre antes da ferramenta.
+3. Se o utilizador disser "usa a tua ferramenta" ou equivalente, chama a ferramenta adequada nesse turno.
+4. Em pedidos sobre materia curricular, usa as ferramentas assim que tiveres os dados minimos necessarios.
+5. Se precisares do ano de escolaridade, o proximo output deve ser a chamada `ask_questions`, nao uma resposta conversacional."""
+
+_PROFILE_TEMPLATE = compile_template("""PERFIL DO ALUNO:
+- Nome: {user_name}
+- Ano de escolaridade: {grade_level}o ano
+- Nivel de ensino: {education_label}
+- Disciplinas preferidas: {subject_names}
+
+A data de hoje e: {today}""")
+
+_STATIC_PROMPT_BY_MODE = {
+    "fast": _STATIC_PROMPT + "\n\n" + _FAST_MODEL_OVERLAY,
+    None: _STATIC_PROMPT,
+}
+
+
+@lru_cache(maxsize=1)
+def _format_day(ordinal: int) -> str:
+    """dd/mm/YYYY for a date ordinal; only changes once a day."""
+    return date.fromordinal(ordinal).strftime("%d/%m/%Y")
+
+
+def build_system_prompt(
+    *,
+    user_name: str,
+    grade_level: str,
+    education_level: str,
+    preferred_subjects: list[dict],
+    model_mode: str | None = None,
+) -> list[dict]:
+    """
+    Build the system prompt as content blocks: a cacheable static block
+    followed by the student's context.
+
+    Args:
+        user_name: The student's display name.
+        grade_level: The student's grade/year level (e.g. "10").
+        education_level: The education level key (e.g. "secundario").
+        preferred_subjects: List of dicts with at least 'name' key.
+    """
+    subject_names = (
+        ", ".join(s["name"] for s in preferred_subjects)
+        if preferred_subjects
+        else "nenhuma selecionada"
+    )
+
+    education_label = EDUCATION_LEVEL_LABELS.get(education_level, education_level or "desconhecido")
+    mode_key = "fast" if (model_mode or "").strip().lower() == "fast" else None
+
+    profile = render_template(
+        _PROFILE_TEMPLATE,
+        user_name=user_name,
+        grade_level=grade_level,
+        education_label=education_label,
+        subject_names=subject_names,
+        today=_format_day(date.today().toordinal()),
+    )
 
-A data de hoje e: {today}"""
+    return [
+        {
+            "type": "text",
+            "text": _STATIC_PROMPT_BY_MODE[mode_key],
+            "cache_control": {"type": "ephemeral"},
+        },
+        {"type": "text", "text": profile},
+    ]
@@ -146,15 +146,19 @@ class ChatService:
         return resp.data[0]
 
     def delete_conversation(self, conversation_id: str, user_id: str) -> None:
-        # Verify ownership first
-        self.get_conversation(conversation_id, user_id)
-        supabase_execute(
+        # The user_id filter enforces ownership; no deleted row means not found.
+        resp = supabase_execute(
             self.db.table("chat_conversations")
             .delete()
             .eq("id", conversation_id)
             .eq("user_id", user_id),
             entity="chat_conversation",
         )
+        if not resp.data:
+            raise HTTPException(
+                status_code=status.HTTP_404_NOT_FOUND,
+                detail="Conversation not found.",
+            )
 
     def update_conversation_naming(
         self,
@@ -205,22 +209,44 @@ class ChatService:
         return 1
 
     def list_messages(self, conversation_id: str, user_id: str) -> dict:
-        # Verify ownership
-        self.get_conversation(conversation_id, user_id)
-
+        # Ownership is enforced by the inner join on the parent conversation
         resp = supabase_execute(
             self.db.table("chat_messages")
-            .select("id, role, content, run_id, sequence, tool_calls, tool_call_id, tool_name, content_blocks, metadata, created_at")
+            .select(
+                "id, role, content, run_id, sequence, tool_calls, tool_call_id, tool_name, content_blocks, metadata, created_at, "
+                "chat_conversations!inner(user_id)"
+            )
             .eq("conversation_id", conversation_id)
+            .eq("chat_conversations.user_id", user_id)
             .order("sequence", desc=False)
             .order("created_at", desc=False),
             entity="chat_messages",
         )
-        return {"messages": resp.data or []}
+        messages = resp.data or []
+        if not messages:
+            # Empty or not owned: only now tell the two apart (404 if not owned)
+            self.get_conversation(conversation_id, user_id)
+            return {"messages": []}
+        for message in messages:
+            message.pop("chat_conversations", None)
+        return {"messages": messages}
 
     def list_transcript_messages(self, conversation_id: str, user_id: str) -> list[dict[str, Any]]:
         return self.list_messages(conversation_id, user_id).get("messages", [])
 
+    def list_messages_from(self, conversation_id: str, from_sequence: int) -> list[dict[str, Any]]:
+        """Messages with sequence >= *from_sequence*; caller must have verified ownership."""
+        resp = supabase_execute(
+            self.db.table("chat_messages")
+            .select("id, role, content, run_id, sequence, tool_calls, tool_call_id, tool_name, content_blocks, metadata, created_at")
+            .eq("conversation_id", conversation_id)
+            .gte("sequence", from_sequence)
+            .order("sequence", desc=False)
+            .order("created_at", desc=False),
+            entity="chat_messages",
+        )
+        return resp.data or []
+
     def save_message(
         self,
         conversation_id: str,
@@ -254,14 +280,12 @@ class ChatService:
         if metadata is not None:
             row["metadata"] = metadata
 
+        # The conversation's updated_at is bumped by the trg_touch_conversation
+        # trigger (migration 040), so no separate touch round-trip here.
         resp = supabase_execute(
             self.db.table("chat_messages").insert(row),
             entity="chat_message",
         )
-
-        # Touch the conversation's updated_at
-        self.touch_conversation(conversation_id)
-
         return resp.data[0] if resp.data else row
 
     def update_message(
@@ -300,7 +324,6 @@ class ChatService:
             .eq("conversation_id", conversation_id),
             entity="chat_message",
         )
-        self.touch_conversation(conversation_id)
         if resp.data:
             return resp.data[0]
         return {"id": message_id, **updates}
@@ -505,7 +528,11 @@ class ChatService:
     # ── User Subjects ───────────────────────────────────────────────────
 
     def get_user_preferred_subjects(self, user: dict) -> list[dict]:
-        """Fetch full subject details for a user's preferred subject_ids."""
+        """Fetch the preferred subjects' id, name and icon for the chat agent.
+
+        The system prompt and conversation naming only read ``name`` (and
+        ``icon`` when picking a conversation icon).
+        """
         subject_ids = user.get("subject_ids") or []
         if not subject_ids:
             return []
@@ -517,7 +544,7 @@ class ChatService:
 
         resp = supabase_execute(
             self.db.table("subjects")
-            .select("id, name, slug, education_level")
+            .select("id, name, icon")
             .in_("id", subject_ids),
             entity="subjects",
         )
@@ -10,12 +10,14 @@ This module now treats each assistant turn as a run with:
 
 from __future__ import annotations
 
+import asyncio
 import re
 import json
 import logging
 from collections.abc import AsyncGenerator
 from typing import Any
 
+import orjson
 from langchain_core.messages import AIMessage, AIMessageChunk, HumanMessage, SystemMessage, ToolMessage
 
 from app.chat.agent import get_compiled_graph
@@ -24,6 +26,7 @@ from app.chat.service import ChatService
 from app.chat.tools import _resolve_subject
 from app.core.config import settings
 from app.pipeline.clients.openrouter import chat_completion
+from app.utils.ttl_cache import TTLCache
 
 logger = logging.getLogger(__name__)
 
@@ -34,10 +37,34 @@ SUBJECT_CONTEXT_RE = re.compile(
 FRONTEND_IMAGES_RE = re.compile(r"<frontend_images>[\s\S]*?</frontend_images>", re.DOTALL)
 CONVERSATION_NAMER_FALLBACK_ICON = None
 
+# Converted LangChain history per conversation:
+# (last_sequence, ids of rows at last_sequence, messages).
+# Each turn only fetches rows from last_sequence on instead of replaying the
+# whole transcript from the DB. Sequences are max+1 per insert and not unique,
+# so overlapping runs can write the same sequence: the last one is re-read and
+# deduplicated by id. Rows before last_sequence are never re-read, so any
+# message update must go through _update_history_message to drop the entry.
+_history_cache = TTLCache(maxsize=256, ttl=900.0)
+# Strong references to in-flight naming tasks so they are not collected early.
+_naming_tasks: set[asyncio.Task] = set()
 
-def _sse(data: dict[str, Any]) -> str:
-    """Format a dict as an SSE data line."""
-    return f"data: {json.dumps(data, ensure_ascii=False)}\n\n"
+
+def _sse(data: dict[str, Any]) -> bytes:
+    """Format a dict as an SSE data line (orjson emits UTF-8, like ensure_ascii=False)."""
+    return b"data: " + orjson.dumps(data, option=orjson.OPT_NON_STR_KEYS) + b"\n\n"
+
+
+def _delta_sse_prefix(frame_type: str, run_id: str) -> bytes:
+    """Constant head of a per-token delta frame, up to the block_id value."""
+    return (
+        b'data: {"type":' + orjson.dumps(frame_type)
+        + b',"run_id":' + orjson.dumps(run_id) + b',"block_id":'
+    )
+
+
+def _delta_sse(prefix: bytes, block_id: int, delta: str) -> bytes:
+    """Per-token SSE frame; same JSON as _sse on the frame dict, without building it."""
+    return b"".join((prefix, str(block_id).encode(), b',"delta":', orjson.dumps(delta), b"}\n\n"))
 
 
 def _build_human_content(text: str, images: list[str] | None = None) -> str | list[dict[str, Any]]:
@@ -504,6 +531,99 @@ def _row_to_history_messages(row: dict[str, Any]) -> list[Any]:
     return []
 
 
+def _load_history_messages(svc: ChatService, conversation_id: str, user_id: str) -> list[Any]:
+    """Conversation history as LangChain messages, extending the cached prefix."""
+    cached = _history_cache.get(conversation_id)
+    if cached is None:
+        last_sequence = 0
+        last_ids: frozenset[str] = frozenset()
+        history_messages: list[Any] = []
+        rows = svc.list_transcript_messages(conversation_id, user_id)
+    else:
+        # Ownership was verified by create_run for this conversation.
+        last_sequence, last_ids, cached_messages = cached
+        history_messages = list(cached_messages)
+        rows = svc.list_messages_from(conversation_id, last_sequence)
+
+    ids_at_last = set(last_ids)
+    for row in rows:
+        sequence = int(row.get("sequence") or 0)
+        row_id = row.get("id")
+        if sequence == last_sequence and row_id in last_ids:
+            continue
+        history_messages.extend(_row_to_history_messages(row))
+        if sequence > last_sequence:
+            last_sequence = sequence
+            ids_at_last = set()
+        if sequence == last_sequence:
+            ids_at_last.add(row_id)
+
+    _history_cache.put(
+        conversation_id,
+        (last_sequence, frozenset(ids_at_last), tuple(history_messages)),
+    )
+    return history_messages
+
+
+def _update_history_message(
+    svc: ChatService, message_id: str, conversation_id: str, **updates: Any
+) -> dict:
+    """Update a stored message and drop the conversation's cached history.
+
+    assistant_tool_call rows are inserted with no tool calls and filled in
+    afterwards; an overlapping run may already have cached the empty row.
+    """
+    row = svc.update_message(message_id, conversation_id, **updates)
+    _history_cache.pop(conversation_id)
+    return row
+
+
+def _window_history(messages: list[Any], max_messages: int) -> list[Any]:
+    """Keep roughly the last *max_messages*, starting at a user turn.
+
+    The cut is moved back to the HumanMessage that opens the turn containing
+    the cut point, so that turn is kept whole (an assistant tool call is never
+    separated from its ToolMessage results) even if the window overflows.
+    """
+    if max_messages <= 0 or len(messages) <= max_messages:
+        return messages
+    for index in range(len(messages) - max_messages, -1, -1):
+        if isinstance(messages[index], HumanMessage):
+            return messages[index:]
+    return messages
+
+
+async def _name_conversation_if_untitled(
+    svc: ChatService,
+    conversation_id: str,
+    user_id: str,
+    *,
+    preferred_subjects: list[dict],
+    grade_level: str,
+) -> None:
+    try:
+        conv = await asyncio.to_thread(svc.get_conversation, conversation_id, user_id)
+        if conv.get("title"):
+            return
+        transcript_rows = await asyncio.to_thread(
+            svc.list_transcript_messages, conversation_id, user_id
+        )
+        naming = await _generate_conversation_naming(
+            transcript_rows=transcript_rows,
+            preferred_subjects=preferred_subjects,
+            grade_level=grade_level,
+        )
+        if naming and naming.get("title"):
+            await asyncio.to_thread(
+                svc.update_conversation_naming,
+                conversation_id,
+                title=naming["title"],
+                icon=naming.get("icon"),
+            )
+    except Exception:
+        logger.debug("Failed to auto-generate conversation naming", exc_info=True)
+
+
 async def stream_chat_response(
     *,
     conversation_id: str,
@@ -518,7 +638,7 @@ async def stream_chat_response(
     resume_run_id: str | None = None,
     is_question_answer: bool = False,
     idempotency_key: str | None = None,
-) -> AsyncGenerator[str, None]:
+) -> AsyncGenerator[bytes, None]:
     svc = ChatService()
     selected_model_mode = "thinking" if model_mode == "thinking" else "fast"
     selected_model_name = resolve_chat_model(selected_model_mode)
@@ -582,10 +702,10 @@ async def stream_chat_response(
     )
     svc.update_run(run_id, user_id, user_message_id=user_message["id"])
 
-    history_rows = svc.list_transcript_messages(conversation_id, user_id)
-    history_messages: list[Any] = []
-    for row in history_rows:
-        history_messages.extend(_row_to_history_messages(row))
+    history_messages = _window_history(
+        _load_history_messages(svc, conversation_id, user_id),
+        settings.CHAT_MAX_HISTORY_MESSAGES,
+    )
 
     graph = get_compiled_graph()
     state = {
@@ -617,12 +737,18 @@ async def stream_chat_response(
     seen_reasoning: dict[str, str] = {}
     clarification_emitted = False
     tool_call_counter = 0
-    pending_tools: list[dict[str, Any]] = []
+    # In-flight tool calls keyed by the LangChain run_id of their
+    # on_tool_start event, which on_tool_end carries too (insertion-ordered).
+    pending_tools: dict[str, dict[str, Any]] = {}
+    # Token deltas are the hottest frames (never persisted); their constant
+    # JSON head is encoded once per run.
+    text_delta_prefix = _delta_sse_prefix("assistant.block.delta", run_id)
+    reasoning_delta_prefix = _delta_sse_prefix("reasoning", run_id)
 
     def match_pending_visual_tool(payload: dict[str, Any]) -> dict[str, Any] | None:
         target_title = str(payload.get("title") or "").strip()
         target_type = str(payload.get("visual_type") or "").strip()
-        for tool in reversed(pending_tools):
+        for tool in reversed(pending_tools.values()):
             if tool.get("name") != "generate_visual":
                 continue
             args = tool.get("args") or {}
@@ -659,14 +785,7 @@ async def stream_chat_response(
                                 }
                             )
                         content_blocks[current_reasoning_block_index]["text"] += delta
-                        reasoning_frame = {
-                            "type": "reasoning",
-                            "run_id": run_id,
-                            "block_id": current_reasoning_block_index,
-                            "delta": delta,
-                        }
-                        yield _sse(reasoning_frame)
-                        persist_event(reasoning_frame, store=False)
+                        yield _delta_sse(reasoning_delta_prefix, current_reasoning_block_index, delta)
 
                     for delta in text_deltas:
                         if current_text_block_index is None:
@@ -688,14 +807,7 @@ async def stream_chat_response(
                             yield _sse(block_started_frame)
                             persist_event(block_started_frame)
                         content_blocks[current_text_block_index]["text"] += delta
-                        delta_frame = {
-                            "type": "assistant.block.delta",
-                            "delta": delta,
-                            "run_id": run_id,
-                            "block_id": current_text_block_index,
-                        }
-                        yield _sse(delta_frame)
-                        persist_event(delta_frame, store=False)
+                        yield _delta_sse(text_delta_prefix, current_text_block_index, delta)
 
             elif kind == "on_custom_event":
                 name = event.get("name", "")
@@ -717,14 +829,7 @@ async def stream_chat_response(
                                 }
                             )
                         content_blocks[current_reasoning_block_index]["text"] += delta
-                        reasoning_frame = {
-                            "type": "reasoning",
-                            "run_id": run_id,
-                            "block_id": current_reasoning_block_index,
-                            "delta": delta,
-                        }
-                        yield _sse(reasoning_frame)
-                        persist_event(reasoning_frame, store=False)
+                        yield _delta_sse(reasoning_delta_prefix, current_reasoning_block_index, delta)
 
                 elif name == "chat_text_delta":
                     delta = payload.get("delta")
@@ -748,14 +853,7 @@ async def stream_chat_response(
                             yield _sse(block_started_frame)
                             persist_event(block_started_frame)
                         content_blocks[current_text_block_index]["text"] += delta
-                        delta_frame = {
-                            "type": "assistant.block.delta",
-                            "delta": delta,
-                            "run_id": run_id,
-                            "block_id": current_text_block_index,
-                        }
-                        yield _sse(delta_frame)
-                        persist_event(delta_frame, store=False)
+                        yield _delta_sse(text_delta_prefix, current_text_block_index, delta)
 
                 elif name in {"chat_visual_snapshot", "chat_visual_done", "chat_visual_failed"}:
                     matched_tool = match_pending_visual_tool(payload)
@@ -830,7 +928,7 @@ async def stream_chat_response(
                     "args": tool_input,
                     "block_id": None,
                 }
-                pending_tools.append(pending_tool)
+                pending_tools[str(event.get("run_id") or tool_call_id)] = pending_tool
                 assistant_tool_calls.append(
                     {
                         "id": tool_call_id,
@@ -850,7 +948,8 @@ async def stream_chat_response(
                     )
                     assistant_call_message_id = call_message["id"]
 
-                svc.update_message(
+                _update_history_message(
+                    svc,
                     assistant_call_message_id,
                     conversation_id,
                     tool_calls=assistant_tool_calls,
@@ -906,11 +1005,13 @@ async def stream_chat_response(
                 name = event.get("name", "")
                 if not name:
                     continue
-                matched_tool = None
-                for idx, pt in enumerate(pending_tools):
-                    if pt["name"] == name:
-                        matched_tool = pending_tools.pop(idx)
-                        break
+                matched_tool = pending_tools.pop(str(event.get("run_id") or ""), None)
+                if matched_tool is None:
+                    # No run_id match: fall back to the oldest call of that tool.
+                    for key, pt in pending_tools.items():
+                        if pt["name"] == name:
+                            matched_tool = pending_tools.pop(key)
+                            break
                 matched_tool = matched_tool or {
                     "id": f"{run_id}:tool:unknown",
                     "name": name,
@@ -1223,19 +1324,17 @@ async def stream_chat_response(
     yield _sse(completed_frame)
     persist_event(completed_frame)
 
-    try:
-        conv = svc.get_conversation(conversation_id, user_id)
-        if not conv.get("title"):
-            naming = await _generate_conversation_naming(
-                transcript_rows=svc.list_transcript_messages(conversation_id, user_id),
-                preferred_subjects=preferred_subjects,
-                grade_level=grade_level,
-            )
-            if naming and naming.get("title"):
-                svc.update_conversation_naming(
-                    conversation_id,
-                    title=naming["title"],
-                    icon=naming.get("icon"),
-                )
-    except Exception:
-        logger.debug("Failed to auto-generate conversation naming", exc_info=True)
+    # Naming needs two reads and an LLM call; run it after the stream closes
+    # instead of holding the response open.
+    task = asyncio.create_task(
+        _name_conversation_if_untitled(
+            svc,
+            conversation_id,
+            user_id,
+            preferred_subjects=preferred_subjects,
+            grade_level=grade_level,
+        ),
+        name=f"chat-naming-{conversation_id}",
+    )
+    _naming_tasks.add(task)
+    task.add_done_callback(_naming_tasks.discard)
@@ -10,8 +10,8 @@ from __future__ import annotations
 
 import json
 import logging
-from collections import defaultdict
-from typing import Annotated, Literal, Optional
+from concurrent.futures import ThreadPoolExecutor
+from typing import Annotated, Any, Literal, Optional
 
 from langchain_core.callbacks.manager import adispatch_custom_event
 from langchain_core.runnables import RunnableConfig
@@ -21,9 +21,21 @@ from pydantic import BaseModel, ConfigDict, Field
 from app.api.http.services.visual_generation_service import DEFAULT_THEME, generate_visual_stream
 from app.core.database import get_b2b_db
 from app.utils.db import supabase_execute
+from app.utils.ttl_cache import TTLCache
 
 logger = logging.getLogger(__name__)
 
+# Subjects and curriculum trees are static reference data; the agent resolves
+# the same ones on every turn, so keep resolved matches, index nodes and
+# content subtrees per process for a few minutes.
+_subject_match_cache = TTLCache(maxsize=1024, ttl=600.0)
+_curriculum_index_cache = TTLCache(maxsize=256, ttl=600.0)
+_curriculum_subtree_cache = TTLCache(maxsize=2048, ttl=600.0)
+
+# Partial-match rows fetched when resolving a subject name; the exact match
+# (if any) is chosen among them.
+_SUBJECT_MATCH_CANDIDATES = 20
+
 
 # ── Year-level to education-level mapping ───────────────────────────────
 
@@ -64,34 +76,46 @@ def _resolve_subject(subject_name: str, year_level: str) -> _SubjectMatch | None
 
     Uses education_level derived from year_level to disambiguate subjects
     with the same name across different cycles (e.g. 'Português' exists
-    in every education level).
+    in every education level). Matches are cached per (name, year level).
     """
-    db = get_b2b_db()
-    education_level = _year_to_education_level(year_level)
+    cache_key = (subject_name, year_level)
+    cached = _subject_match_cache.get(cache_key)
+    if cached is not None:
+        return cached
+
+    match = _query_subject(subject_name, year_level)
+    if match is not None:
+        _subject_match_cache.put(cache_key, match)
+    return match
 
-    # Build base query — include global subjects (organization_id IS NULL)
-    def _build_query(name_filter: str):
-        query = (
-            db.table("subjects")
-            .select("id, name, education_level, grade_levels, color, icon")
-            .ilike("name", name_filter)
-            .eq("active", True)
-        )
-        if education_level:
-            query = query.eq("education_level", education_level)
-        return query
 
-    # Try exact match first (case-insensitive)
-    resp = supabase_execute(_build_query(subject_name).limit(1), entity="subjects")
-    if resp.data:
-        return _SubjectMatch(resp.data[0])
+def _pick_subject_match(rows: list[dict], subject_name: str) -> _SubjectMatch | None:
+    """Prefer a case-insensitive exact name match, else the first partial match."""
+    target = subject_name.casefold()
+    for row in rows:
+        if str(row.get("name") or "").casefold() == target:
+            return _SubjectMatch(row)
+    return _SubjectMatch(rows[0]) if rows else None
 
-    # Try partial match
-    resp = supabase_execute(_build_query(f"%{subject_name}%").limit(5), entity="subjects")
-    if resp.data:
-        return _SubjectMatch(resp.data[0])
 
-    return None
+def _query_subject(subject_name: str, year_level: str) -> _SubjectMatch | None:
+    db = get_b2b_db()
+    education_level = _year_to_education_level(year_level)
+
+    # One partial-match query; the exact match is picked out client-side
+    query = (
+        db.table("subjects")
+        .select("id, name, education_level, grade_levels, color, icon")
+        .ilike("name", f"%{subject_name}%")
+        .eq("active", True)
+    )
+    if education_level:
+        query = query.eq("education_level", education_level)
+
+    resp = supabase_execute(
+        query.order("name").limit(_SUBJECT_MATCH_CANDIDATES), entity="subjects"
+    )
+    return _pick_subject_match(resp.data or [], subject_name)
 
 
 def _resolve_subject_by_name(subject_name: str) -> _SubjectMatch | None:
@@ -100,24 +124,16 @@ def _resolve_subject_by_name(subject_name: str) -> _SubjectMatch | None:
         return None
 
     db = get_b2b_db()
-
-    def _build_query(name_filter: str):
-        return (
-            db.table("subjects")
-            .select("id, name, color, icon")
-            .ilike("name", name_filter)
-            .eq("active", True)
-        )
-
-    resp = supabase_execute(_build_query(normalized).limit(1), entity="subjects")
-    if resp.data:
-        return _SubjectMatch(resp.data[0])
-
-    resp = supabase_execute(_build_query(f"%{normalized}%").limit(5), entity="subjects")
-    if resp.data:
-        return _SubjectMatch(resp.data[0])
-
-    return None
+    resp = supabase_execute(
+        db.table("subjects")
+        .select("id, name, color, icon")
+        .ilike("name", f"%{normalized}%")
+        .eq("active", True)
+        .order("name")
+        .limit(_SUBJECT_MATCH_CANDIDATES),
+        entity="subjects",
+    )
+    return _pick_subject_match(resp.data or [], normalized)
 
 
 def _build_visual_theme_colors(subject_color: str | None) -> dict[str, str] | None:
@@ -141,34 +157,31 @@ def _build_visual_prompt(*, purpose: str, visual_content: str, learning_goal: st
 
 def _build_tree(nodes: list[dict]) -> str:
     """Build a hierarchical tree string from flat curriculum nodes (levels 0-2)."""
-    # Index nodes by parent_id
-    children_by_parent = defaultdict(list)
-    nodes_by_id = {}
-    roots = []
+    # Children by parent id, in input (sequence_order) order
+    children_by_parent: dict[Any, list[dict]] = {}
+    nodes_by_id: dict[Any, dict] = {}
+    roots: list[dict] = []
 
     for node in nodes:
         nodes_by_id[node["id"]] = node
         pid = node.get("parent_id")
-        if pid and pid in nodes_by_id:
-            children_by_parent[pid].append(node)
-        elif node.get("level", 0) == 0:
-            roots.append(node)
+        if (pid and pid in nodes_by_id) or node.get("level", 0) != 0:
+            children_by_parent.setdefault(pid, []).append(node)
         else:
-            children_by_parent[pid].append(node)
-
-    lines = []
+            roots.append(node)
 
-    def _format_node(node: dict, indent: int):
-        level = node.get("level", 0)
-        title = node.get("title", "")
+    # Iterative pre-order DFS; children are pushed reversed to keep their order
+    lines: list[str] = []
+    stack = [(root, 0) for root in reversed(roots)]
+    while stack:
+        node, indent = stack.pop()
         node_id = node.get("id", "")
-        prefix = "  " * indent
-        lines.append(f"{prefix}[L{level}] {title} (ID: {node_id})")
-        for child in children_by_parent.get(node_id, []):
-            _format_node(child, indent + 1)
-
-    for root in roots:
-        _format_node(root, 0)
+        lines.append(
+            f"{'  ' * indent}[L{node.get('level', 0)}] {node.get('title', '')} (ID: {node_id})"
+        )
+        children = children_by_parent.get(node_id)
+        if children:
+            stack.extend((child, indent + 1) for child in reversed(children))
 
     return "\n".join(lines)
 
@@ -207,6 +220,33 @@ def _preview_text(text: str, max_chars: int = 500) -> str:
     return compact[:max_chars].rsplit(" ", 1)[0].rstrip() + "..."
 
 
+def _fetch_index_nodes(db, subject_id: str, year_level: str) -> list[dict]:
+    """Curriculum nodes at levels 0-2 for every component, cached when non-empty.
+
+    Components are filtered client-side so the same rows also answer
+    "which components exist" when the requested one has no nodes.
+    """
+    cache_key = (subject_id, year_level)
+    cached = _curriculum_index_cache.get(cache_key)
+    if cached is not None:
+        return list(cached)
+
+    resp = supabase_execute(
+        db.table("curriculum")
+        .select("id, code, title, level, parent_id, has_children, description, subject_component")
+        .eq("subject_id", subject_id)
+        .eq("year_level", year_level)
+        .in_("level", [0, 1, 2])
+        .order("sequence_order")
+        .order("code"),
+        entity="curriculum",
+    )
+    nodes = resp.data or []
+    if nodes:
+        _curriculum_index_cache.put(cache_key, tuple(nodes))
+    return nodes
+
+
 @tool
 def get_curriculum_index(
     subject_name: str,
@@ -252,21 +292,7 @@ def get_curriculum_index(
     subject_id = subject.id
 
     try:
-        # Query all nodes at levels 0, 1, and 2
-        query = (
-            db.table("curriculum")
-            .select("id, code, title, level, parent_id, has_children, description")
-            .eq("subject_id", subject_id)
-            .eq("year_level", year_level)
-            .in_("level", [0, 1, 2])
-            .order("sequence_order")
-            .order("code")
-        )
-        if subject_component:
-            query = query.eq("subject_component", subject_component)
-
-        resp = supabase_execute(query, entity="curriculum")
-        nodes = resp.data or []
+        all_nodes = _fetch_index_nodes(db, subject_id, year_level)
     except Exception as e:
         logger.error("Failed to list curriculum nodes: %s", e)
         llm_text = f"Erro ao consultar o curriculo: {e}"
@@ -286,32 +312,24 @@ def get_curriculum_index(
             llm_text=llm_text,
         )
 
+    nodes = (
+        [n for n in all_nodes if n.get("subject_component") == subject_component]
+        if subject_component
+        else all_nodes
+    )
+
     if not nodes:
         msg = f"Nao encontrei topicos para '{subject_name}' no {year_level}o ano"
         if subject_component:
             msg += f" (componente: {subject_component})"
         msg += "."
-        available_components: list[str] = []
-        # Check available components
-        try:
-            comp_resp = supabase_execute(
-                db.table("curriculum")
-                .select("subject_component")
-                .eq("subject_id", subject_id)
-                .eq("year_level", year_level)
-                .eq("level", 0)
-                .limit(20),
-                entity="curriculum",
-            )
-            available_components = list({
-                r["subject_component"]
-                for r in (comp_resp.data or [])
-                if r.get("subject_component")
-            })
-            if available_components:
-                msg += f"\nComponentes disponiveis: {', '.join(sorted(available_components))}"
-        except Exception:
-            pass
+        available_components = sorted({
+            n["subject_component"]
+            for n in all_nodes
+            if n.get("level") == 0 and n.get("subject_component")
+        })
+        if available_components:
+            msg += f"\nComponentes disponiveis: {', '.join(available_components)}"
         return _tool_envelope(
             tool_name="get_curriculum_index",
             status="not_found",
@@ -374,6 +392,129 @@ def get_curriculum_index(
     )
 
 
+def _fetch_curriculum_subtree_via_rpc(db, node_id: str) -> dict | None:
+    """Fetch a node's subtree payload in one round-trip.
+
+    Returns ``{target, subject, leaves, branches, content}`` from the
+    `curriculum_subtree` RPC, or None when the RPC is unavailable so the
+    caller falls back to the table queries.
+    """
+    try:
+        response = db.rpc("curriculum_subtree", {"p_node_id": node_id}).execute()
+    except Exception:
+        logger.exception("RPC curriculum_subtree failed, falling back")
+        return None
+    return response.data or {}
+
+
+def _query_curriculum_subtree(db, node_id: str) -> dict:
+    """Table-query fallback for `_fetch_curriculum_subtree_via_rpc`."""
+    target_resp = supabase_execute(
+        db.table("curriculum")
+        .select("id, code, title, level, has_children, subject_id, year_level, subject_component, parent_id")
+        .eq("id", node_id)
+        .limit(1),
+        entity="curriculum",
+    )
+    if not target_resp.data:
+        return {"target": None}
+
+    target = target_resp.data[0]
+    target_code = target.get("code", "")
+    subject_id = target.get("subject_id")
+    year_level = target.get("year_level")
+    subject_component = target.get("subject_component")
+
+    def _fetch_subject() -> dict | None:
+        if not subject_id:
+            return None
+        try:
+            subj_resp = supabase_execute(
+                db.table("subjects").select("color, icon").eq("id", subject_id).limit(1),
+                entity="subjects",
+            )
+        except Exception:
+            return None
+        return subj_resp.data[0] if subj_resp.data else None
+
+    def _fetch_descendants(columns: str, *, has_children: bool) -> list[dict]:
+        # Descendants share the target's code prefix
+        query = (
+            db.table("curriculum")
+            .select(columns)
+            .like("code", f"{target_code}%")
+            .eq("subject_id", subject_id)
+            .eq("year_level", year_level)
+            .eq("has_children", has_children)
+            .order("sequence_order")
+            .order("code")
+        )
+        if subject_component:
+            query = query.eq("subject_component", subject_component)
+        return supabase_execute(query, entity="curriculum").data or []
+
+    def _fetch_content(leaf_ids: list[str]) -> list[dict]:
+        content_resp = supabase_execute(
+            db.table("base_content")
+            .select("curriculum_id, content_json, word_count")
+            .in_("curriculum_id", leaf_ids),
+            entity="base_content",
+        )
+        return content_resp.data or []
+
+    if not target.get("has_children", False):
+        # Leaf target: its own content row is all there is
+        with ThreadPoolExecutor(max_workers=2) as pool:
+            subject_future = pool.submit(_fetch_subject)
+            content = _fetch_content([node_id])
+            subject = subject_future.result()
+        return {
+            "target": target,
+            "subject": subject,
+            "leaves": [],
+            "branches": [],
+            "content": content,
+        }
+
+    # Subject, leaves and branch headers only depend on the target row, so
+    # fetch them concurrently; content waits for the leaf ids.
+    with ThreadPoolExecutor(max_workers=2) as pool:
+        subject_future = pool.submit(_fetch_subject)
+        branches_future = (
+            pool.submit(_fetch_descendants, "id, code, title, level, parent_id", has_children=True)
+            if target.get("level", 0) < 3
+            else None
+        )
+        leaves = _fetch_descendants(
+            "id, code, title, level, parent_id, has_children", has_children=False
+        )
+        content = _fetch_content([leaf["id"] for leaf in leaves]) if leaves else []
+        subject = subject_future.result()
+        branches = branches_future.result() if branches_future else []
+
+    return {
+        "target": target,
+        "subject": subject,
+        "leaves": leaves,
+        "branches": branches,
+        "content": content,
+    }
+
+
+def _get_curriculum_subtree(db, node_id: str) -> dict:
+    """Subtree payload for ``node_id``, cached when the node exists."""
+    cached = _curriculum_subtree_cache.get(node_id)
+    if cached is not None:
+        return cached
+
+    subtree = _fetch_curriculum_subtree_via_rpc(db, node_id)
+    if subtree is None:
+        subtree = _query_curriculum_subtree(db, node_id)
+    if subtree.get("target"):
+        _curriculum_subtree_cache.put(node_id, subtree)
+    return subtree
+
+
 @tool
 def get_curriculum_content(node_id: str) -> str:
     """Read the educational content under any curriculum node.
@@ -391,15 +532,10 @@ def get_curriculum_content(node_id: str) -> str:
     input_payload = {"node_id": node_id}
 
     try:
-        # 1. Fetch the target node
-        target_resp = supabase_execute(
-            db.table("curriculum")
-            .select("id, code, title, level, has_children, subject_id, year_level, subject_component, parent_id")
-            .eq("id", node_id)
-            .limit(1),
-            entity="curriculum",
-        )
-        if not target_resp.data:
+        subtree = _get_curriculum_subtree(db, node_id)
+
+        target = subtree.get("target")
+        if not target:
             llm_text = f"Nao encontrei o no curricular com ID '{node_id}'."
             return _tool_envelope(
                 tool_name="get_curriculum_content",
@@ -416,7 +552,6 @@ def get_curriculum_content(node_id: str) -> str:
                 llm_text=llm_text,
             )
 
-        target = target_resp.data[0]
         target_code = target.get("code", "")
         target_title = target.get("title", "")
         target_level = target.get("level", 0)
@@ -425,42 +560,17 @@ def get_curriculum_content(node_id: str) -> str:
         target_year_level = target.get("year_level")
         target_subject_component = target.get("subject_component")
 
-        # Fetch subject color/icon for UI
-        _subj_color = None
-        _subj_icon = None
-        if target_subject_id:
-            try:
-                _subj_resp = supabase_execute(
-                    db.table("subjects").select("color, icon").eq("id", target_subject_id).limit(1),
-                    entity="subjects",
-                )
-                if _subj_resp.data:
-                    _subj_color = _subj_resp.data[0].get("color")
-                    _subj_icon = _subj_resp.data[0].get("icon")
-            except Exception:
-                pass
+        # Subject color/icon for UI
+        subject = subtree.get("subject") or {}
+        _subj_color = subject.get("color")
+        _subj_icon = subject.get("icon")
 
-        # 2. Find all leaf nodes under this node
         if not has_children:
-            # This IS a leaf node — just fetch its content directly
+            # This IS a leaf node — its own content is all there is
             leaf_ids = [node_id]
             leaves_by_id = {node_id: target}
         else:
-            # Find all descendants using code prefix pattern, then filter to leaves
-            leaf_query = (
-                db.table("curriculum")
-                .select("id, code, title, level, parent_id, has_children")
-                .like("code", f"{target_code}%")
-                .eq("subject_id", target_subject_id)
-                .eq("year_level", target_year_level)
-                .eq("has_children", False)
-                .order("sequence_order")
-                .order("code")
-            )
-            if target_subject_component:
-                leaf_query = leaf_query.eq("subject_component", target_subject_component)
-            leaf_resp = supabase_execute(leaf_query, entity="curriculum")
-            leaves = leaf_resp.data or []
+            leaves = subtree.get("leaves") or []
             if not leaves:
                 llm_text = (
                     f"## {target_code} — {target_title}\n\n"
@@ -495,41 +605,15 @@ def get_curriculum_content(node_id: str) -> str:
             leaf_ids = [l["id"] for l in leaves]
             leaves_by_id = {l["id"]: l for l in leaves}
 
-        # 3. Batch-fetch base_content for all leaf curriculum_ids
-        content_resp = supabase_execute(
-            db.table("base_content")
-            .select("curriculum_id, content_json, word_count")
-            .in_("curriculum_id", leaf_ids),
-            entity="base_content",
-        )
         content_by_curriculum = {
-            row["curriculum_id"]: row for row in (content_resp.data or [])
+            row["curriculum_id"]: row for row in (subtree.get("content") or [])
         }
-
-        # 4. Also fetch intermediate nodes for hierarchy headers (levels between target and leaves)
-        if has_children and target_level < 3:
-            hierarchy_query = (
-                db.table("curriculum")
-                .select("id, code, title, level, parent_id")
-                .like("code", f"{target_code}%")
-                .eq("subject_id", target_subject_id)
-                .eq("year_level", target_year_level)
-                .eq("has_children", True)
-                .order("sequence_order")
-                .order("code")
-            )
-            if target_subject_component:
-                hierarchy_query = hierarchy_query.eq("subject_component", target_subject_component)
-            hierarchy_resp = supabase_execute(hierarchy_query, entity="curriculum")
-            branch_nodes = {n["id"]: n for n in (hierarchy_resp.data or [])}
-        else:
-            branch_nodes = {}
+        # Intermediate nodes for hierarchy headers (levels between target and leaves)
+        branch_nodes = {n["id"]: n for n in (subtree.get("branches") or [])}
 
         # 5. Format output with hierarchy
         parts = [f"## {target_code} — {target_title}\n"]
 
-        # Build parent lookup for hierarchy headers
-        all_nodes = {**branch_nodes, **leaves_by_id}
         # Track which headers we've already printed
         printed_headers = set()
 
@@ -538,15 +622,22 @@ def get_curriculum_content(node_id: str) -> str:
 
         for leaf_id in leaf_ids:
             leaf = leaves_by_id[leaf_id]
-            leaf_level = leaf.get("level", 3)
 
             # Print intermediate hierarchy headers
-            # Walk up from leaf to target level and collect ancestors
+            # Walk up from leaf to target level and collect ancestors. Headers
+            # are printed top-down, so once a printed ancestor is reached all
+            # of its own ancestors are printed too — stop there, which keeps
+            # the walk linear in the number of branch nodes overall.
             ancestors = []
             current = leaf
             while current:
                 pid = current.get("parent_id")
-                if pid and pid in branch_nodes and pid != node_id:
+                if (
+                    pid
+                    and pid in branch_nodes
+                    and pid != node_id
+                    and pid not in printed_headers
+                ):
                     parent = branch_nodes[pid]
                     if parent.get("level", 0) > target_level:
                         ancestors.append(parent)
@@ -556,12 +647,10 @@ def get_curriculum_content(node_id: str) -> str:
 
             # Print ancestors from highest to lowest level
             for ancestor in reversed(ancestors):
-                aid = ancestor["id"]
-                if aid not in printed_headers:
-                    printed_headers.add(aid)
-                    a_level = ancestor.get("level", 0)
-                    heading = "#" * (a_level - target_level + 2)
-                    parts.append(f"\n{heading} {ancestor.get('title', '')}\n")
+                printed_headers.add(ancestor["id"])
+                a_level = ancestor.get("level", 0)
+                heading = "#" * (a_level - target_level + 2)
+                parts.append(f"\n{heading} {ancestor.get('title', '')}\n")
 
             # Print leaf content
             content_row = content_by_curriculum.get(leaf_id)
@@ -37,6 +37,7 @@ class Settings(BaseSettings):
     OPENROUTER_IMAGE_MODEL: str = "google/gemini-3.1-flash-image-preview"
     CHAT_TEMPERATURE: float = 0.8
     CHAT_MAX_TOKENS: int = 4096
+    CHAT_MAX_HISTORY_MESSAGES: int = 20  # Sliding window of prior messages sent to the LLM
 
     # Pipeline config
     PIPELINE_MAX_CONCURRENCY: int = 3
@@ -1,4 +1,9 @@
-from supabase import Client, create_client
+from decimal import Decimal
+from functools import wraps
+
+import httpx
+import orjson
+from supabase import Client, ClientOptions, create_client
 
 from app.core.config import settings
 
@@ -6,9 +11,70 @@ from app.core.config import settings
 supabase_b2b: Client | None = None
 supabase_content: Client | None = None
 
+# Idle Supabase connections kept open between queries, so bursts of small
+# reads/writes reuse warm TLS connections instead of re-handshaking.
+_POSTGREST_KEEPALIVE_CONNECTIONS = 20
+_POSTGREST_KEEPALIVE_EXPIRY_SECONDS = 30.0
+# Same as supabase-py's default postgrest_client_timeout
+_POSTGREST_TIMEOUT_SECONDS = 120.0
+
+
+def _orjson_default(value):
+    """Serialize types orjson does not handle natively (grades are NUMERIC)."""
+    if isinstance(value, Decimal):
+        return str(value)
+    raise TypeError(f"Object of type {type(value).__name__} is not JSON serializable")
+
+
+def _use_orjson_request_bodies(session: httpx.Client) -> httpx.Client:
+    """Encode JSON request bodies with orjson instead of stdlib json.
+
+    postgrest-py hands insert/update/upsert payloads to httpx as ``json=``,
+    which httpx encodes with the stdlib encoder. Bulk writes (period rows,
+    element copies, enrollments) spend noticeable CPU there, so we pre-encode
+    the body and pass it as raw ``content`` instead.
+    """
+    build_request = session.build_request
+
+    @wraps(build_request)
+    def _build_request(*args, json=None, content=None, headers=None, **kwargs):
+        if json is not None and content is None:
+            content = orjson.dumps(json, default=_orjson_default)
+            headers = {**(headers or {}), "Content-Type": "application/json"}
+        return build_request(*args, content=content, headers=headers, **kwargs)
+
+    session.build_request = _build_request
+    return session
+
+
+def _build_http_client() -> httpx.Client:
+    """HTTP/2 client with a longer-lived keep-alive pool for Supabase calls.
+
+    httpx drops idle connections after 5 seconds by default, which is shorter
+    than the gaps between queries in a streaming generation request. HTTP/2
+    matches the session postgrest-py builds for itself when none is given.
+    """
+    return _use_orjson_request_bodies(
+        httpx.Client(
+            http2=True,
+            timeout=_POSTGREST_TIMEOUT_SECONDS,
+            follow_redirects=True,
+            limits=httpx.Limits(
+                max_keepalive_connections=_POSTGREST_KEEPALIVE_CONNECTIONS,
+                keepalive_expiry=_POSTGREST_KEEPALIVE_EXPIRY_SECONDS,
+            ),
+        )
+    )
+
+
+def _create_client(url: str, key: str) -> Client:
+    return create_client(
+        url, key, options=ClientOptions(httpx_client=_build_http_client())
+    )
+
 
 def _build_b2b_client() -> Client:
-    return create_client(settings.SUPABASE_URL_B2B, settings.SUPABASE_SERVICE_KEY_B2B)
+    return _create_client(settings.SUPABASE_URL_B2B, settings.SUPABASE_SERVICE_KEY_B2B)
 
 
 def _build_content_client() -> Client:
@@ -17,7 +83,7 @@ def _build_content_client() -> Client:
             "B2C Supabase is not configured. Set SUPABASE_URL_B2C and SUPABASE_SERVICE_KEY_B2C "
             "before using content endpoints."
         )
-    return create_client(settings.SUPABASE_URL_B2C, settings.SUPABASE_SERVICE_KEY_B2C)
+    return _create_client(settings.SUPABASE_URL_B2C, settings.SUPABASE_SERVICE_KEY_B2C)
 
 
 def get_b2b_db() -> Client:
@@ -6,6 +6,7 @@ from fastapi.middleware.cors import CORSMiddleware
 
 from app.api.http.router import api_router
 from app.core.config import settings
+from app.pipeline.clients.openrouter import aclose_client as aclose_openrouter_client
 from app.pipeline.task_manager import pipeline_manager
 
 logger = logging.getLogger(__name__)
@@ -56,6 +57,7 @@ async def lifespan(app: FastAPI):
     yield
     # SHUTDOWN: wait for in-flight tasks to finish
     await pipeline_manager.shutdown(timeout=30.0)
+    await aclose_openrouter_client()
 
 
 app = FastAPI(
@@ -72,6 +74,8 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    # Paginated question bank responses carry the next page cursor here
+    expose_headers=["X-Next-Cursor"],
 )
 
 
@@ -8,13 +8,13 @@ Used by the categorization, question extraction, and quiz generation steps.
 from __future__ import annotations
 
 import asyncio
-import json
 import logging
 import re
 from collections.abc import AsyncGenerator
 from typing import TYPE_CHECKING, Any, TypeVar
 
 import httpx
+import orjson
 from openai import AsyncOpenAI
 from pydantic import BaseModel
 
@@ -35,6 +35,13 @@ RETRY_DELAYS = [2, 4, 8]  # seconds
 REQUEST_TIMEOUT = 120.0  # seconds
 MAX_JSON_FIX_RETRIES = 2  # extra LLM calls to fix malformed JSON
 
+# Keep-alive pool shared by every OpenRouter call, so pipeline steps reuse
+# warm TLS connections instead of handshaking per request.
+_KEEPALIVE_CONNECTIONS = 20
+_MAX_CONNECTIONS = 100
+
+_client: httpx.AsyncClient | None = None
+
 JSON_FIX_PROMPT = (
     "Your previous response was not valid JSON. Below is the output you produced "
     "and the parsing error. Please return ONLY the corrected, valid JSON — no "
@@ -52,6 +59,29 @@ class OpenRouterError(Exception):
         self.status_code = status_code
 
 
+def _get_client() -> httpx.AsyncClient:
+    """Shared AsyncClient, created lazily on first use."""
+    global _client
+    if _client is None or _client.is_closed:
+        _client = httpx.AsyncClient(
+            http2=True,
+            timeout=REQUEST_TIMEOUT,
+            limits=httpx.Limits(
+                max_keepalive_connections=_KEEPALIVE_CONNECTIONS,
+                max_connections=_MAX_CONNECTIONS,
+            ),
+        )
+    return _client
+
+
+async def aclose_client() -> None:
+    """Close the shared AsyncClient (called on application shutdown)."""
+    global _client
+    if _client is not None:
+        await _client.aclose()
+        _client = None
+
+
 def _strip_code_fences(content: str) -> str:
     """Strip markdown code fences (```json ... ```) from LLM output."""
     content = content.strip()
@@ -73,18 +103,83 @@ def _parse_json_lenient(content: str) -> dict:
     Parse JSON from LLM output, falling back to backslash sanitization
     for common LaTeX escaping issues.
 
-    Raises json.JSONDecodeError if both attempts fail.
+    Raises orjson.JSONDecodeError (a json.JSONDecodeError subclass) if both
+    attempts fail.
     """
     try:
-        return json.loads(content)
-    except json.JSONDecodeError:
+        return orjson.loads(content)
+    except orjson.JSONDecodeError:
         _VALID_JSON_ESCAPES = frozenset('"\\/bfnrtu')
         sanitized = re.sub(
             r'\\(.)',
             lambda m: m.group(0) if m.group(1) in _VALID_JSON_ESCAPES else '\\\\' + m.group(1),
             content,
         )
-        return json.loads(sanitized)
+        return orjson.loads(sanitized)
+
+
+async def _post_with_retry(payload: dict, headers: dict, *, kind: str) -> httpx.Response:
+    """POST ``payload`` to OpenRouter, retrying transient failures.
+
+    Returns the 200 response. Retryable status codes and connection errors
+    are retried up to MAX_RETRIES times with RETRY_DELAYS backoff; anything
+    else raises OpenRouterError. ``kind`` names the call in the final error.
+    """
+    last_error: Exception | None = None
+
+    for attempt in range(MAX_RETRIES + 1):
+        try:
+            response = await _get_client().post(
+                OPENROUTER_API_URL,
+                content=orjson.dumps(payload),
+                headers=headers,
+            )
+
+            if response.status_code == 200:
+                return response
+
+            # Retryable status codes
+            if response.status_code in (429, 500, 502, 503, 504):
+                last_error = OpenRouterError(
+                    f"OpenRouter returned {response.status_code}: {response.text[:500]}",
+                    status_code=response.status_code,
+                )
+                if attempt < MAX_RETRIES:
+                    delay = RETRY_DELAYS[attempt]
+                    logger.warning(
+                        "OpenRouter %d (attempt %d/%d), retrying in %ds...",
+                        response.status_code,
+                        attempt + 1,
+                        MAX_RETRIES + 1,
+                        delay,
+                    )
+                    await asyncio.sleep(delay)
+                    continue
+
+            # Non-retryable error
+            raise OpenRouterError(
+                f"OpenRouter returned {response.status_code}: {response.text[:500]}",
+                status_code=response.status_code,
+            )
+
+        except (httpx.TimeoutException, httpx.ConnectError) as exc:
+            last_error = exc
+            if attempt < MAX_RETRIES:
+                delay = RETRY_DELAYS[attempt]
+                logger.warning(
+                    "OpenRouter connection error (attempt %d/%d): %s, retrying in %ds...",
+                    attempt + 1,
+                    MAX_RETRIES + 1,
+                    str(exc),
+                    delay,
+                )
+                await asyncio.sleep(delay)
+                continue
+
+    # All retries exhausted
+    raise OpenRouterError(
+        f"OpenRouter {kind} failed after {MAX_RETRIES + 1} attempts: {last_error}"
+    )
 
 
 async def _retry_json_with_fix(
@@ -133,12 +228,11 @@ async def _retry_json_with_fix(
         )
 
         try:
-            async with httpx.AsyncClient(timeout=REQUEST_TIMEOUT) as client:
-                response = await client.post(
-                    OPENROUTER_API_URL,
-                    json=payload,
-                    headers=headers,
-                )
+            response = await _get_client().post(
+                OPENROUTER_API_URL,
+                content=orjson.dumps(payload),
+                headers=headers,
+            )
 
             if response.status_code != 200:
                 raise OpenRouterError(
@@ -147,12 +241,12 @@ async def _retry_json_with_fix(
                     status_code=response.status_code,
                 )
 
-            data = response.json()
+            data = orjson.loads(response.content)
             content = data["choices"][0]["message"]["content"]
             content = _strip_code_fences(content)
             return _parse_json_lenient(content)
 
-        except json.JSONDecodeError as exc:
+        except orjson.JSONDecodeError as exc:
             malformed_output = content  # type: ignore[possibly-undefined]
             parse_error = str(exc)
             logger.warning(
@@ -224,96 +318,42 @@ async def chat_completion(
         "Content-Type": "application/json",
     }
 
-    last_error: Exception | None = None
-
-    for attempt in range(MAX_RETRIES + 1):
-        try:
-            async with httpx.AsyncClient(timeout=REQUEST_TIMEOUT) as client:
-                response = await client.post(
-                    OPENROUTER_API_URL,
-                    json=payload,
-                    headers=headers,
-                )
-
-            if response.status_code == 200:
-                data = response.json()
-                choice = data["choices"][0]
-                content = choice["message"]["content"]
-                finish_reason = choice.get("finish_reason", "stop")
-
-                # Detect truncated output — LLM hit token limit
-                if finish_reason == "length":
-                    logger.warning(
-                        "OpenRouter response truncated (finish_reason=length, max_tokens=%d). "
-                        "Output may be incomplete.",
-                        max_tokens,
-                    )
-
-                content = _strip_code_fences(content)
-
-                try:
-                    return _parse_json_lenient(content)
-                except json.JSONDecodeError as exc:
-                    # JSON parsing failed even after sanitization —
-                    # retry by asking the model to fix its own output
-                    logger.warning(
-                        "JSON parse failed after sanitization: %s — "
-                        "attempting self-correction retry",
-                        exc,
-                    )
-                    return await _retry_json_with_fix(
-                        messages=messages,
-                        malformed_output=content,
-                        parse_error=str(exc),
-                        model=model,
-                        response_format=response_format,
-                        temperature=temperature,
-                        max_tokens=max_tokens,
-                        headers=headers,
-                    )
-
-            # Retryable status codes
-            if response.status_code in (429, 500, 502, 503, 504):
-                last_error = OpenRouterError(
-                    f"OpenRouter returned {response.status_code}: {response.text[:500]}",
-                    status_code=response.status_code,
-                )
-                if attempt < MAX_RETRIES:
-                    delay = RETRY_DELAYS[attempt]
-                    logger.warning(
-                        "OpenRouter %d (attempt %d/%d), retrying in %ds...",
-                        response.status_code,
-                        attempt + 1,
-                        MAX_RETRIES + 1,
-                        delay,
-                    )
-                    await asyncio.sleep(delay)
-                    continue
+    response = await _post_with_retry(payload, headers, kind="request")
+    data = orjson.loads(response.content)
+    choice = data["choices"][0]
+    content = choice["message"]["content"]
+    finish_reason = choice.get("finish_reason", "stop")
 
-            # Non-retryable error
-            raise OpenRouterError(
-                f"OpenRouter returned {response.status_code}: {response.text[:500]}",
-                status_code=response.status_code,
-            )
+    # Detect truncated output — LLM hit token limit
+    if finish_reason == "length":
+        logger.warning(
+            "OpenRouter response truncated (finish_reason=length, max_tokens=%d). "
+            "Output may be incomplete.",
+            max_tokens,
+        )
 
-        except (httpx.TimeoutException, httpx.ConnectError) as exc:
-            last_error = exc
-            if attempt < MAX_RETRIES:
-                delay = RETRY_DELAYS[attempt]
-                logger.warning(
-                    "OpenRouter connection error (attempt %d/%d): %s, retrying in %ds...",
-                    attempt + 1,
-                    MAX_RETRIES + 1,
-                    str(exc),
-                    delay,
-                )
-                await asyncio.sleep(delay)
-                continue
+    content = _strip_code_fences(content)
 
-    # All retries exhausted
-    raise OpenRouterError(
-        f"OpenRouter request failed after {MAX_RETRIES + 1} attempts: {last_error}"
-    )
+    try:
+        return _parse_json_lenient(content)
+    except orjson.JSONDecodeError as exc:
+        # JSON parsing failed even after sanitization —
+        # retry by asking the model to fix its own output
+        logger.warning(
+            "JSON parse failed after sanitization: %s — "
+            "attempting self-correction retry",
+            exc,
+        )
+        return await _retry_json_with_fix(
+            messages=messages,
+            malformed_output=content,
+            parse_error=str(exc),
+            model=model,
+            response_format=response_format,
+            temperature=temperature,
+            max_tokens=max_tokens,
+            headers=headers,
+        )
 
 
 async def chat_completion_text(
@@ -352,63 +392,9 @@ async def chat_completion_text(
         "Content-Type": "application/json",
     }
 
-    last_error: Exception | None = None
-
-    for attempt in range(MAX_RETRIES + 1):
-        try:
-            async with httpx.AsyncClient(timeout=REQUEST_TIMEOUT) as client:
-                response = await client.post(
-                    OPENROUTER_API_URL,
-                    json=payload,
-                    headers=headers,
-                )
-
-            if response.status_code == 200:
-                data = response.json()
-                return data["choices"][0]["message"]["content"]
-
-            # Retryable status codes
-            if response.status_code in (429, 500, 502, 503, 504):
-                last_error = OpenRouterError(
-                    f"OpenRouter returned {response.status_code}: {response.text[:500]}",
-                    status_code=response.status_code,
-                )
-                if attempt < MAX_RETRIES:
-                    delay = RETRY_DELAYS[attempt]
-                    logger.warning(
-                        "OpenRouter %d (attempt %d/%d), retrying in %ds...",
-                        response.status_code,
-                        attempt + 1,
-                        MAX_RETRIES + 1,
-                        delay,
-                    )
-                    await asyncio.sleep(delay)
-                    continue
-
-            # Non-retryable error
-            raise OpenRouterError(
-                f"OpenRouter returned {response.status_code}: {response.text[:500]}",
-                status_code=response.status_code,
-            )
-
-        except (httpx.TimeoutException, httpx.ConnectError) as exc:
-            last_error = exc
-            if attempt < MAX_RETRIES:
-                delay = RETRY_DELAYS[attempt]
-                logger.warning(
-                    "OpenRouter connection error (attempt %d/%d): %s, retrying in %ds...",
-                    attempt + 1,
-                    MAX_RETRIES + 1,
-                    str(exc),
-                    delay,
-                )
-                await asyncio.sleep(delay)
-                continue
-
-    # All retries exhausted
-    raise OpenRouterError(
-        f"OpenRouter text request failed after {MAX_RETRIES + 1} attempts: {last_error}"
-    )
+    response = await _post_with_retry(payload, headers, kind="text request")
+    data = orjson.loads(response.content)
+    return data["choices"][0]["message"]["content"]
 
 
 def _coerce_stream_text_chunk(content: Any) -> str:
@@ -490,64 +476,64 @@ async def chat_completion_text_stream(
         emitted_any = False
 
         try:
-            async with httpx.AsyncClient(timeout=timeout) as client:
-                async with client.stream(
-                    "POST",
-                    OPENROUTER_API_URL,
-                    json=payload,
-                    headers=headers,
-                ) as response:
-                    if response.status_code == 200:
-                        async for line in response.aiter_lines():
-                            trimmed = line.strip()
-                            if not trimmed or not trimmed.startswith("data:"):
-                                continue
-
-                            data = trimmed[5:].strip()
-                            if data == "[DONE]":
-                                return
-
-                            try:
-                                chunk = json.loads(data)
-                            except json.JSONDecodeError:
-                                logger.debug("Skipping malformed OpenRouter stream chunk: %s", data[:200])
-                                continue
-
-                            choices = chunk.get("choices") or []
-                            if not choices:
-                                continue
-
-                            delta = choices[0].get("delta", {})
-                            text_chunk = _coerce_stream_text_chunk(delta.get("content"))
-                            if text_chunk:
-                                emitted_any = True
-                                yield text_chunk
-
-                        return
-
-                    if response.status_code in (429, 500, 502, 503, 504):
-                        error_text = await response.aread()
-                        last_error = OpenRouterError(
-                            f"OpenRouter returned {response.status_code}: {error_text[:500].decode(errors='ignore')}",
-                            status_code=response.status_code,
-                        )
-                        if attempt < MAX_RETRIES:
-                            delay = RETRY_DELAYS[attempt]
-                            logger.warning(
-                                "OpenRouter stream %d (attempt %d/%d), retrying in %ds...",
-                                response.status_code,
-                                attempt + 1,
-                                MAX_RETRIES + 1,
-                                delay,
-                            )
-                            await asyncio.sleep(delay)
+            async with _get_client().stream(
+                "POST",
+                OPENROUTER_API_URL,
+                content=orjson.dumps(payload),
+                headers=headers,
+                timeout=timeout,
+            ) as response:
+                if response.status_code == 200:
+                    async for line in response.aiter_lines():
+                        trimmed = line.strip()
+                        if not trimmed or not trimmed.startswith("data:"):
+                            continue
+
+                        data = trimmed[5:].strip()
+                        if data == "[DONE]":
+                            return
+
+                        try:
+                            chunk = orjson.loads(data)
+                        except orjson.JSONDecodeError:
+                            logger.debug("Skipping malformed OpenRouter stream chunk: %s", data[:200])
                             continue
 
+                        choices = chunk.get("choices") or []
+                        if not choices:
+                            continue
+
+                        delta = choices[0].get("delta", {})
+                        text_chunk = _coerce_stream_text_chunk(delta.get("content"))
+                        if text_chunk:
+                            emitted_any = True
+                            yield text_chunk
+
+                    return
+
+                if response.status_code in (429, 500, 502, 503, 504):
                     error_text = await response.aread()
-                    raise OpenRouterError(
+                    last_error = OpenRouterError(
                         f"OpenRouter returned {response.status_code}: {error_text[:500].decode(errors='ignore')}",
                         status_code=response.status_code,
                     )
+                    if attempt < MAX_RETRIES:
+                        delay = RETRY_DELAYS[attempt]
+                        logger.warning(
+                            "OpenRouter stream %d (attempt %d/%d), retrying in %ds...",
+                            response.status_code,
+                            attempt + 1,
+                            MAX_RETRIES + 1,
+                            delay,
+                        )
+                        await asyncio.sleep(delay)
+                        continue
+
+                error_text = await response.aread()
+                raise OpenRouterError(
+                    f"OpenRouter returned {response.status_code}: {error_text[:500].decode(errors='ignore')}",
+                    status_code=response.status_code,
+                )
 
         except (httpx.TimeoutException, httpx.ConnectError, httpx.ReadError) as exc:
             last_error = exc
@@ -638,15 +624,15 @@ async def generate_image(
 
     for attempt in range(MAX_RETRIES + 1):
         try:
-            async with httpx.AsyncClient(timeout=IMAGE_REQUEST_TIMEOUT) as client:
-                response = await client.post(
-                    OPENROUTER_API_URL,
-                    json=payload,
-                    headers=headers,
-                )
+            response = await _get_client().post(
+                OPENROUTER_API_URL,
+                content=orjson.dumps(payload),
+                headers=headers,
+                timeout=IMAGE_REQUEST_TIMEOUT,
+            )
 
             if response.status_code == 200:
-                data = response.json()
+                data = orjson.loads(response.content)
                 message = data["choices"][0]["message"]
 
                 # Extract base64 image from response
@@ -19,12 +19,32 @@ from supabase import Client
 from app.pipeline.clients.openrouter import chat_completion
 from app.pipeline.steps.image_utils import resolve_images_for_llm
 from app.utils.db import supabase_execute
+from app.utils.prompt_template import compile_template, render_template
+from app.utils.ttl_cache import TTLCache
 
 logger = logging.getLogger(__name__)
 
 # Only subjects with a built curriculum tree can be categorized.
 CATEGORIZABLE_STATUSES = {"full", "structure"}
 
+# Subject names and curriculum trees are edited rarely but read on every
+# categorization, quiz match and generation run; keep them per process for a
+# few minutes, keyed by the query scope.
+_LOOKUP_CACHE_TTL_SECONDS = 300.0
+_LOOKUP_CACHE_MAX_ENTRIES = 256
+_subject_name_cache = TTLCache(
+    maxsize=_LOOKUP_CACHE_MAX_ENTRIES, ttl=_LOOKUP_CACHE_TTL_SECONDS
+)
+_curriculum_tree_cache = TTLCache(
+    maxsize=_LOOKUP_CACHE_MAX_ENTRIES, ttl=_LOOKUP_CACHE_TTL_SECONDS
+)
+_serialized_tree_cache = TTLCache(
+    maxsize=_LOOKUP_CACHE_MAX_ENTRIES, ttl=_LOOKUP_CACHE_TTL_SECONDS
+)
+_curriculum_codes_cache = TTLCache(
+    maxsize=_LOOKUP_CACHE_MAX_ENTRIES, ttl=_LOOKUP_CACHE_TTL_SECONDS
+)
+
 SYSTEM_PROMPT = (
     "You are a curriculum tagging assistant for Portuguese secondary education.\n"
     "Your job is to map document content to the official curriculum taxonomy.\n"
@@ -62,6 +82,7 @@ Respond with ONLY this JSON structure:
   "curriculum_codes": ["CODE_1"],
   "subject_component": "Física"
 }}"""
+_USER_PROMPT_WITH_COMPONENT_PARTS = compile_template(USER_PROMPT_TEMPLATE_WITH_COMPONENT)
 
 USER_PROMPT_TEMPLATE_NO_COMPONENT = """\
 The teacher has indicated this document belongs to:
@@ -91,6 +112,7 @@ Respond with ONLY this JSON structure:
 {{
   "curriculum_codes": ["CODE_1"]
 }}"""
+_USER_PROMPT_NO_COMPONENT_PARTS = compile_template(USER_PROMPT_TEMPLATE_NO_COMPONENT)
 
 
 
@@ -162,14 +184,16 @@ async def categorize_document(
 
     # 7. Build prompt (component-aware) and call LLM
     if has_components:
-        user_text = USER_PROMPT_TEMPLATE_WITH_COMPONENT.format(
+        user_text = render_template(
+            _USER_PROMPT_WITH_COMPONENT_PARTS,
             subject_name=subject_name,
             year_level=year_level,
             serialized_tree=serialized_tree,
             markdown_content=markdown,
         )
     else:
-        user_text = USER_PROMPT_TEMPLATE_NO_COMPONENT.format(
+        user_text = render_template(
+            _USER_PROMPT_NO_COMPONENT_PARTS,
             subject_name=subject_name,
             year_level=year_level,
             serialized_tree=serialized_tree,
@@ -264,7 +288,11 @@ def get_subject_status(db: Client, subject_id: str) -> str | None:
 
 
 def get_subject_name(db: Client, subject_id: str) -> str | None:
-    """Get the display name for a subject."""
+    """Get the display name for a subject (cached for a few minutes)."""
+    cached = _subject_name_cache.get(subject_id)
+    if cached is not None:
+        return cached
+
     response = supabase_execute(
         db.table("subjects")
         .select("name")
@@ -273,7 +301,10 @@ def get_subject_name(db: Client, subject_id: str) -> str | None:
         entity="subject",
     )
     rows = response.data or []
-    return rows[0]["name"] if rows else None
+    name = rows[0]["name"] if rows else None
+    if name:
+        _subject_name_cache.put(subject_id, name)
+    return name
 
 
 def get_curriculum_tree(
@@ -286,11 +317,17 @@ def get_curriculum_tree(
     Query all curriculum nodes for the given scope, levels 0–2 only.
 
     Unlike the API endpoint which fetches one parent level at a time,
-    we fetch the entire tree at once for the LLM prompt.
+    we fetch the entire tree at once for the LLM prompt. Results are cached
+    for a few minutes per scope; callers get fresh dict copies they may mutate.
     """
+    cache_key = (subject_id, year_level, subject_component)
+    cached = _curriculum_tree_cache.get(cache_key)
+    if cached is not None:
+        return [dict(node) for node in cached]
+
     query = (
         db.table("curriculum")
-        .select("code,title,keywords,level,subject_component")
+        .select("id,code,title,full_path,keywords,level,subject_component")
         .eq("subject_id", subject_id)
         .eq("year_level", year_level)
         .in_("level", [0, 1, 2])
@@ -301,7 +338,9 @@ def get_curriculum_tree(
         query = query.eq("subject_component", subject_component)
 
     response = supabase_execute(query, entity="curriculum")
-    return response.data or []
+    nodes = response.data or []
+    _curriculum_tree_cache.put(cache_key, tuple(nodes))
+    return [dict(node) for node in nodes]
 
 
 def serialize_tree(nodes: list[dict], *, include_component: bool = False) -> str:
@@ -331,6 +370,51 @@ def serialize_tree(nodes: list[dict], *, include_component: bool = False) -> str
     return "\n".join(lines)
 
 
+def get_serialized_curriculum_tree(
+    db: Client,
+    subject_id: str,
+    year_level: str,
+    subject_component: str | None,
+    *,
+    include_component: bool | None = None,
+) -> str:
+    """
+    Fetch and serialize the curriculum tree for a scope, cached per scope.
+
+    ``include_component=None`` labels nodes with their component whenever
+    any node in the tree has one. Returns an empty string for an empty tree.
+    """
+    cache_key = (subject_id, year_level, subject_component, include_component)
+    cached = _serialized_tree_cache.get(cache_key)
+    if cached is not None:
+        return cached
+
+    nodes = get_curriculum_tree(db, subject_id, year_level, subject_component)
+    if include_component is None:
+        include_component = any(n.get("subject_component") for n in nodes)
+    serialized = serialize_tree(nodes, include_component=include_component)
+    _serialized_tree_cache.put(cache_key, serialized)
+    return serialized
+
+
+def get_curriculum_codes(
+    db: Client,
+    subject_id: str,
+    year_level: str,
+    subject_component: str | None,
+) -> frozenset[str]:
+    """Return the set of codes in the scope's curriculum tree, cached per scope."""
+    cache_key = (subject_id, year_level, subject_component)
+    cached = _curriculum_codes_cache.get(cache_key)
+    if cached is not None:
+        return cached
+
+    nodes = get_curriculum_tree(db, subject_id, year_level, subject_component)
+    codes = frozenset(n["code"] for n in nodes if n.get("code"))
+    _curriculum_codes_cache.put(cache_key, codes)
+    return codes
+
+
 # ── Question-level categorization (Flow C) ──────────────────
 
 
@@ -370,6 +454,7 @@ Rules:
     {{"question_id": "uuid", "curriculum_codes": ["CODE_1"], "year_level": "10"}}
   ]
 }}"""
+_QUESTION_CATEGORIZATION_USER_PARTS = compile_template(QUESTION_CATEGORIZATION_USER_TEMPLATE)
 
 
 
@@ -469,7 +554,8 @@ async def categorize_questions(
     logger.info("Categorizing %d questions for artifact %s", len(all_questions), artifact_id)
     serialized_questions = _serialize_questions(all_questions)
 
-    user_text = QUESTION_CATEGORIZATION_USER_TEMPLATE.format(
+    user_text = render_template(
+        _QUESTION_CATEGORIZATION_USER_PARTS,
         subject_name=subject_name,
         subject_component=subject_component or "N/A",
         year_levels=", ".join(f"{y}º ano" for y in year_levels),
@@ -817,8 +817,7 @@ def _flat_to_forest(flat_items: list[dict]) -> list[dict]:
 # ── Recursive insertion ───────────────────────────────────
 
 
-def _insert_tree_recursive(
-    db: Client,
+def _build_question_row(
     node: dict,
     *,
     parent_id: str | None,
@@ -829,12 +828,8 @@ def _insert_tree_recursive(
     year_level: str | None,
     subject_component: str | None,
     curriculum_codes: list[str],
-) -> list[str]:
-    """
-    Recursively insert a question node and all its children.
-
-    Returns list of all inserted question IDs.
-    """
+) -> dict:
+    """Build the ``questions`` insert payload for a single node."""
     q_type = validate_type(node.get("type"))
     content = node.get("content", {})
     if not isinstance(content, dict):
@@ -878,30 +873,24 @@ def _insert_tree_recursive(
     now = datetime.now(timezone.utc).isoformat()
     data["created_at"] = now
     data["updated_at"] = now
+    return data
 
-    response = supabase_execute(
-        db.table("questions").insert(data),
-        entity="question",
-    )
-    row = response.data[0] if response.data else {}
-    node_id = row["id"]
 
-    all_ids = [node_id]
-
-    # Recursively insert children
+def _insert_children(
+    db: Client,
+    node: dict,
+    node_id: str,
+    **tags,
+) -> list[str]:
+    """Insert the children of an already-inserted node; returns their IDs."""
+    all_ids: list[str] = []
     for child in node.get("children", []):
         try:
             child_ids = _insert_tree_recursive(
                 db,
                 child,
                 parent_id=node_id,
-                org_id=org_id,
-                user_id=user_id,
-                artifact_id=artifact_id,
-                subject_id=subject_id,
-                year_level=year_level,
-                subject_component=subject_component,
-                curriculum_codes=curriculum_codes,
+                **tags,
             )
             all_ids.extend(child_ids)
         except Exception as exc:
@@ -916,6 +905,45 @@ def _insert_tree_recursive(
     return all_ids
 
 
+def _insert_tree_recursive(
+    db: Client,
+    node: dict,
+    *,
+    parent_id: str | None,
+    org_id: str,
+    user_id: str,
+    artifact_id: str,
+    subject_id: str | None,
+    year_level: str | None,
+    subject_component: str | None,
+    curriculum_codes: list[str],
+) -> list[str]:
+    """
+    Recursively insert a question node and all its children.
+
+    Returns list of all inserted question IDs.
+    """
+    tags = {
+        "org_id": org_id,
+        "user_id": user_id,
+        "artifact_id": artifact_id,
+        "subject_id": subject_id,
+        "year_level": year_level,
+        "subject_component": subject_component,
+        "curriculum_codes": curriculum_codes,
+    }
+    data = _build_question_row(node, parent_id=parent_id, **tags)
+
+    response = supabase_execute(
+        db.table("questions").insert(data),
+        entity="question",
+    )
+    row = response.data[0] if response.data else {}
+    node_id = row["id"]
+
+    return [node_id, *_insert_children(db, node, node_id, **tags)]
+
+
 def insert_question_tree(
     db: Client,
     raw_q: dict,
@@ -951,6 +979,71 @@ def insert_question_tree(
     return parent_id, child_ids
 
 
+def insert_question_trees(
+    db: Client,
+    raw_qs: list[dict],
+    *,
+    org_id: str,
+    user_id: str,
+    artifact_id: str,
+    subject_id: str | None,
+    year_level: str | None,
+    subject_component: str | None,
+    curriculum_codes: list[str],
+) -> list[tuple[str, list[str]] | None]:
+    """
+    Insert several top-level questions with one multi-row insert.
+
+    Children (if any) are inserted per parent afterwards. Returns one
+    ``(parent_id, child_ids)`` per input, in order. If the bulk insert
+    fails, each question is retried on its own and failures come back as
+    *None* so one bad row does not drop the rest of the batch.
+    """
+    if not raw_qs:
+        return []
+
+    tags = {
+        "org_id": org_id,
+        "user_id": user_id,
+        "artifact_id": artifact_id,
+        "subject_id": subject_id,
+        "year_level": year_level,
+        "subject_component": subject_component,
+        "curriculum_codes": curriculum_codes,
+    }
+
+    try:
+        rows = [_build_question_row(q, parent_id=None, **tags) for q in raw_qs]
+        response = supabase_execute(
+            db.table("questions").insert(rows),
+            entity="question",
+        )
+    except Exception as exc:
+        logger.warning(
+            "Bulk question insert failed, inserting %d questions one by one: %s",
+            len(raw_qs),
+            exc,
+        )
+        results: list[tuple[str, list[str]] | None] = []
+        for raw_q in raw_qs:
+            try:
+                results.append(insert_question_tree(db, raw_q, **tags))
+            except Exception as item_exc:
+                logger.warning(
+                    "Failed to insert question (label=%s): %s",
+                    raw_q.get("label", "?"),
+                    item_exc,
+                )
+                results.append(None)
+        return results
+
+    # PostgREST returns the inserted rows in payload order
+    return [
+        (row["id"], _insert_children(db, raw_q, row["id"], **tags))
+        for raw_q, row in zip(raw_qs, response.data or [])
+    ]
+
+
 # ── Marker replacement ──────────────────────────────────────
 
 
@@ -1083,6 +1176,23 @@ def normalize_content(content: dict) -> dict:
     return content
 
 
+def mark_ai_generated_fields(content: dict) -> dict:
+    """
+    Record solution/criteria in ``ai_generated_fields`` when the AI set them.
+
+    Updates *content* in place (keeping any existing entries and their
+    order) and returns it.
+    """
+    fields = content.get("ai_generated_fields") or []
+    present = set(fields)
+    for field in ("solution", "criteria"):
+        if field not in present and content.get(field) is not None:
+            fields.append(field)
+            present.add(field)
+    content["ai_generated_fields"] = fields
+    return content
+
+
 def validate_type(raw_type: str | None) -> str:
     """Validate and normalize question type, defaulting to open_extended."""
     if raw_type and raw_type in VALID_QUESTION_TYPES:
@@ -0,0 +1,32 @@
+"""
+Pre-parsed prompt templates for the LLM call sites.
+
+``str.format`` re-parses the whole template on every call; the prompt
+templates are multi-KB and rendered on hot request paths, so they are split
+into ``(literal, field)`` parts once at import time and joined at render time.
+Only plain ``{name}`` fields are supported (plus ``{{``/``}}`` escapes).
+"""
+
+from __future__ import annotations
+
+from string import Formatter
+
+TemplateParts = tuple[tuple[str, str | None], ...]
+
+
+def compile_template(template: str) -> TemplateParts:
+    """Split a ``str.format`` template into ``(literal, field_name)`` parts."""
+    parts: list[tuple[str, str | None]] = []
+    for literal, field, spec, conversion in Formatter().parse(template):
+        if field is not None and (not field or spec or conversion):
+            raise ValueError(f"Unsupported template field: {{{field}}}")
+        parts.append((literal, field))
+    return tuple(parts)
+
+
+def render_template(parts: TemplateParts, **values: object) -> str:
+    """Render compiled parts; same output as ``template.format(**values)``."""
+    return "".join(
+        literal if field is None else literal + str(values[field])
+        for literal, field in parts
+    )
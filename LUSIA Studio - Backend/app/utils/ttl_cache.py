@@ -0,0 +1,45 @@
+"""
+Small per-process TTL cache for rarely-changing reference data.
+
+Catalog lookups (subjects, curriculum trees) are read on hot paths but edited
+rarely, so a few minutes of staleness is acceptable. Entries expire after
+``ttl`` seconds; when full, the oldest insertion is evicted.
+"""
+
+from __future__ import annotations
+
+import time
+from typing import Any, Hashable
+
+
+class TTLCache:
+    """Dict-backed cache whose entries expire ``ttl`` seconds after insertion."""
+
+    __slots__ = ("maxsize", "ttl", "_entries")
+
+    def __init__(self, *, maxsize: int, ttl: float) -> None:
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self._entries: dict[Hashable, tuple[float, Any]] = {}
+
+    def get(self, key: Hashable, default: Any = None) -> Any:
+        entry = self._entries.get(key)
+        if entry is None:
+            return default
+        expires_at, value = entry
+        if expires_at < time.monotonic():
+            self._entries.pop(key, None)
+            return default
+        return value
+
+    def put(self, key: Hashable, value: Any) -> None:
+        if key not in self._entries and len(self._entries) >= self.maxsize:
+            # Drop the oldest insertion; dicts keep insertion order.
+            self._entries.pop(next(iter(self._entries)), None)
+        self._entries[key] = (time.monotonic() + self.ttl, value)
+
+    def pop(self, key: Hashable) -> None:
+        self._entries.pop(key, None)
+
+    def clear(self) -> None:
+        self._entries.clear()
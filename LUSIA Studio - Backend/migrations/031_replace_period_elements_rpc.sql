@@ -0,0 +1,40 @@
+-- Migration 031: Atomic element replacement for the grade calculator
+-- replace_elements used to DELETE the period's elements and INSERT the new
+-- set in two round-trips, leaving the period empty if the insert failed.
+-- This RPC does both in one transaction and returns the inserted rows.
+
+CREATE OR REPLACE FUNCTION replace_period_elements(
+  p_period_id uuid,
+  p_rows jsonb
+)
+RETURNS SETOF subject_evaluation_elements AS $$
+BEGIN
+  DELETE FROM subject_evaluation_elements
+  WHERE period_id = p_period_id;
+
+  RETURN QUERY
+  INSERT INTO subject_evaluation_elements (
+    period_id,
+    element_type,
+    label,
+    icon,
+    weight_percentage,
+    raw_grade
+  )
+  SELECT
+    p_period_id,
+    r.element_type,
+    r.label,
+    r.icon,
+    r.weight_percentage,
+    r.raw_grade
+  FROM jsonb_to_recordset(COALESCE(p_rows, '[]'::jsonb)) AS r(
+    element_type text,
+    label text,
+    icon text,
+    weight_percentage numeric,
+    raw_grade numeric
+  )
+  RETURNING *;
+END;
+$$ LANGUAGE plpgsql;
@@ -0,0 +1,50 @@
+-- Migration 032: Single-round-trip context for period grade recalculation
+-- recalculate_period_grade used to read the period, its enrollment, the
+-- year's grade settings, the flat elements and a domain-presence probe in
+-- five separate queries before doing the weighted sum in Python. This RPC
+-- returns all of that in one row, with the weighted sum
+-- SUM(raw_grade × weight_percentage / 100) aggregated in SQL. The stored
+-- pauta_grade is included so the annual-grade cascade can be skipped when
+-- the visible pauta grade does not change.
+
+CREATE OR REPLACE FUNCTION period_grade_context(p_period_id uuid)
+RETURNS TABLE(
+  enrollment_id uuid,
+  period_number smallint,
+  is_overridden boolean,
+  pauta_grade smallint,
+  education_level text,
+  grade_scale text,
+  has_domains boolean,
+  graded_count int,
+  raw_calculated numeric
+) AS $$
+BEGIN
+  RETURN QUERY
+  SELECT
+    p.enrollment_id,
+    p.period_number,
+    p.is_overridden,
+    p.pauta_grade,
+    s.education_level,
+    s.grade_scale,
+    EXISTS (
+      SELECT 1 FROM subject_evaluation_domains d
+      WHERE d.enrollment_id = p.enrollment_id
+    ),
+    agg.graded_count,
+    agg.raw_calculated
+  FROM student_subject_periods p
+  LEFT JOIN student_subject_enrollments e ON e.id = p.enrollment_id
+  LEFT JOIN student_grade_settings s ON s.id = e.settings_id
+  CROSS JOIN LATERAL (
+    SELECT
+      count(*)::int AS graded_count,
+      sum(el.raw_grade * COALESCE(el.weight_percentage, 0) / 100) AS raw_calculated
+    FROM subject_evaluation_elements el
+    WHERE el.period_id = p.id
+      AND el.raw_grade IS NOT NULL
+  ) agg
+  WHERE p.id = p_period_id;
+END;
+$$ LANGUAGE plpgsql STABLE;
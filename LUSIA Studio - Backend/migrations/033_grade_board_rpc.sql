@@ -0,0 +1,103 @@
+-- Migration 033: Single-round-trip grade board payload
+-- get_board_data used to read settings, enrollments (with subjects),
+-- periods, element presence, annual grades and domains in six sequential
+-- queries. This RPC returns the same raw rows as one JSON document:
+--   { settings, enrollments, periods, annual_grades, domains }
+-- Hydration and the annual-grade backfill stay in the Python service.
+-- Locked years return no periods/domains, matching the service behaviour.
+
+CREATE OR REPLACE FUNCTION get_grade_board(
+  p_student_id uuid,
+  p_academic_year text
+)
+RETURNS jsonb AS $$
+DECLARE
+  v_settings student_grade_settings;
+  v_enrollment_ids uuid[];
+BEGIN
+  SELECT * INTO v_settings
+  FROM student_grade_settings
+  WHERE student_id = p_student_id
+    AND academic_year = p_academic_year
+  LIMIT 1;
+
+  IF NOT FOUND THEN
+    RETURN jsonb_build_object('settings', NULL);
+  END IF;
+
+  SELECT COALESCE(array_agg(e.id), '{}') INTO v_enrollment_ids
+  FROM student_subject_enrollments e
+  WHERE e.student_id = p_student_id
+    AND e.academic_year = p_academic_year;
+
+  RETURN jsonb_build_object(
+    'settings', to_jsonb(v_settings),
+    'enrollments', COALESCE((
+      SELECT jsonb_agg(
+        to_jsonb(e) || jsonb_build_object(
+          'subjects', CASE WHEN s.id IS NULL THEN NULL ELSE jsonb_build_object(
+            'name', s.name,
+            'slug', s.slug,
+            'color', s.color,
+            'icon', s.icon,
+            'affects_cfs', s.affects_cfs,
+            'has_national_exam', s.has_national_exam
+          ) END
+        )
+        ORDER BY e.created_at
+      )
+      FROM student_subject_enrollments e
+      LEFT JOIN subjects s ON s.id = e.subject_id
+      WHERE e.id = ANY(v_enrollment_ids)
+    ), '[]'::jsonb),
+    'periods', CASE WHEN v_settings.is_locked THEN '[]'::jsonb ELSE COALESCE((
+      SELECT jsonb_agg(
+        jsonb_build_object(
+          'id', p.id,
+          'enrollment_id', p.enrollment_id,
+          'period_number', p.period_number,
+          'raw_calculated', p.raw_calculated,
+          'calculated_grade', p.calculated_grade,
+          'pauta_grade', p.pauta_grade,
+          'is_overridden', p.is_overridden,
+          'override_reason', p.override_reason,
+          'qualitative_grade', p.qualitative_grade,
+          'is_locked', p.is_locked,
+          'own_raw', p.own_raw,
+          'own_grade', p.own_grade,
+          'cumulative_raw', p.cumulative_raw,
+          'cumulative_grade', p.cumulative_grade,
+          'has_elements', EXISTS (
+            SELECT 1 FROM subject_evaluation_elements el
+            WHERE el.period_id = p.id
+          )
+        )
+        ORDER BY p.period_number
+      )
+      FROM student_subject_periods p
+      WHERE p.enrollment_id = ANY(v_enrollment_ids)
+    ), '[]'::jsonb) END,
+    'annual_grades', COALESCE((
+      SELECT jsonb_agg(to_jsonb(a))
+      FROM student_annual_subject_grades a
+      WHERE a.enrollment_id = ANY(v_enrollment_ids)
+    ), '[]'::jsonb),
+    'domains', CASE WHEN v_settings.is_locked THEN '[]'::jsonb ELSE COALESCE((
+      SELECT jsonb_agg(
+        jsonb_build_object(
+          'id', d.id,
+          'enrollment_id', d.enrollment_id,
+          'domain_type', d.domain_type,
+          'label', d.label,
+          'icon', d.icon,
+          'period_weights', d.period_weights,
+          'sort_order', d.sort_order
+        )
+        ORDER BY d.sort_order
+      )
+      FROM subject_evaluation_domains d
+      WHERE d.enrollment_id = ANY(v_enrollment_ids)
+    ), '[]'::jsonb) END
+  );
+END;
+$$ LANGUAGE plpgsql STABLE;
@@ -0,0 +1,62 @@
+-- Migration 034: Single-round-trip inputs for annual grade recalculation
+-- _try_recalculate_annual used to read the enrollment's cumulative weights
+-- and then pull every period row into Python, often just to find out that
+-- none of them carried a grade yet, before deleting the stale annual row in
+-- a third statement. An annual grade can only be derived when at least one
+-- period has a pauta or cumulative grade, so that check is aggregated here,
+-- the delete runs in the same call, and the ordered period grades come back
+-- as one jsonb array.
+
+CREATE OR REPLACE FUNCTION annual_grade_inputs(p_enrollment_id uuid)
+RETURNS TABLE(
+  cumulative_weights jsonb,
+  any_graded boolean,
+  periods jsonb
+) AS $$
+DECLARE
+  v_weights jsonb;
+  v_any_graded boolean;
+  v_periods jsonb;
+BEGIN
+  SELECT e.cumulative_weights
+    INTO v_weights
+    FROM student_subject_enrollments e
+   WHERE e.id = p_enrollment_id;
+
+  IF NOT FOUND THEN
+    RETURN;
+  END IF;
+
+  SELECT
+    COALESCE(
+      bool_or(p.pauta_grade IS NOT NULL OR p.cumulative_grade IS NOT NULL),
+      false
+    ),
+    COALESCE(
+      jsonb_agg(
+        jsonb_build_object(
+          'period_number', p.period_number,
+          'pauta_grade', p.pauta_grade,
+          'cumulative_grade', p.cumulative_grade,
+          'cumulative_raw', p.cumulative_raw
+        )
+        ORDER BY p.period_number
+      ),
+      '[]'::jsonb
+    )
+    INTO v_any_graded, v_periods
+    FROM student_subject_periods p
+   WHERE p.enrollment_id = p_enrollment_id;
+
+  IF NOT v_any_graded THEN
+    DELETE FROM student_annual_subject_grades a
+     WHERE a.enrollment_id = p_enrollment_id;
+    v_periods := '[]'::jsonb;
+  END IF;
+
+  cumulative_weights := v_weights;
+  any_graded := v_any_graded;
+  periods := v_periods;
+  RETURN NEXT;
+END;
+$$ LANGUAGE plpgsql VOLATILE;
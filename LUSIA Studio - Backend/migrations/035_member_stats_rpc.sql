@@ -0,0 +1,68 @@
+-- Migration 035: Single-round-trip student stats for the members detail page
+-- get_member_stats used to fetch every session and student assignment row
+-- (plus up to two assignment lookups for the teacher filter and titles) and
+-- aggregate them in Python. This RPC does the counting, weekly bucketing,
+-- teacher filtering and grade averaging server-side and returns one JSON
+-- document:
+--   { total_sessions, sessions_this_month, weekly_counts,
+--     total_assignments, completed_assignments, average_grade, grade_list }
+-- Week labels and rounding stay in the Python service.
+
+CREATE OR REPLACE FUNCTION member_stats(
+  p_org_id uuid,
+  p_member_id uuid,
+  p_teacher_id uuid,
+  p_is_admin boolean,
+  p_month_start timestamptz,
+  p_since timestamptz,
+  p_weeks int DEFAULT 12
+)
+RETURNS jsonb AS $$
+  WITH sessions AS (
+    SELECT cs.starts_at
+    FROM calendar_sessions cs
+    WHERE cs.organization_id = p_org_id
+      AND cs.student_ids @> ARRAY[p_member_id]
+  ),
+  weeks AS (
+    SELECT
+      floor(extract(epoch FROM (s.starts_at - p_since)) / 604800)::int AS idx,
+      count(*) AS cnt
+    FROM sessions s
+    WHERE s.starts_at >= p_since
+      AND s.starts_at < p_since + make_interval(weeks => p_weeks)
+    GROUP BY 1
+  ),
+  visible AS (
+    SELECT sa.status, sa.grade, a.title
+    FROM student_assignments sa
+    LEFT JOIN assignments a ON a.id = sa.assignment_id
+    WHERE sa.organization_id = p_org_id
+      AND sa.student_id = p_member_id
+      AND (p_is_admin OR a.teacher_id = p_teacher_id)
+  )
+  SELECT jsonb_build_object(
+    'total_sessions', (SELECT count(*) FROM sessions),
+    'sessions_this_month', (
+      SELECT count(*) FROM sessions WHERE starts_at >= p_month_start
+    ),
+    'weekly_counts', (
+      SELECT jsonb_agg(COALESCE(w.cnt, 0) ORDER BY g.idx)
+      FROM generate_series(0, p_weeks - 1) AS g(idx)
+      LEFT JOIN weeks w ON w.idx = g.idx
+    ),
+    'total_assignments', (SELECT count(*) FROM visible),
+    'completed_assignments', (
+      SELECT count(*) FROM visible WHERE status IN ('submitted', 'graded')
+    ),
+    'average_grade', (SELECT avg(grade) FROM visible),
+    'grade_list', COALESCE((
+      SELECT jsonb_agg(jsonb_build_object(
+        'title', COALESCE(NULLIF(title, ''), 'Sem título'),
+        'grade', grade
+      ))
+      FROM visible
+      WHERE grade IS NOT NULL
+    ), '[]'::jsonb)
+  );
+$$ LANGUAGE sql STABLE;
@@ -0,0 +1,36 @@
+-- Migration 036: Store accent-free, case-folded subject names and slugs
+-- The materials catalog matches a teacher's free-text `subjects_taught`
+-- against every subject's name/slug after stripping accents, which the
+-- service used to recompute for every row on every request.
+--
+-- The values are written by the API (subject_service.normalize_subject_text)
+-- rather than generated here: lower()/unaccent()/btrim() do not produce the
+-- same string as Python's casefold()/NFD/strip(), and the match compares the
+-- stored value against a reference normalized in Python. Rows without a
+-- stored value (e.g. seeded global subjects) are normalized in Python.
+
+ALTER TABLE public.subjects
+  ADD COLUMN IF NOT EXISTS norm_name text,
+  ADD COLUMN IF NOT EXISTS norm_slug text;
+
+-- A name/slug edited outside the API would leave a stale normalized value;
+-- clear it so readers fall back to normalizing the new text themselves.
+CREATE OR REPLACE FUNCTION public.subjects_clear_stale_norm()
+RETURNS trigger AS $$
+BEGIN
+  IF NEW.name IS DISTINCT FROM OLD.name
+     AND NEW.norm_name IS NOT DISTINCT FROM OLD.norm_name THEN
+    NEW.norm_name := NULL;
+  END IF;
+  IF NEW.slug IS DISTINCT FROM OLD.slug
+     AND NEW.norm_slug IS NOT DISTINCT FROM OLD.norm_slug THEN
+    NEW.norm_slug := NULL;
+  END IF;
+  RETURN NEW;
+END;
+$$ LANGUAGE plpgsql;
+
+DROP TRIGGER IF EXISTS trg_subjects_clear_stale_norm ON public.subjects;
+CREATE TRIGGER trg_subjects_clear_stale_norm
+  BEFORE UPDATE OF name, slug ON public.subjects
+  FOR EACH ROW EXECUTE FUNCTION public.subjects_clear_stale_norm();
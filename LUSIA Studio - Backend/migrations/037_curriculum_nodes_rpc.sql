@@ -0,0 +1,50 @@
+-- Migration 037: Single-round-trip curriculum browse payload
+-- list_curriculum_nodes used to query the curriculum table twice per call:
+-- once for the nodes at the requested level and once more, over the whole
+-- subject/year, only to ship every row's subject_component to Python to be
+-- deduplicated. curriculum_nodes_and_components returns both as one JSON
+-- document:
+--   { nodes, available_components }
+-- The distinct components come from curriculum_components, which returns
+-- them sorted as one array; the covering index lets Postgres answer it with
+-- an index-only scan.
+
+CREATE INDEX IF NOT EXISTS idx_curriculum_subject_year_component
+  ON public.curriculum(subject_id, year_level, subject_component);
+
+CREATE OR REPLACE FUNCTION curriculum_components(
+  p_subject_id uuid,
+  p_year_level text
+)
+RETURNS text[] AS $$
+  SELECT COALESCE(
+    array_agg(DISTINCT c.subject_component ORDER BY c.subject_component),
+    '{}'
+  )
+  FROM curriculum c
+  WHERE c.subject_id = p_subject_id
+    AND c.year_level = p_year_level
+    AND c.subject_component IS NOT NULL
+    AND c.subject_component <> '';
+$$ LANGUAGE sql STABLE;
+
+CREATE OR REPLACE FUNCTION curriculum_nodes_and_components(
+  p_subject_id uuid,
+  p_year_level text,
+  p_parent_id uuid DEFAULT NULL,
+  p_subject_component text DEFAULT NULL
+)
+RETURNS jsonb AS $$
+  SELECT jsonb_build_object(
+    'nodes', COALESCE((
+      SELECT jsonb_agg(to_jsonb(c) ORDER BY c.sequence_order, c.code)
+      FROM curriculum c
+      WHERE c.subject_id = p_subject_id
+        AND c.year_level = p_year_level
+        AND (p_subject_component IS NULL OR c.subject_component = p_subject_component)
+        AND c.parent_id IS NOT DISTINCT FROM p_parent_id
+    ), '[]'::jsonb),
+    'available_components',
+      to_jsonb(curriculum_components(p_subject_id, p_year_level))
+  );
+$$ LANGUAGE sql STABLE;
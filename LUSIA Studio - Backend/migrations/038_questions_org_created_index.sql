@@ -0,0 +1,8 @@
+-- Migration 038: Index the question bank listing order
+-- list_quiz_questions filters questions by organization_id and returns them
+-- newest first. With only the single-column organization index Postgres has
+-- to sort every matching row; this composite index serves the filter and the
+-- ORDER BY created_at DESC (id DESC as the tiebreaker) directly.
+
+CREATE INDEX IF NOT EXISTS idx_questions_org_created
+  ON public.questions(organization_id, created_at DESC, id DESC);
@@ -0,0 +1,7 @@
+-- Migration 039: Index subjects.grade_levels for grade filtering
+-- The subject listings now filter by grade in the query
+-- (grade_levels @> ARRAY[grade]) instead of in Python. A GIN index lets
+-- Postgres answer the array containment without scanning every subject.
+
+CREATE INDEX IF NOT EXISTS idx_subjects_grade_levels
+  ON public.subjects USING GIN (grade_levels);
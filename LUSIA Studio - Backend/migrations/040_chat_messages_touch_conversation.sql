@@ -0,0 +1,22 @@
+-- Migration 040: Touch chat_conversations.updated_at from chat_messages writes
+-- ChatService.save_message and update_message used to follow every message
+-- write with a separate UPDATE of the parent conversation's updated_at (two
+-- round-trips per message, several per chat turn). This trigger bumps it in
+-- the same statement as the message insert/update.
+
+CREATE OR REPLACE FUNCTION touch_chat_conversation()
+RETURNS trigger AS $$
+BEGIN
+  UPDATE chat_conversations
+  SET updated_at = now()
+  WHERE id = NEW.conversation_id;
+  RETURN NEW;
+END;
+$$ LANGUAGE plpgsql;
+
+DROP TRIGGER IF EXISTS trg_touch_conversation ON chat_messages;
+
+CREATE TRIGGER trg_touch_conversation
+  AFTER INSERT OR UPDATE ON chat_messages
+  FOR EACH ROW
+  EXECUTE FUNCTION touch_chat_conversation();
@@ -0,0 +1,77 @@
+-- Migration 041: Single-round-trip curriculum subtree payload
+-- The chat tool get_curriculum_content used to issue up to five sequential
+-- queries per call: the target node, its subject's color/icon, the leaves
+-- under it (code prefix), their base_content rows and the intermediate
+-- branch nodes used for headers. This RPC returns all of them as one JSON
+-- document:
+--   { target, subject, leaves, branches, content }
+-- target is null when the node does not exist.
+
+CREATE OR REPLACE FUNCTION curriculum_subtree(p_node_id uuid)
+RETURNS jsonb AS $$
+  WITH t AS (
+    SELECT id, code, title, level, has_children, subject_id, year_level,
+           subject_component, parent_id
+    FROM curriculum
+    WHERE id = p_node_id
+  ),
+  descendants AS (
+    SELECT c.id, c.code, c.title, c.level, c.parent_id, c.has_children,
+           c.sequence_order
+    FROM curriculum c, t
+    WHERE COALESCE(t.has_children, false)
+      AND c.code LIKE t.code || '%'
+      AND c.subject_id = t.subject_id
+      AND c.year_level = t.year_level
+      AND (COALESCE(t.subject_component, '') = ''
+           OR c.subject_component = t.subject_component)
+  ),
+  leaves AS (
+    SELECT * FROM descendants WHERE NOT has_children
+  ),
+  content_ids AS (
+    SELECT id FROM leaves
+    UNION ALL
+    SELECT id FROM t WHERE NOT COALESCE(t.has_children, false)
+  )
+  SELECT jsonb_build_object(
+    'target', (SELECT to_jsonb(t) FROM t),
+    'subject', (
+      SELECT jsonb_build_object('color', s.color, 'icon', s.icon)
+      FROM subjects s, t
+      WHERE s.id = t.subject_id
+    ),
+    'leaves', COALESCE((
+      SELECT jsonb_agg(
+        jsonb_build_object(
+          'id', l.id, 'code', l.code, 'title', l.title, 'level', l.level,
+          'parent_id', l.parent_id, 'has_children', l.has_children
+        )
+        ORDER BY l.sequence_order, l.code
+      )
+      FROM leaves l
+    ), '[]'::jsonb),
+    'branches', COALESCE((
+      SELECT jsonb_agg(
+        jsonb_build_object(
+          'id', d.id, 'code', d.code, 'title', d.title, 'level', d.level,
+          'parent_id', d.parent_id
+        )
+        ORDER BY d.sequence_order, d.code
+      )
+      FROM descendants d, t
+      WHERE d.has_children AND t.level < 3
+    ), '[]'::jsonb),
+    'content', COALESCE((
+      SELECT jsonb_agg(
+        jsonb_build_object(
+          'curriculum_id', b.curriculum_id,
+          'content_json', b.content_json,
+          'word_count', b.word_count
+        )
+      )
+      FROM base_content b
+      WHERE b.curriculum_id IN (SELECT id FROM content_ids)
+    ), '[]'::jsonb)
+  );
+$$ LANGUAGE sql STABLE;
@@ -0,0 +1,136 @@
+import os
+import unittest
+
+os.environ.setdefault("SUPABASE_URL_B2B", "https://example.supabase.co")
+os.environ.setdefault("SUPABASE_SERVICE_KEY_B2B", "test-service-key")
+os.environ.setdefault("APP_AUTH_SECRET", "test-app-auth-secret")
+
+from langchain_core.messages import AIMessage, HumanMessage, ToolMessage
+
+from app.chat import streaming
+from app.chat.streaming import _load_history_messages, _update_history_message, _window_history
+
+
+def _tool_heavy_turn(question: str, tool_calls: int) -> list:
+    messages = [HumanMessage(content=question)]
+    for i in range(tool_calls):
+        call_id = f"{question}-call-{i}"
+        messages.append(
+            AIMessage(
+                content="",
+                tool_calls=[{"id": call_id, "name": "get_curriculum_content", "args": {}}],
+            )
+        )
+        messages.append(ToolMessage(content="...", tool_call_id=call_id))
+    messages.append(AIMessage(content=f"answer to {question}"))
+    return messages
+
+
+class WindowHistoryTests(unittest.TestCase):
+    def test_short_history_is_unchanged(self):
+        messages = [HumanMessage(content="oi"), AIMessage(content="ola")]
+
+        self.assertIs(_window_history(messages, 20), messages)
+
+    def test_cut_moves_back_to_start_of_turn(self):
+        older = [HumanMessage(content="q0"), AIMessage(content="a0")] * 5
+        previous = _tool_heavy_turn("q1", tool_calls=10)  # 22 messages
+        current = [HumanMessage(content="q2")]
+        messages = older + previous + current
+
+        window = _window_history(messages, 20)
+
+        # The tool-heavy previous turn overflows the window but is kept whole
+        self.assertEqual(window, previous + current)
+
+    def test_cut_on_a_user_message_keeps_exact_window(self):
+        messages = [HumanMessage(content="q0"), AIMessage(content="a0")] * 10
+        messages.append(HumanMessage(content="q10"))
+
+        window = _window_history(messages, 5)
+
+        self.assertEqual(len(window), 5)
+        self.assertIsInstance(window[0], HumanMessage)
+
+    def test_tool_calls_are_never_separated_from_results(self):
+        messages = _tool_heavy_turn("q1", tool_calls=3) + [HumanMessage(content="q2")]
+
+        for max_messages in range(1, len(messages)):
+            with self.subTest(max_messages=max_messages):
+                window = _window_history(messages, max_messages)
+                self.assertIsInstance(window[0], HumanMessage)
+                self.assertIsInstance(window[-1], HumanMessage)
+
+
+class FakeChatService:
+    def __init__(self, rows):
+        self.rows = rows
+
+    def list_transcript_messages(self, conversation_id, user_id):
+        return sorted(self.rows, key=lambda row: row["sequence"])
+
+    def list_messages_from(self, conversation_id, from_sequence):
+        rows = self.list_transcript_messages(conversation_id, None)
+        return [row for row in rows if row["sequence"] >= from_sequence]
+
+    def update_message(self, message_id, conversation_id, **updates):
+        row = next(row for row in self.rows if row["id"] == message_id)
+        row.update(updates)
+        return row
+
+
+def _row(row_id: str, sequence: int, role: str = "user") -> dict:
+    return {"id": row_id, "sequence": sequence, "role": role, "content": row_id}
+
+
+class LoadHistoryMessagesTests(unittest.TestCase):
+    def setUp(self):
+        streaming._history_cache.clear()
+
+    def tearDown(self):
+        streaming._history_cache.clear()
+
+    def test_overlapping_run_with_duplicate_sequence_is_not_skipped(self):
+        svc = FakeChatService([_row("m1", 1), _row("m2", 2, role="assistant")])
+        first = _load_history_messages(svc, "conv-1", "user-1")
+        self.assertEqual([m.content for m in first], ["m1", "m2"])
+
+        # A concurrent run allocated the same max+1 sequence as the cached max
+        svc.rows.append(_row("m2-other-tab", 2))
+        svc.rows.append(_row("m3", 3))
+
+        second = _load_history_messages(svc, "conv-1", "user-1")
+
+        self.assertEqual([m.content for m in second], ["m1", "m2", "m2-other-tab", "m3"])
+        # Nothing new: the cached prefix is returned unchanged
+        self.assertEqual(
+            [m.content for m in _load_history_messages(svc, "conv-1", "user-1")],
+            ["m1", "m2", "m2-other-tab", "m3"],
+        )
+
+    def test_tool_calls_filled_in_after_caching_are_reloaded(self):
+        call_row = {
+            **_row("call", 2, role="assistant"),
+            "content": "",
+            "tool_calls": [],
+            "metadata": {"message_kind": "assistant_tool_call"},
+        }
+        svc = FakeChatService([_row("m1", 1), call_row])
+        # An overlapping run caches the tool-call row before it is filled in
+        first = _load_history_messages(svc, "conv-1", "user-1")
+        self.assertEqual(first[-1].tool_calls, [])
+
+        tool_call = {"id": "run-1:tool:1", "name": "get_curriculum_content", "args": {}}
+        _update_history_message(svc, "call", "conv-1", tool_calls=[tool_call])
+        svc.rows.append(
+            {**_row("result", 3, role="tool"), "tool_call_id": "run-1:tool:1"}
+        )
+
+        history = _load_history_messages(svc, "conv-1", "user-1")
+
+        self.assertEqual([call["id"] for call in history[1].tool_calls], ["run-1:tool:1"])
+        self.assertIsInstance(history[2], ToolMessage)
+
+
+if __name__ == "__main__":
+    unittest.main()
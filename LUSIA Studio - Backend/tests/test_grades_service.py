@@ -1,5 +1,8 @@
+import math
 import os
+import random
 import unittest
+from decimal import ROUND_HALF_UP, Decimal
 from unittest.mock import patch
 
 os.environ.setdefault("SUPABASE_URL_B2B", "https://example.supabase.co")
@@ -52,6 +55,12 @@ class FakeQuery:
         self.payload = payload
         return self
 
+    def upsert(self, payload, on_conflict: str = ""):
+        self.operation = "upsert"
+        self.payload = payload
+        self.on_conflict = on_conflict
+        return self
+
     def delete(self):
         self.operation = "delete"
         return self
@@ -84,6 +93,16 @@ class FakeQuery:
         return self.db.run(self)
 
 
+class FakeRPC:
+    def __init__(self, db, function_name: str, params: dict):
+        self.db = db
+        self.function_name = function_name
+        self.params = params
+
+    def execute(self):
+        return self.db.run_rpc(self)
+
+
 class FakeDB:
     def __init__(self, tables: dict[str, list[dict]]):
         self.tables = {name: [dict(row) for row in rows] for name, rows in tables.items()}
@@ -93,11 +112,22 @@ class FakeDB:
         self.tables.setdefault(table_name, [])
         return FakeQuery(self, table_name)
 
+    def rpc(self, function_name: str, params: dict) -> FakeRPC:
+        return FakeRPC(self, function_name, params)
+
+    def run_rpc(self, call: FakeRPC) -> FakeResponse:
+        handler = getattr(self, f"_rpc_{call.function_name}", None)
+        if handler is None:
+            raise RuntimeError(f"function {call.function_name} does not exist")
+        return FakeResponse(handler(**call.params))
+
     def run(self, query: FakeQuery) -> FakeResponse:
         if query.operation == "insert":
             return FakeResponse(self._insert(query.table_name, query.payload))
         if query.operation == "update":
             return FakeResponse(self._update(query))
+        if query.operation == "upsert":
+            return FakeResponse(self._upsert(query))
         if query.operation == "delete":
             return FakeResponse(self._delete(query))
         return FakeResponse(self._select(query))
@@ -125,6 +155,9 @@ class FakeDB:
             rows.sort(key=lambda row: (row.get(key) is None, row.get(key)), reverse=desc)
         if query.limit_value is not None:
             rows = rows[: query.limit_value]
+        if "*" not in query.select_clause and "(" not in query.select_clause:
+            columns = [column.strip() for column in query.select_clause.split(",")]
+            return [{column: row.get(column) for column in columns} for row in rows]
         return [self._hydrate_row(query.table_name, row, query.select_clause) for row in rows]
 
     def _insert(self, table_name: str, payload) -> list[dict]:
@@ -149,6 +182,27 @@ class FakeDB:
             updated.append(dict(row))
         return updated
 
+    def _upsert(self, query: FakeQuery) -> list[dict]:
+        conflict_keys = [key.strip() for key in query.on_conflict.split(",") if key.strip()]
+        items = query.payload if isinstance(query.payload, list) else [query.payload]
+        upserted = []
+        for item in items:
+            existing = next(
+                (
+                    row
+                    for row in self.tables[query.table_name]
+                    if conflict_keys and all(row.get(key) == item.get(key) for key in conflict_keys)
+                ),
+                None,
+            )
+            if existing is None:
+                upserted.extend(self._insert(query.table_name, item))
+                continue
+            existing.update(dict(item))
+            existing["updated_at"] = self._counter
+            upserted.append(dict(existing))
+        return upserted
+
     def _delete(self, query: FakeQuery) -> list[dict]:
         kept = []
         deleted = []
@@ -160,6 +214,175 @@ class FakeDB:
         self.tables[query.table_name] = kept
         return deleted
 
+    # ── RPCs: same JSON shapes as the SQL functions in migrations/ ──
+
+    def _rpc_replace_period_elements(self, p_period_id: str, p_rows: list[dict]) -> list[dict]:
+        self.tables["subject_evaluation_elements"] = [
+            row
+            for row in self.tables.get("subject_evaluation_elements", [])
+            if row.get("period_id") != p_period_id
+        ]
+        columns = ("element_type", "label", "icon", "weight_percentage", "raw_grade")
+        return self._insert(
+            "subject_evaluation_elements",
+            [
+                {"period_id": p_period_id, **{column: row.get(column) for column in columns}}
+                for row in p_rows or []
+            ],
+        )
+
+    def _rpc_period_grade_context(self, p_period_id: str) -> list[dict]:
+        period = self._find("student_subject_periods", p_period_id)
+        if period is None:
+            return []
+        enrollment = self._find("student_subject_enrollments", period.get("enrollment_id")) or {}
+        settings = self._find("student_grade_settings", enrollment.get("settings_id")) or {}
+        graded = [
+            row
+            for row in self.tables.get("subject_evaluation_elements", [])
+            if row.get("period_id") == p_period_id and row.get("raw_grade") is not None
+        ]
+        raw_calculated = sum(
+            Decimal(str(row["raw_grade"])) * Decimal(str(row.get("weight_percentage") or 0)) / 100
+            for row in graded
+        )
+        return [
+            {
+                "enrollment_id": period.get("enrollment_id"),
+                "period_number": period.get("period_number"),
+                "is_overridden": period.get("is_overridden"),
+                "pauta_grade": period.get("pauta_grade"),
+                "education_level": settings.get("education_level"),
+                "grade_scale": settings.get("grade_scale"),
+                "has_domains": any(
+                    row.get("enrollment_id") == period.get("enrollment_id")
+                    for row in self.tables.get("subject_evaluation_domains", [])
+                ),
+                "graded_count": len(graded),
+                # numeric comes back as a JSON number
+                "raw_calculated": float(raw_calculated) if graded else None,
+            }
+        ]
+
+    def _rpc_annual_grade_inputs(self, p_enrollment_id: str) -> list[dict]:
+        enrollment = self._find("student_subject_enrollments", p_enrollment_id)
+        if enrollment is None:
+            return []
+        periods = self._sorted(
+            [
+                row
+                for row in self.tables.get("student_subject_periods", [])
+                if row.get("enrollment_id") == p_enrollment_id
+            ],
+            "period_number",
+        )
+        any_graded = any(
+            row.get("pauta_grade") is not None or row.get("cumulative_grade") is not None
+            for row in periods
+        )
+        if not any_graded:
+            self.tables["student_annual_subject_grades"] = [
+                row
+                for row in self.tables.get("student_annual_subject_grades", [])
+                if row.get("enrollment_id") != p_enrollment_id
+            ]
+            periods = []
+        columns = ("period_number", "pauta_grade", "cumulative_grade", "cumulative_raw")
+        return [
+            {
+                "cumulative_weights": enrollment.get("cumulative_weights"),
+                "any_graded": any_graded,
+                "periods": [{column: row.get(column) for column in columns} for row in periods],
+            }
+        ]
+
+    def _rpc_get_grade_board(self, p_student_id: str, p_academic_year: str) -> dict:
+        settings = next(
+            (
+                row
+                for row in self.tables.get("student_grade_settings", [])
+                if row.get("student_id") == p_student_id
+                and row.get("academic_year") == p_academic_year
+            ),
+            None,
+        )
+        if settings is None:
+            return {"settings": None}
+
+        enrollments = self._sorted(
+            [
+                row
+                for row in self.tables.get("student_subject_enrollments", [])
+                if row.get("student_id") == p_student_id
+                and row.get("academic_year") == p_academic_year
+            ],
+            "created_at",
+        )
+        enrollment_ids = {row["id"] for row in enrollments}
+        is_locked = bool(settings.get("is_locked"))
+
+        periods = []
+        domains = []
+        if not is_locked:
+            period_ids_with_elements = {
+                row.get("period_id") for row in self.tables.get("subject_evaluation_elements", [])
+            }
+            period_columns = grades_service.PERIOD_BOARD_SELECT.split(",")
+            periods = [
+                {
+                    **{column: row.get(column) for column in period_columns},
+                    "has_elements": row["id"] in period_ids_with_elements,
+                }
+                for row in self._sorted(
+                    [
+                        row
+                        for row in self.tables.get("student_subject_periods", [])
+                        if row.get("enrollment_id") in enrollment_ids
+                    ],
+                    "period_number",
+                )
+            ]
+            domain_columns = (
+                "id", "enrollment_id", "domain_type", "label", "icon", "period_weights", "sort_order",
+            )
+            domains = [
+                {column: row.get(column) for column in domain_columns}
+                for row in self._sorted(
+                    [
+                        row
+                        for row in self.tables.get("subject_evaluation_domains", [])
+                        if row.get("enrollment_id") in enrollment_ids
+                    ],
+                    "sort_order",
+                )
+            ]
+
+        subject_columns = ("name", "slug", "color", "icon", "affects_cfs", "has_national_exam")
+        return {
+            "settings": dict(settings),
+            "enrollments": [
+                {
+                    **dict(row),
+                    "subjects": (
+                        {column: subject.get(column) for column in subject_columns}
+                        if (subject := self._find("subjects", row.get("subject_id")))
+                        else None
+                    ),
+                }
+                for row in enrollments
+            ],
+            "periods": periods,
+            "annual_grades": [
+                dict(row)
+                for row in self.tables.get("student_annual_subject_grades", [])
+                if row.get("enrollment_id") in enrollment_ids
+            ],
+            "domains": domains,
+        }
+
+    def _sorted(self, rows: list[dict], key: str) -> list[dict]:
+        return sorted(rows, key=lambda row: (row.get(key) is None, row.get(key)))
+
     def _hydrate_row(self, table_name: str, row: dict, select_clause: str) -> dict:
         hydrated = dict(row)
         if table_name == "student_subject_enrollments" and "subjects(" in select_clause:
@@ -475,6 +698,61 @@ class GradesServiceTests(unittest.TestCase):
         self.assertTrue(updated["period"]["is_overridden"])
         self.assertIsNone(updated["period"]["override_reason"])
 
+    def test_period_override_with_unchanged_pauta_skips_annual_cascade(self):
+        db = FakeDB(
+            {
+                "subjects": [{"id": "sub-mat", "name": "Matemática", "slug": "secundario_mat_a"}],
+                "student_grade_settings": [
+                    {
+                        "id": "settings-1",
+                        "student_id": "student-1",
+                        "academic_year": "2025-2026",
+                        "education_level": "secundario",
+                        "regime": "trimestral",
+                        "period_weights": ["33.33", "33.33", "33.34"],
+                        "is_locked": False,
+                    }
+                ],
+                "student_subject_enrollments": [
+                    {
+                        "id": "enrollment-1",
+                        "student_id": "student-1",
+                        "subject_id": "sub-mat",
+                        "academic_year": "2025-2026",
+                        "year_level": "10",
+                        "settings_id": "settings-1",
+                        "is_active": True,
+                        "is_exam_candidate": False,
+                    }
+                ],
+                "student_subject_periods": [
+                    {
+                        "id": "period-1",
+                        "enrollment_id": "enrollment-1",
+                        "period_number": 1,
+                        "pauta_grade": 14,
+                        "calculated_grade": 14,
+                        "is_overridden": False,
+                        "override_reason": None,
+                    }
+                ],
+                "subject_evaluation_elements": [],
+                "student_annual_subject_grades": [],
+            }
+        )
+
+        with patch.object(grades_service, "_try_recalculate_annual") as recalculate_annual:
+            updated = grades_service.override_period_grade(
+                db,
+                "student-1",
+                "period-1",
+                grades_service.PeriodGradeOverrideIn(pauta_grade=14, override_reason="confirmado"),
+            )
+
+        recalculate_annual.assert_not_called()
+        self.assertTrue(updated["period"]["is_overridden"])
+        self.assertEqual(updated["period"]["override_reason"], "confirmado")
+
     def test_portuguese_exam_candidate_is_forced_true(self):
         db = FakeDB(
             {
@@ -764,6 +1042,81 @@ class GradesServiceTests(unittest.TestCase):
         self.assertTrue(period["has_elements"])
         self.assertNotIn("elements", period)
 
+    def _board_db_with_missing_annual_grade(self, db_class=None) -> "FakeDB":
+        return (db_class or FakeDB)(
+            {
+                "subjects": [{"id": "sub-mat", "name": "Matemática", "slug": "secundario_mat_a"}],
+                "student_grade_settings": [
+                    {
+                        "id": "settings-1",
+                        "student_id": "student-1",
+                        "academic_year": "2025-2026",
+                        "education_level": "secundario",
+                        "regime": "trimestral",
+                        "period_weights": ["33.33", "33.33", "33.34"],
+                        "is_locked": False,
+                    }
+                ],
+                "student_subject_enrollments": [
+                    {
+                        "id": "enrollment-1",
+                        "student_id": "student-1",
+                        "subject_id": "sub-mat",
+                        "academic_year": "2025-2026",
+                        "year_level": "10",
+                        "settings_id": "settings-1",
+                        "is_active": True,
+                        "is_exam_candidate": False,
+                    }
+                ],
+                "student_subject_periods": [
+                    {
+                        "id": f"period-{number}",
+                        "enrollment_id": "enrollment-1",
+                        "period_number": number,
+                        "pauta_grade": 14,
+                        "is_overridden": False,
+                        "is_locked": False,
+                    }
+                    for number in (1, 2, 3)
+                ],
+                "student_annual_subject_grades": [],
+            }
+        )
+
+    def test_get_board_data_backfills_missing_annual_grade_with_upsert(self):
+        class RecordingDB(FakeDB):
+            def _upsert(self, query):
+                self.upsert_conflicts = getattr(self, "upsert_conflicts", [])
+                self.upsert_conflicts.append((query.table_name, query.on_conflict))
+                return super()._upsert(query)
+
+        db = self._board_db_with_missing_annual_grade(RecordingDB)
+
+        board = grades_service.get_board_data(db, "student-1", "2025-2026")
+
+        self.assertEqual(board["subjects"][0]["annual_grade"]["annual_grade"], 14)
+        self.assertEqual(len(db.tables["student_annual_subject_grades"]), 1)
+        # Concurrent board loads may race on the unique enrollment_id
+        self.assertEqual(
+            db.upsert_conflicts, [("student_annual_subject_grades", "enrollment_id")]
+        )
+
+    def test_get_board_data_survives_failed_annual_backfill(self):
+        class FailingUpsertDB(FakeDB):
+            def _upsert(self, query):
+                if query.table_name == "student_annual_subject_grades":
+                    raise RuntimeError("duplicate key value violates unique constraint")
+                return super()._upsert(query)
+
+        db = self._board_db_with_missing_annual_grade(FailingUpsertDB)
+
+        with self.assertLogs(grades_service.logger, level="WARNING"):
+            board = grades_service.get_board_data(db, "student-1", "2025-2026")
+
+        self.assertEqual(len(board["subjects"][0]["periods"]), 3)
+        self.assertIsNone(board["subjects"][0]["annual_grade"])
+
     def test_get_board_data_keeps_domain_subjects_without_embedding_domain_elements(self):
         db = FakeDB(
             {
@@ -1548,5 +1901,360 @@ class GradesServiceTests(unittest.TestCase):
         self.assertEqual(annual["raw_annual"], "15")
 
 
+# ── Reference Decimal formulas (pre fixed-point implementation) ──
+
+
+def _ref_round_half_up(value: Decimal) -> int:
+    return int(value.quantize(Decimal("1"), rounding=ROUND_HALF_UP))
+
+
+def _ref_cif(annual_grades):
+    total = sum(Decimal(str(g)) for g in annual_grades)
+    cif_raw = total / Decimal(str(len(annual_grades)))
+    return cif_raw, _ref_round_half_up(cif_raw)
+
+
+def _ref_cfd(cif_grade, exam_grade_raw, exam_weight):
+    ce = Decimal(str(exam_grade_raw)) / Decimal("10")
+    internal_weight = Decimal("100") - exam_weight
+    cfd_raw = (Decimal(str(cif_grade)) * internal_weight + ce * exam_weight) / Decimal("100")
+    return cfd_raw, _ref_round_half_up(cfd_raw)
+
+
+def _ref_basico_cfd(cif_grade, exam_level, exam_weight):
+    weight = Decimal(str(exam_weight))
+    cfd_raw = (
+        Decimal(str(cif_grade)) * (Decimal("100") - weight)
+        + Decimal(str(exam_level)) * weight
+    ) / Decimal("100")
+    return cfd_raw, _ref_round_half_up(cfd_raw)
+
+
+def _ref_cfs(cfds, cohort_year):
+    eligible = [c for c in cfds if c.get("affects_cfs", True) and c.get("cfd_grade") is not None]
+    if not eligible:
+        return None, None
+    if cohort_year is not None and cohort_year >= 2026:
+        numerator = sum(Decimal(str(c["cfd_grade"])) * Decimal(str(c["duration_years"])) for c in eligible)
+        denominator = sum(Decimal(str(c["duration_years"])) for c in eligible)
+        cfs_raw = numerator / denominator
+    else:
+        cfs_raw = sum(Decimal(str(c["cfd_grade"])) for c in eligible) / Decimal(str(len(eligible)))
+    cfs_value = float(Decimal(math.floor(cfs_raw * 10)) / 10)
+    return cfs_value, round(cfs_value * 10)
+
+
+class TableOnlyDB(FakeDB):
+    """A database without the grade RPCs, forcing the per-table fallbacks."""
+
+    def rpc(self, function_name: str, params: dict) -> FakeRPC:
+        raise RuntimeError(f"function {function_name} does not exist")
+
+
+def _parity_tables(*, is_locked: bool = False) -> dict[str, list[dict]]:
+    return {
+        "subjects": [
+            {"id": "sub-mat", "name": "Matemática", "slug": "secundario_mat_a", "affects_cfs": True},
+            {"id": "sub-port", "name": "Português", "slug": "secundario_port", "has_national_exam": True},
+        ],
+        "student_grade_settings": [
+            {
+                "id": "settings-1",
+                "student_id": "student-1",
+                "academic_year": "2025-2026",
+                "education_level": "secundario",
+                "grade_scale": "0-20",
+                "regime": "trimestral",
+                "period_weights": ["33.33", "33.33", "33.34"],
+                "is_locked": is_locked,
+            }
+        ],
+        "student_subject_enrollments": [
+            {
+                "id": "enrollment-mat",
+                "student_id": "student-1",
+                "subject_id": "sub-mat",
+                "academic_year": "2025-2026",
+                "year_level": "10",
+                "settings_id": "settings-1",
+                "is_active": True,
+                "is_exam_candidate": False,
+                "cumulative_weights": [["100"], ["50", "50"], ["33.33", "33.33", "33.34"]],
+                "created_at": 1,
+            },
+            {
+                "id": "enrollment-port",
+                "student_id": "student-1",
+                "subject_id": "sub-port",
+                "academic_year": "2025-2026",
+                "year_level": "12",
+                "settings_id": "settings-1",
+                "is_active": True,
+                "is_exam_candidate": False,
+                "created_at": 2,
+            },
+        ],
+        "student_subject_periods": [
+            {
+                "id": "mat-2",
+                "enrollment_id": "enrollment-mat",
+                "period_number": 2,
+                "pauta_grade": 14,
+                "cumulative_grade": 15,
+                "cumulative_raw": "14.5",
+                "is_overridden": False,
+                "is_locked": False,
+            },
+            {
+                "id": "mat-1",
+                "enrollment_id": "enrollment-mat",
+                "period_number": 1,
+                "raw_calculated": "15.2",
+                "calculated_grade": 15,
+                "pauta_grade": 15,
+                "is_overridden": False,
+                "is_locked": False,
+            },
+            {"id": "mat-3", "enrollment_id": "enrollment-mat", "period_number": 3},
+            {"id": "port-1", "enrollment_id": "enrollment-port", "period_number": 1},
+            {"id": "port-2", "enrollment_id": "enrollment-port", "period_number": 2},
+            {"id": "port-3", "enrollment_id": "enrollment-port", "period_number": 3},
+        ],
+        "subject_evaluation_elements": [
+            {
+                "id": "element-1",
+                "period_id": "mat-3",
+                "element_type": "teste",
+                "label": "Teste 1",
+                "weight_percentage": "60",
+                "raw_grade": "16.5",
+            },
+            {
+                "id": "element-2",
+                "period_id": "mat-3",
+                "element_type": "trabalho",
+                "label": "Trabalho",
+                "weight_percentage": "40",
+                "raw_grade": "13",
+            },
+            {
+                "id": "element-3",
+                "period_id": "mat-3",
+                "element_type": "teste",
+                "label": "Teste 2",
+                "weight_percentage": "0",
+                "raw_grade": None,
+            },
+        ],
+        "subject_evaluation_domains": [
+            {
+                "id": "domain-2",
+                "enrollment_id": "enrollment-port",
+                "domain_type": "oral",
+                "label": "Oralidade",
+                "period_weights": ["30", "30", "30"],
+                "sort_order": 1,
+            },
+            {
+                "id": "domain-1",
+                "enrollment_id": "enrollment-port",
+                "domain_type": "escrita",
+                "label": "Escrita",
+                "icon": "pen",
+                "period_weights": ["70", "70", "70"],
+                "sort_order": 0,
+            },
+        ],
+        "student_annual_subject_grades": [
+            {
+                "id": "annual-port",
+                "enrollment_id": "enrollment-port",
+                "raw_annual": "12",
+                "annual_grade": 12,
+                "is_locked": False,
+            }
+        ],
+    }
+
+
+class RpcFallbackParityTests(unittest.TestCase):
+    """The grade RPCs and their per-table fallbacks must agree."""
+
+    def setUp(self):
+        self.supabase_patch = patch.object(
+            grades_service,
+            "supabase_execute",
+            new=lambda query, entity=None: query.execute(),
+        )
+        self.supabase_patch.start()
+
+    def tearDown(self):
+        self.supabase_patch.stop()
+
+    def _run_both(self, action, tables: dict[str, list[dict]]):
+        rpc_db = FakeDB(tables)
+        table_db = TableOnlyDB(tables)
+
+        with self.assertNoLogs(grades_service.logger, level="ERROR"):
+            rpc_result = action(rpc_db)
+        with self.assertLogs(grades_service.logger, level="ERROR") as logs:
+            table_result = action(table_db)
+
+        self.assertTrue(all("falling back" in line for line in logs.output))
+        self.assertEqual(rpc_db.tables, table_db.tables)
+        return rpc_result, table_result
+
+    def test_grade_board_matches_table_queries(self):
+        for is_locked in (False, True):
+            with self.subTest(is_locked=is_locked):
+                rpc_board, table_board = self._run_both(
+                    lambda db: grades_service.get_board_data(db, "student-1", "2025-2026"),
+                    _parity_tables(is_locked=is_locked),
+                )
+
+                self.assertEqual(rpc_board, table_board)
+                self.assertEqual(len(rpc_board["subjects"]), 2)
+
+    def test_grade_board_without_settings_matches_table_queries(self):
+        rpc_board, table_board = self._run_both(
+            lambda db: grades_service.get_board_data(db, "student-1", "2030-2031"),
+            _parity_tables(),
+        )
+
+        self.assertEqual(rpc_board, table_board)
+        self.assertEqual(rpc_board, {"settings": None, "subjects": []})
+
+    def test_period_grade_context_matches_table_queries(self):
+        for period_id in ("mat-1", "mat-3", "port-1"):
+            with self.subTest(period_id=period_id):
+                rpc_context, table_context = self._run_both(
+                    lambda db: grades_service._fetch_period_grade_context(db, period_id),
+                    _parity_tables(),
+                )
+
+                self.assertEqual(
+                    grades_service._dec(rpc_context.pop("raw_calculated")),
+                    grades_service._dec(table_context.pop("raw_calculated")),
+                )
+                self.assertEqual(rpc_context, table_context)
+
+    def test_period_recalculation_matches_table_queries(self):
+        rpc_result, table_result = self._run_both(
+            lambda db: grades_service.recalculate_period_grade(db, "mat-3"),
+            _parity_tables(),
+        )
+
+        self.assertEqual(rpc_result, table_result)
+        self.assertEqual(rpc_result["pauta_grade"], 15)
+
+    def test_annual_recalculation_matches_table_queries(self):
+        for enrollment_id in ("enrollment-mat", "enrollment-port", "missing"):
+            with self.subTest(enrollment_id=enrollment_id):
+                rpc_annual, table_annual = self._run_both(
+                    lambda db: grades_service._try_recalculate_annual(db, enrollment_id),
+                    _parity_tables(),
+                )
+
+                self.assertEqual(rpc_annual, table_annual)
+
+    def test_element_replacement_matches_table_queries(self):
+        rows = [
+            {
+                "period_id": "mat-3",
+                "element_type": "teste",
+                "label": "Teste final",
+                "icon": None,
+                "weight_percentage": "100",
+                "raw_grade": "17",
+            }
+        ]
+        rpc_rows, table_rows = self._run_both(
+            lambda db: grades_service._replace_period_element_rows(db, "mat-3", rows),
+            _parity_tables(),
+        )
+
+        self.assertEqual(rpc_rows, table_rows)
+        self.assertEqual(len(rpc_rows), 1)
+
+
+EXAM_WEIGHTS = ["0", "25", "30", "33.33", "12.5", "50", "100", "33.333"]
+
+
+class GradeArithmeticParityTests(unittest.TestCase):
+    """The integer fixed-point grade formulas must match the Decimal ones."""
+
+    def test_cif_matches_decimal_formula_including_half_boundaries(self):
+        cases = [[14, 15], [9, 10], [10, 11, 11, 11], [19, 20], [0, 1], [12, 13, 13, 12]]
+        rng = random.Random(7)
+        cases += [[rng.randint(0, 20) for _ in range(rng.randint(1, 4))] for _ in range(500)]
+        for grades in cases:
+            with self.subTest(grades=grades):
+                raw, grade = grades_service._compute_cif(grades)
+                ref_raw, ref_grade = _ref_cif(grades)
+                self.assertEqual(raw, ref_raw)
+                self.assertEqual(grade, ref_grade)
+
+    def test_cfd_matches_decimal_formula_for_every_grade_and_weight(self):
+        for weight_text in EXAM_WEIGHTS:
+            weight = Decimal(weight_text)
+            for cif_grade in range(0, 21):
+                for exam_raw in range(0, 201):
+                    raw, grade = grades_service._compute_cfd(cif_grade, exam_raw, weight)
+                    ref_raw, ref_grade = _ref_cfd(cif_grade, exam_raw, weight)
+                    if raw != ref_raw or grade != ref_grade:
+                        self.fail(f"cif={cif_grade} exam={exam_raw} weight={weight_text}: "
+                                  f"{(raw, grade)} != {(ref_raw, ref_grade)}")
+
+    def test_cfd_rounds_half_up_at_the_boundary(self):
+        # 14 × 0.75 + 15.0 × 0.25 = 14.25 → 14; 14 × 0.75 + 16.0 × 0.25 = 14.5 → 15
+        self.assertEqual(grades_service._compute_cfd(14, 150, Decimal("25"))[1], 14)
+        self.assertEqual(grades_service._compute_cfd(14, 160, Decimal("25")), (Decimal("14.5"), 15))
+
+    def test_basico_cfd_matches_decimal_formula(self):
+        for weight_text in EXAM_WEIGHTS:
+            for cif_grade in ["1", "2", "3", "4", "5", "3.5"]:
+                for exam_level in range(1, 6):
+                    with self.subTest(cif=cif_grade, level=exam_level, weight=weight_text):
+                        raw, grade = grades_service._compute_basico_cfd(cif_grade, exam_level, weight_text)
+                        ref_raw, ref_grade = _ref_basico_cfd(cif_grade, exam_level, weight_text)
+                        self.assertEqual(raw, ref_raw)
+                        self.assertEqual(grade, ref_grade)
+
+    def test_cfs_matches_decimal_formula_simple_and_weighted(self):
+        rng = random.Random(11)
+        for _ in range(500):
+            cfds = [
+                {
+                    "cfd_grade": rng.choice([None, *range(10, 21)]),
+                    "duration_years": rng.choice([1, 2, 3]),
+                    "affects_cfs": rng.random() > 0.1,
+                }
+                for _ in range(rng.randint(0, 10))
+            ]
+            for cohort_year in (2025, 2026):
+                with self.subTest(cfds=cfds, cohort_year=cohort_year):
+                    self.assertEqual(
+                        grades_service._compute_cfs_value(cfds, cohort_year),
+                        _ref_cfs(cfds, cohort_year),
+                    )
+
+    def test_weighted_cfs_truncates_instead_of_rounding(self):
+        cfds = [
+            {"cfd_grade": 15, "duration_years": 3},
+            {"cfd_grade": 14, "duration_years": 2},
+            {"cfd_grade": 18, "duration_years": 1},
+        ]
+        # (45 + 28 + 18) / 6 = 15.1666… → 15.1
+        self.assertEqual(grades_service._compute_cfs_value(cfds, 2026), (15.1, 151))
+
+    def test_weighted_cfs_treats_missing_duration_as_annual(self):
+        cfds = [
+            {"cfd_grade": 16, "duration_years": None},
+            {"cfd_grade": 13, "duration_years": 2},
+        ]
+
+        self.assertEqual(grades_service._compute_cfs_value(cfds, 2026), (14.0, 140))
+
+
 if __name__ == "__main__":
     unittest.main()
@@ -5,7 +5,11 @@ os.environ.setdefault("SUPABASE_URL_B2B", "https://example.supabase.co")
 os.environ.setdefault("SUPABASE_SERVICE_KEY_B2B", "test-service-key")
 os.environ.setdefault("APP_AUTH_SECRET", "test-app-auth-secret")
 
+from unittest.mock import patch
+
+from app.api.http.services import subject_service
 from app.api.http.services.materials_service import build_subject_catalog
+from app.api.http.services.subject_service import get_subjects_for_org
 
 
 class MaterialsSubjectCatalogTests(unittest.TestCase):
@@ -134,5 +138,62 @@ class MaterialsSubjectCatalogTests(unittest.TestCase):
         self.assertEqual(result["more_subjects"]["by_education_level"], [])
 
 
+class FakeSubjectsQuery:
+    def __init__(self, rows, select):
+        self.rows = rows
+        self.select_clause = select
+
+    def __getattr__(self, name):
+        return lambda *args, **kwargs: self
+
+    def execute(self):
+        if "norm_name" in self.select_clause:
+            raise RuntimeError("column subjects.norm_name does not exist")
+        return type("Response", (), {"data": [dict(row) for row in self.rows]})()
+
+
+class FakeSubjectsDB:
+    def __init__(self, rows):
+        self.rows = rows
+        self.selects = []
+
+    def table(self, name):
+        return self
+
+    def select(self, clause):
+        self.selects.append(clause)
+        return FakeSubjectsQuery(self.rows, clause)
+
+
+class SubjectsForOrgTests(unittest.TestCase):
+    def setUp(self):
+        subject_service._global_subjects_cache.clear()
+
+    def tearDown(self):
+        subject_service._global_subjects_cache.clear()
+
+    def test_missing_normalized_columns_fall_back_to_plain_select(self):
+        db = FakeSubjectsDB(
+            [{"id": "sub-port", "name": "Português", "slug": "port", "organization_id": None}]
+        )
+
+        with self.assertLogs(subject_service.logger, level="WARNING"), patch(
+            "app.utils.db.logger"
+        ):
+            subjects = get_subjects_for_org(db, "org-1", include_normalized=True)
+
+        self.assertEqual(
+            db.selects,
+            [subject_service.SUBJECT_CATALOG_SELECT, subject_service.SUBJECT_SELECT],
+        )
+        self.assertEqual([subject["id"] for subject in subjects], ["sub-port"])
+
+        result = build_subject_catalog(
+            subjects,
+            {"role": "teacher", "subject_ids": [], "subjects_taught": ["PORTUGUÊS "]},
+        )
+        self.assertEqual([item["id"] for item in result["selected_subjects"]], ["sub-port"])
+
+
 if __name__ == "__main__":
     unittest.main()
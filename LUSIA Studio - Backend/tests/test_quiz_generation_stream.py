@@ -0,0 +1,131 @@
+import asyncio
+import os
+import unittest
+from unittest.mock import patch
+
+os.environ.setdefault("SUPABASE_URL_B2B", "https://example.supabase.co")
+os.environ.setdefault("SUPABASE_SERVICE_KEY_B2B", "test-service-key")
+os.environ.setdefault("APP_AUTH_SECRET", "test-app-auth-secret")
+
+import orjson
+
+from app.api.http.schemas.quiz_generation import GeneratedQuestion
+from app.api.http.services import quiz_generation_service
+
+
+def _question(label: str) -> GeneratedQuestion:
+    return GeneratedQuestion(type="short_answer", label=label, content={"question": label})
+
+
+def _events(chunk: bytes) -> list[dict]:
+    return [
+        orjson.loads(line[len(b"data: "):])
+        for line in chunk.split(b"\n\n")
+        if line.startswith(b"data: ")
+    ]
+
+
+def _generation_patches(fake_stream, fake_insert) -> list:
+    return [
+        patch.object(
+            quiz_generation_service,
+            "_get_artifact_for_generation",
+            return_value={"subject_id": "sub-1", "year_level": "10", "content": {}},
+        ),
+        patch.object(quiz_generation_service, "assemble_generation_context", return_value={}),
+        patch.object(quiz_generation_service, "_build_quiz_user_prompt", return_value="prompt"),
+        patch.object(quiz_generation_service, "chat_completion_stream", new=fake_stream),
+        patch.object(quiz_generation_service, "insert_question_trees", new=fake_insert),
+        patch.object(
+            quiz_generation_service,
+            "_validate_generated_quiz_content",
+            new=lambda _type, content: content,
+        ),
+        patch.object(quiz_generation_service, "supabase_execute"),
+    ]
+
+
+class GenerateQuestionsStreamTests(unittest.TestCase):
+    def test_each_question_event_is_emitted_before_later_questions_arrive(self):
+        async def scenario():
+            seen_labels: list[str] = []
+            # The fake LLM only produces the next question once the previous
+            # question's event has reached the client.
+            emitted = {label: asyncio.Event() for label in ("Q1", "Q2", "Q3")}
+
+            async def fake_stream(**_kwargs):
+                for label in ("Q1", "Q2", "Q3"):
+                    yield _question(label)
+                    await emitted[label].wait()
+
+            def fake_insert(db, raw_questions, **_tags):
+                return [(f"id-{raw['label']}", []) for raw in raw_questions]
+
+            patches = _generation_patches(fake_stream, fake_insert)
+            for p in patches:
+                p.start()
+            try:
+                stream = quiz_generation_service.generate_questions_stream(
+                    db=None, artifact_id="artifact-1", org_id="org-1", user_id="user-1"
+                )
+                async for chunk in stream:
+                    for event in _events(chunk):
+                        if event["type"] == "question":
+                            label = event["question"]["label"]
+                            seen_labels.append(label)
+                            emitted[label].set()
+                        if event["type"] == "done":
+                            self.assertEqual(event["total_questions"], 3)
+            finally:
+                for p in patches:
+                    p.stop()
+            return seen_labels
+
+        labels = asyncio.run(asyncio.wait_for(scenario(), timeout=5))
+
+        self.assertEqual(labels, ["Q1", "Q2", "Q3"])
+
+    def test_client_disconnect_closes_llm_stream_and_pending_reads(self):
+        async def scenario():
+            llm_closed = asyncio.Event()
+            never = asyncio.Event()
+            tasks_before = asyncio.all_tasks()
+
+            async def fake_stream(**_kwargs):
+                try:
+                    yield _question("Q1")
+                    await never.wait()
+                    yield _question("Q2")
+                finally:
+                    llm_closed.set()
+
+            def fake_insert(db, raw_questions, **_tags):
+                return [(f"id-{raw['label']}", []) for raw in raw_questions]
+
+            patches = _generation_patches(fake_stream, fake_insert)
+            for p in patches:
+                p.start()
+            try:
+                stream = quiz_generation_service.generate_questions_stream(
+                    db=None, artifact_id="artifact-1", org_id="org-1", user_id="user-1"
+                )
+                async for chunk in stream:
+                    if any(event["type"] == "question" for event in _events(chunk)):
+                        break
+                # The client goes away while the next question is being read
+                await stream.aclose()
+            finally:
+                for p in patches:
+                    p.stop()
+
+            leftover = asyncio.all_tasks() - tasks_before
+            return llm_closed.is_set(), [task for task in leftover if not task.done()]
+
+        llm_closed, pending_tasks = asyncio.run(asyncio.wait_for(scenario(), timeout=5))
+
+        self.assertTrue(llm_closed)
+        self.assertEqual(pending_tasks, [])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,128 @@
+import base64
+import os
+import unittest
+
+os.environ.setdefault("SUPABASE_URL_B2B", "https://example.supabase.co")
+os.environ.setdefault("SUPABASE_SERVICE_KEY_B2B", "test-service-key")
+os.environ.setdefault("APP_AUTH_SECRET", "test-app-auth-secret")
+
+from fastapi import HTTPException
+
+from app.api.http.services.quiz_questions_service import (
+    QUESTION_PAGE_SIZE,
+    _decode_question_cursor,
+    encode_question_cursor,
+    list_quiz_questions,
+)
+
+QUESTION_ID = "0b6f3f4e-7f1c-4c52-9a5e-2d7f8f1b9c10"
+
+
+class FakeResponse:
+    def __init__(self, data):
+        self.data = data
+
+
+class FakeQuery:
+    """Records builder calls and returns ``rows`` (respecting ``limit``)."""
+
+    def __init__(self, rows):
+        self.rows = rows
+        self.calls = []
+        self.limit_value = None
+
+    def __getattr__(self, name):
+        def method(*args, **kwargs):
+            self.calls.append((name, args))
+            if name == "limit":
+                self.limit_value = args[0]
+            return self
+
+        return method
+
+    def execute(self):
+        if self.limit_value is None:
+            return FakeResponse(list(self.rows))
+        return FakeResponse(self.rows[: self.limit_value])
+
+
+class FakeDB:
+    def __init__(self, rows):
+        self.query = FakeQuery(rows)
+
+    def table(self, name):
+        return self.query
+
+
+def _rows(count):
+    return [
+        {
+            "id": QUESTION_ID[:-2] + f"{i:02d}",
+            "created_at": f"2025-01-01T00:00:{59 - i:02d}+00:00",
+        }
+        for i in range(count)
+    ]
+
+
+class QuestionCursorTests(unittest.TestCase):
+    def test_round_trips_a_row_cursor(self):
+        cursor = encode_question_cursor(
+            {"created_at": "2025-03-04T10:11:12.5+00:00", "id": QUESTION_ID}
+        )
+
+        self.assertEqual(
+            _decode_question_cursor(cursor),
+            ("2025-03-04T10:11:12.500000+00:00", QUESTION_ID),
+        )
+
+    def test_cursor_is_url_safe(self):
+        cursor = encode_question_cursor(
+            {"created_at": "2025-03-04T10:11:12.5+00:00", "id": QUESTION_ID}
+        )
+
+        self.assertRegex(cursor, r"^[A-Za-z0-9_-]+$")
+
+    def test_rejects_cursors_that_could_inject_filter_branches(self):
+        for raw in (
+            "2025-03-04T10:11:12+00:00|x),is_public.eq.false,id.gt.(0",
+            '2025-01-01",created_by.neq.x)|' + QUESTION_ID,
+            "not-a-date|" + QUESTION_ID,
+            QUESTION_ID,
+            "",
+        ):
+            cursor = base64.urlsafe_b64encode(raw.encode()).decode().rstrip("=")
+            with self.subTest(raw=raw):
+                with self.assertRaises(HTTPException) as ctx:
+                    _decode_question_cursor(cursor)
+                self.assertEqual(ctx.exception.status_code, 400)
+
+    def test_rejects_cursors_that_are_not_base64url(self):
+        for cursor in ("2025-03-04T10:11:12+00:00|" + QUESTION_ID, "abc*", "é"):
+            with self.subTest(cursor=cursor):
+                with self.assertRaises(HTTPException) as ctx:
+                    _decode_question_cursor(cursor)
+                self.assertEqual(ctx.exception.status_code, 400)
+
+
+class ListQuizQuestionsTests(unittest.TestCase):
+    def test_browsing_without_cursor_or_limit_returns_every_row(self):
+        db = FakeDB(_rows(QUESTION_PAGE_SIZE + 5))
+
+        rows, next_cursor = list_quiz_questions(db, "org-1", "user-1")
+
+        self.assertEqual(len(rows), QUESTION_PAGE_SIZE + 5)
+        self.assertIsNone(next_cursor)
+        self.assertIsNone(db.query.limit_value)
+
+    def test_limit_paginates_and_returns_next_cursor(self):
+        data = _rows(5)
+        db = FakeDB(data)
+
+        rows, next_cursor = list_quiz_questions(db, "org-1", "user-1", limit=3)
+
+        self.assertEqual(rows, data[:3])
+        self.assertEqual(next_cursor, encode_question_cursor(data[2]))
+
+
+if __name__ == "__main__":
+    unittest.main()